@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User
+from app.observability import user_id_var
 
 from dotenv import load_dotenv
 import os
@@ -114,4 +115,5 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    user_id_var.set(user.id)
     return user
\ No newline at end of file
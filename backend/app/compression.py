@@ -0,0 +1,50 @@
+import os
+import zlib
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CONTENT_COMPRESSION = os.getenv("CONTENT_COMPRESSION", "zlib")
+ZLIB_LEVEL = int(os.getenv("CONTENT_ZLIB_LEVEL", "6"))
+
+# One-byte codec marker so rows written with either codec stay readable
+# after CONTENT_COMPRESSION changes.
+_ZLIB = b"z"
+_ZSTD = b"s"
+
+
+def compress_text(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    if CONTENT_COMPRESSION == "zstd" and zstandard is not None:
+        return _ZSTD + zstandard.ZstdCompressor(level=3).compress(raw)
+    return _ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress_text(blob: bytes) -> str:
+    blob = bytes(blob)
+    marker, payload = blob[:1], blob[1:]
+    if marker == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed content")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return zlib.decompress(payload).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored compressed as bytes; reads and writes plain str."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
@@ -1,7 +1,10 @@
+import logging
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 import os
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
@@ -17,14 +20,33 @@ def get_db():
     finally:
         db.close()
 
+# create_all() only creates missing tables; columns added to existing tables
+# are listed here. Every statement must be safe to run on every startup.
+SCHEMA_UPDATES = [
+    "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS question_set_hash VARCHAR(64) REFERENCES question_sets(content_hash)",
+    "ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS question_set_hash VARCHAR(64) REFERENCES question_sets(content_hash)",
+    "ALTER TABLE user_notes ADD COLUMN IF NOT EXISTS notes_type VARCHAR(50)",
+    "ALTER TABLE user_notes ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS idx_notes_fingerprint ON user_notes(user_id, session_id, fingerprint)",
+    "ALTER TABLE checkpoint_contents ADD COLUMN IF NOT EXISTS tutor_mode VARCHAR(50)",
+]
+
+def apply_schema_updates():
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPDATES:
+            conn.execute(text(statement))
+
 def init_db():
     from app.models import Base
     
     try:
-        print("Creating/updating database tables...")
+        logger.info("Creating/updating database tables")
         Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully!")
+        apply_schema_updates()
+        logger.info("Database tables ready")
         
     except Exception as e:
-        print(f"Database init error: {e}")
+        logger.exception("Database init error")
         raise
\ No newline at end of file
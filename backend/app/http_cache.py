@@ -0,0 +1,51 @@
+import hashlib
+import json
+from typing import Any
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Conditional GET for large, rarely changing JSON bodies.
+#
+# The ETag is a hash of the serialized body, so it changes exactly when the
+# response does (new content, a tutor-mode variant, a new note). Clients send
+# it back in If-None-Match and get an empty 304 instead of the body. Browsers
+# do this on their own for XHR when the response carries an ETag and
+# Cache-Control: no-cache.
+#
+# The tags are weak (W/"..."): the compression middleware sends the same
+# resource gzip- or br-encoded under the same tag, and a strong tag would
+# claim those bodies are byte-identical. Weak tags are all If-None-Match
+# needs, but they must not be used for Range or If-Match requests.
+
+# Per-user data: the browser may keep it but must revalidate every time,
+# and shared caches must not store it.
+PRIVATE_REVALIDATE = "private, no-cache"
+# Data compiled into the app, identical for every user.
+PUBLIC_STATIC = "public, max-age=3600, stale-while-revalidate=86400"
+
+
+def etag_for(body: bytes) -> str:
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" and "x" both match.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def cached_json(request: Request, payload: Any, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    """Serialize `payload` as JSON with an ETag, or return 304 if the client already has it."""
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if cache_control.startswith("private"):
+        headers["Vary"] = "Authorization"
+
+    if _matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,13 +1,31 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.database import init_db
+from app.observability import REQUEST_ID_HEADER, RequestTimingMiddleware, setup_logging
+from app.pagination import NEXT_CURSOR_HEADER
 from app.routes import auth, sessions, checkpoints, analytics, gamification
+from app.services import leaderboard, scheduler, tracing
 import os
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Conceptly API", version="1.0.0")
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
+# Responses above COMPRESSION_MIN_BYTES are brotli-compressed for clients
+# that accept it (when brotli-asgi is installed) and gzipped otherwise.
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -19,7 +37,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER],
 )
+app.add_middleware(RequestTimingMiddleware)
 
 app.include_router(auth.router)
 app.include_router(sessions.router)
@@ -29,13 +49,19 @@ app.include_router(gamification.router)
 
 @app.on_event("startup")
 async def on_startup():
-    print("Starting Conceptly API")
-    print(f"Running on Render: {bool(os.getenv('RENDER'))}")
-    print(f"DB configured: {bool(os.getenv('DATABASE_URL'))}")
+    logger.info("Starting Conceptly API", extra={"render": bool(os.getenv("RENDER")), "db_configured": bool(os.getenv("DATABASE_URL"))})
 
     init_db()
+    leaderboard.rebuild()
+    leaderboard.start_refresh_loop()
+    scheduler.start()
     
-    print("Startup complete!")
+    logger.info("Startup complete")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    scheduler.stop()
+    tracing.flush()
 
 @app.get("/")
 def read_root():
@@ -49,6 +75,17 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/llm")
+def llm_health():
+    from app.services import content_variants, feynman, llm
+    
+    state = llm.health()
+    return {
+        "status": "degraded" if state["breaker"]["state"] != "closed" else "healthy",
+        **state,
+        "caches": {"feynman": feynman.cache_stats(), "content_variants": content_variants.stats()},
+    }
+
 @app.get("/db-status")
 def database_status():
     from sqlalchemy import text
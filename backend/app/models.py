@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, Boolean, Text, JSON, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from app.compression import CompressedText
 
 Base = declarative_base()
 
@@ -23,9 +24,13 @@ class User(Base):
     weak_topics = relationship("WeakTopic", back_populates="user")
     challenges = relationship("DailyChallenge", back_populates="user")
     notes = relationship("UserNote", back_populates="user")
+    xp_entries = relationship("XpLedger", back_populates="user")
 
 class LearningSession(Base):
     __tablename__ = "learning_sessions"
+    __table_args__ = (
+        Index("idx_sessions_user_created", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -41,6 +46,9 @@ class LearningSession(Base):
 
 class Checkpoint(Base):
     __tablename__ = "checkpoints"
+    __table_args__ = (
+        Index("idx_checkpoints_session_index", "session_id", "checkpoint_index"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("learning_sessions.id"))
@@ -55,14 +63,109 @@ class Checkpoint(Base):
     completed_at = Column(DateTime)
     xp_earned = Column(Integer, default=0)
     
-    context = Column(Text)
-    explanation = Column(Text)
+    # Pre-migration inline copies; new content lives in checkpoint_contents.
+    legacy_context = deferred(Column("context", Text), group="legacy_content")
+    legacy_explanation = deferred(Column("explanation", Text), group="legacy_content")
     content_generated = Column(Boolean, default=False)
-    questions_cache = Column(JSON)
+    questions_cache = deferred(Column(JSON(none_as_null=True)), group="questions")
+    question_set_hash = Column(String(64), ForeignKey("question_sets.content_hash"))
     validation_score = Column(Float)
     
     session = relationship("LearningSession", back_populates="checkpoints")
+    question_set = relationship("QuestionSet")
+    content = relationship("CheckpointContent", uselist=False, cascade="all, delete-orphan")
     quiz_attempts = relationship("QuizAttempt", back_populates="checkpoint")
+    
+    @property
+    def context(self):
+        if self.content is not None:
+            return self.content.context
+        return self.legacy_context
+    
+    @context.setter
+    def context(self, value):
+        self._content_row().context = value
+    
+    @property
+    def explanation(self):
+        if self.content is not None:
+            return self.content.explanation
+        return self.legacy_explanation
+    
+    @explanation.setter
+    def explanation(self, value):
+        self._content_row().explanation = value
+    
+    @property
+    def content_tutor_mode(self):
+        """Tutor mode the stored explanation was written for (None for content that predates variants)."""
+        if self.content is not None:
+            return self.content.tutor_mode
+        return None
+    
+    @content_tutor_mode.setter
+    def content_tutor_mode(self, value):
+        self._content_row().tutor_mode = value
+    
+    def _content_row(self):
+        if self.content is None:
+            self.content = CheckpointContent(
+                context=self.legacy_context,
+                explanation=self.legacy_explanation
+            )
+            self.legacy_context = None
+            self.legacy_explanation = None
+        return self.content
+
+class CheckpointContent(Base):
+    __tablename__ = "checkpoint_contents"
+    
+    checkpoint_id = Column(Integer, ForeignKey("checkpoints.id"), primary_key=True)
+    context = Column(CompressedText)
+    explanation = Column(CompressedText)
+    tutor_mode = Column(String(50))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CheckpointContentVariant(Base):
+    __tablename__ = "checkpoint_content_variants"
+    
+    checkpoint_id = Column(Integer, ForeignKey("checkpoints.id", ondelete="CASCADE"), primary_key=True)
+    tutor_mode = Column(String(50), primary_key=True)
+    explanation = Column(CompressedText)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class LibraryPlan(Base):
+    __tablename__ = "content_library_plans"
+    
+    topic_key = Column(String(255), primary_key=True)
+    topic = Column(String(255), nullable=False)
+    checkpoints = Column(JSON, nullable=False)
+    tutor_mode = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class LibraryContent(Base):
+    __tablename__ = "content_library_items"
+    
+    content_key = Column(String(64), primary_key=True)
+    topic = Column(String(255))
+    tutor_mode = Column(String(50))
+    context = Column(CompressedText)
+    explanation = Column(CompressedText)
+    question_set_hash = Column(String(64), ForeignKey("question_sets.content_hash"))
+    validation_score = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class FeynmanExplanation(Base):
+    __tablename__ = "feynman_explanations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False)
+    checkpoint_id = Column(Integer, ForeignKey("checkpoints.id", ondelete="CASCADE"), nullable=False, index=True)
+    approach_index = Column(Integer, nullable=False)
+    tutor_mode = Column(String(50))
+    weak_areas = Column(JSON)
+    explanation = Column(CompressedText)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
@@ -74,10 +177,20 @@ class QuizAttempt(Base):
     correct_count = Column(Integer)
     total_questions = Column(Integer)
     answers = Column(JSON)
-    questions_used = Column(JSON)
+    questions_used = deferred(Column(JSON(none_as_null=True)))
+    question_set_hash = Column(String(64), ForeignKey("question_sets.content_hash"))
     attempted_at = Column(DateTime, default=datetime.utcnow)
     
     checkpoint = relationship("Checkpoint", back_populates="quiz_attempts")
+    question_set = relationship("QuestionSet")
+
+class QuestionSet(Base):
+    __tablename__ = "question_sets"
+    
+    content_hash = Column(String(64), primary_key=True)
+    questions = Column(JSON, nullable=False)
+    question_count = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 class UserAnalytics(Base):
     __tablename__ = "user_analytics"
@@ -134,11 +247,60 @@ class DailyChallenge(Base):
 
 class UserNote(Base):
     __tablename__ = "user_notes"
+    __table_args__ = (
+        Index("idx_notes_fingerprint", "user_id", "session_id", "fingerprint"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     session_id = Column(Integer, ForeignKey("learning_sessions.id"))
     content = Column(Text)
+    notes_type = Column(String)
+    fingerprint = Column(String(64))
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    user = relationship("User", back_populates="notes")
\ No newline at end of file
+    user = relationship("User", back_populates="notes")
+    sections = relationship("NoteSection", order_by="NoteSection.position", cascade="all, delete-orphan")
+
+class NoteSection(Base):
+    __tablename__ = "note_sections"
+    __table_args__ = (
+        Index("idx_note_sections_note_position", "note_id", "position"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    note_id = Column(Integer, ForeignKey("user_notes.id", ondelete="CASCADE"), nullable=False)
+    checkpoint_id = Column(Integer, ForeignKey("checkpoints.id"))
+    kind = Column(String(20), nullable=False)
+    position = Column(Integer, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    content = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class XpLedger(Base):
+    __tablename__ = "xp_ledger"
+    __table_args__ = (
+        Index("idx_xp_ledger_user_created", "user_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    source_id = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    user = relationship("User", back_populates="xp_entries")
+
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_runs"
+    __table_args__ = (
+        UniqueConstraint("job_name", "run_date", name="uq_scheduler_runs_job_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String, nullable=False)
+    run_date = Column(Date, nullable=False)
+    affected_rows = Column(Integer, default=0)
+    duration_ms = Column(Integer)
+    finished_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
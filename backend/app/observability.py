@@ -0,0 +1,185 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Structured logging and per-request timing.
+#
+# Log calls only enqueue a record; a single listener thread formats JSON
+# lines and writes them, so request threads never block on stdout.
+#
+#   LOG_LEVEL   default INFO
+#   LOG_FORMAT  "json" (default) or "text" for local development
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+# Set by get_current_user; used to queue LLM calls fairly per user.
+user_id_var = contextvars.ContextVar("user_id", default=None)
+# Per-request accumulator shared by reference with worker threads that copy
+# the request context (FastAPI's threadpool does this for sync endpoints).
+_timings_var = contextvars.ContextVar("request_timings", default=None)
+
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _RequestIdFilter(logging.Filter):
+    # Runs in the calling thread, before the record crosses the queue.
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _PreparedQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Keep args-free message and exc text, but leave extra fields intact.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging():
+    """Route the root logger through a queue to one JSON (or text) stdout writer. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = _PreparedQueueHandler(log_queue)
+    handler.addFilter(_RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    # uvicorn's access log duplicates the request line written below, and
+    # httpx would log every Groq call at INFO.
+    logging.getLogger("uvicorn.access").disabled = True
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def add_timing(kind: str, seconds: float):
+    """Add time spent in `kind` ("db", "llm") to the current request, if any."""
+    timings = _timings_var.get()
+    if timings is None:
+        return
+    timings[f"{kind}_ms"] = timings.get(f"{kind}_ms", 0.0) + seconds * 1000
+    timings[f"{kind}_calls"] = timings.get(f"{kind}_calls", 0) + 1
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        add_timing("db", time.perf_counter() - starts.pop())
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware: assigns a request id (honouring an incoming
+    X-Request-ID), echoes it on the response and logs one line per request
+    with route latency, DB time and LLM time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("app.request")
+        self._route_paths = {}
+
+    def _route_path(self, scope):
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if endpoint not in self._route_paths:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._route_paths[endpoint] = next(
+                (r.path for r in routes if getattr(r, "endpoint", None) is endpoint), endpoint.__name__
+            )
+        return self._route_paths[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.lower().encode())
+        request_id = incoming.decode("latin-1")[:64] if incoming else uuid.uuid4().hex[:16]
+        id_token = request_id_var.set(request_id)
+        timings = {}
+        timings_token = _timings_var.set(timings)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers") or []) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.logger.info("request", extra={
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "route": self._route_path(scope),
+                "status": status["code"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "db_ms": round(timings.get("db_ms", 0.0), 2),
+                "db_queries": timings.get("db_calls", 0),
+                "llm_ms": round(timings.get("llm_ms", 0.0), 2),
+                "llm_calls": timings.get("llm_calls", 0),
+            })
+            _timings_var.reset(timings_token)
+            request_id_var.reset(id_token)
@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def clamp_limit(limit: Optional[int], cursor: Optional[str] = None) -> Optional[int]:
+    """
+    Page size for a request. Requests with neither a limit nor a cursor get
+    None, meaning the full unpaged list, since clients written before paging
+    do not follow X-Next-Cursor.
+    """
+    if not limit:
+        return DEFAULT_PAGE_SIZE if cursor else None
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or not values:
+            raise ValueError("cursor must encode a list")
+        return values
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Turn ?fields=a,b into a set, rejecting names the endpoint does not expose."""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def serialize(rows, schema: Type[BaseModel], fields: Optional[Set[str]] = None, extra_fields: Iterable[str] = ()) -> List[Dict]:
+    """
+    Serialize ORM rows through a response schema, optionally keeping only the
+    requested fields. Extra fields are read straight off the row and only
+    when asked for.
+    """
+    schema_fields = set(schema.model_fields)
+    extra = [f for f in extra_fields if fields and f in fields]
+    include = (fields & schema_fields) if fields else None
+
+    result = []
+    for row in rows:
+        data = schema.model_validate(row).model_dump(mode="json", include=include) if (include is None or include) else {}
+        for name in extra:
+            data[name] = getattr(row, name)
+        result.append(data)
+    return result
+
+
+def finish_page(response: Response, rows: list, limit: Optional[int], *key_getters) -> list:
+    """
+    Trim a page fetched with limit + 1 rows and advertise the next cursor in
+    the X-Next-Cursor header when more rows exist.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(getter(last) for getter in key_getters))
+    return rows
+
+
+def newest_first(query, created_col, id_col, cursor: Optional[str], limit: Optional[int]):
+    """Keyset page over (created_at, id) descending; every row when `limit` is None."""
+    if cursor:
+        try:
+            created_at, row_id = decode_cursor(cursor)
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    query = query.order_by(created_col.desc(), id_col.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query.all()
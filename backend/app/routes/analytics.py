@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models import User, LearningSession, Checkpoint, QuizAttempt, UserAnalytics
 from app.schemas import AnalyticsResponse, SessionResponse, CheckpointResponse
 from app.auth import get_current_user
+from app.pagination import clamp_limit, parse_fields, serialize, finish_page, newest_first
+from app.services.streak import effective_streak
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -14,21 +16,42 @@ def get_analytics(current_user: User = Depends(get_current_user), db: Session =
     analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == current_user.id).first()
     
     if not analytics:
-        analytics = UserAnalytics(user_id=current_user.id)
-        db.add(analytics)
-        db.commit()
-        db.refresh(analytics)
-    
-    return analytics
+        return AnalyticsResponse(
+            total_sessions=0,
+            completed_sessions=0,
+            total_checkpoints=0,
+            avg_score=0.0,
+            current_streak=0,
+            longest_streak=0
+        )
+    
+    return AnalyticsResponse(
+        total_sessions=analytics.total_sessions or 0,
+        completed_sessions=analytics.completed_sessions or 0,
+        total_checkpoints=analytics.total_checkpoints or 0,
+        avg_score=analytics.avg_score or 0.0,
+        current_streak=effective_streak(analytics),
+        longest_streak=analytics.longest_streak or 0
+    )
 
-@router.get("/history", response_model=List[SessionResponse])
-def get_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    
-    sessions = db.query(LearningSession).filter(
-        LearningSession.user_id == current_user.id
-    ).order_by(LearningSession.created_at.desc()).all()
-    
-    return sessions
+@router.get("/history")
+def get_history(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    
+    limit = clamp_limit(limit, cursor)
+    selected = parse_fields(fields, SessionResponse.model_fields)
+    
+    query = db.query(LearningSession).filter(LearningSession.user_id == current_user.id)
+    sessions = newest_first(query, LearningSession.created_at, LearningSession.id, cursor, limit)
+    sessions = finish_page(response, sessions, limit, lambda s: s.created_at, lambda s: s.id)
+    
+    return serialize(sessions, SessionResponse, selected)
 
 @router.get("/sessions/{session_id}/details")
 def get_session_details(session_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -1,26 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session, undefer_group, joinedload
 from datetime import datetime
 from app.database import get_db
 from app.models import User, Checkpoint, QuizAttempt, WeakTopic, UserAnalytics
 from app.schemas import QuizAnswer
 from app.auth import get_current_user
-from app.services import evaluator, feynman
+from app.services import evaluator, feynman, question_store
+from app.services.streak import record_study_activity
+from app.services.xp import award_xp
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/checkpoints", tags=["checkpoints"])
 
 @router.post("/{checkpoint_id}/submit")
-def submit_quiz(checkpoint_id: int, quiz_answer: QuizAnswer, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def submit_quiz(checkpoint_id: int, quiz_answer: QuizAnswer, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     
-    checkpoint = db.query(Checkpoint).filter(Checkpoint.id == checkpoint_id).first()
+    checkpoint = db.query(Checkpoint).filter(Checkpoint.id == checkpoint_id).options(
+        undefer_group("questions"),
+        joinedload(Checkpoint.question_set)
+    ).first()
     
     if not checkpoint:
         raise HTTPException(status_code=404, detail="Checkpoint not found")
     
-    if not checkpoint.questions_cache:
+    questions = question_store.checkpoint_questions(checkpoint)
+    
+    if not questions:
         raise HTTPException(status_code=400, detail="No questions available for this checkpoint")
     
-    questions = checkpoint.questions_cache
+    if not checkpoint.question_set_hash:
+        question_store.set_checkpoint_questions(db, checkpoint, questions)
     
     result = evaluator.evaluate_answers(questions, quiz_answer.answers)
     
@@ -34,7 +45,7 @@ def submit_quiz(checkpoint_id: int, quiz_answer: QuizAnswer, current_user: User
         correct_count=result['correct_count'],
         total_questions=result['total_questions'],
         answers=quiz_answer.answers,
-        questions_used=questions
+        question_set_hash=checkpoint.question_set_hash
     )
     
     db.add(quiz_attempt)
@@ -48,10 +59,7 @@ def submit_quiz(checkpoint_id: int, quiz_answer: QuizAnswer, current_user: User
         checkpoint.xp_earned = 2
         xp_earned = 2
         
-        current_user.xp += 2
-        
-        if current_user.xp >= (current_user.level * 100):
-            current_user.level += 1
+        award_xp(current_user, xp_earned, "checkpoint_passed", db, source_id=checkpoint.id)
     else:
         for weak_area in result.get('weak_areas', []):
             existing_weak = db.query(WeakTopic).filter(
@@ -81,20 +89,13 @@ def submit_quiz(checkpoint_id: int, quiz_answer: QuizAnswer, current_user: User
         if result['passed']:
             analytics.total_checkpoints += 1
     
+    record_study_activity(current_user.id, db)
+    
     db.commit()
     
-    # Update streak on quiz activity
-    from app.models import UserAnalytics as UA
-    from datetime import timedelta
-    _analytics = db.query(UA).filter(UA.user_id == current_user.id).first()
-    if _analytics:
-        _today = datetime.utcnow().date()
-        _last = _analytics.last_study_date.date() if _analytics.last_study_date else None
-        if _last != _today:
-            _analytics.current_streak = (_analytics.current_streak + 1) if _last == _today - timedelta(days=1) else 1
-            _analytics.longest_streak = max(_analytics.longest_streak, _analytics.current_streak)
-            _analytics.last_study_date = datetime.utcnow()
-            db.commit()
+    if not result['passed']:
+        # Have every teaching approach ready before the student asks for one.
+        background_tasks.add_task(feynman.pregenerate_variants, checkpoint.id, current_user.id, current_user.tutor_mode)
     
     return {
         "score": result['understanding_score'],
@@ -114,26 +115,14 @@ def get_feynman_explanation(checkpoint_id: int, attempt: int = 0, current_user:
     if not checkpoint:
         raise HTTPException(status_code=404, detail="Checkpoint not found")
     
-    weak_topics = db.query(WeakTopic).filter(
-        WeakTopic.user_id == current_user.id,
-        WeakTopic.topic == checkpoint.topic
-    ).order_by(WeakTopic.strength_score.asc()).limit(3).all()
+    weak_areas = feynman.weak_areas_for(db, current_user.id, checkpoint)
+    checkpoint_data = feynman.checkpoint_data(checkpoint)
     
-    weak_areas = [wt.concept for wt in weak_topics] if weak_topics else checkpoint.objectives[:2]
-    
-    checkpoint_data = {
-        "id": checkpoint.id,
-        "topic": checkpoint.topic,
-        "objectives": checkpoint.objectives,
-        "key_concepts": checkpoint.key_concepts,
-        "level": checkpoint.level
-    }
-    
-    explanation = feynman.apply_feynman_teaching(
-        checkpoint_data,
-        weak_areas,
-        attempt,
-        current_user.tutor_mode
-    )
+    try:
+        explanation = feynman.explanation_for(db, checkpoint_data, weak_areas, attempt, current_user.tutor_mode)
+    except Exception:
+        logger.exception("Feynman teaching failed")
+        db.rollback()
+        explanation = feynman.fallback_explanation(checkpoint_data, weak_areas, attempt)
     
     return {"explanation": explanation, "weak_areas": weak_areas}
\ No newline at end of file
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
 from app.database import get_db
-from app.models import User, UserBadge, WeakTopic, DailyChallenge, UserNote, LearningSession, Checkpoint, UserAnalytics
-from app.schemas import BadgeResponse, WeakTopicResponse, DailyChallengeResponse, TutorModeUpdate, NoteCreate, NoteResponse, UserResponse
+from app.models import User, UserBadge, WeakTopic, DailyChallenge, UserNote, LearningSession, Checkpoint, UserAnalytics, XpLedger
+from app.schemas import BadgeResponse, WeakTopicResponse, DailyChallengeResponse, TutorModeUpdate, NoteCreate, NoteResponse, UserResponse, XpLedgerResponse
 from app.auth import get_current_user
-from app.services import notes_generator
-import random
+from app import http_cache
+from app.services import notes_service
+from app.services.streak import effective_streak, record_study_activity
+from app.services.xp import award_xp
+from app.services import leaderboard
+from app.services.daily_challenges import pick_challenge
 
 router = APIRouter(prefix="/gamification", tags=["gamification"])
 
@@ -47,53 +51,6 @@ BADGE_DEFINITIONS = {
     "xp_1000":           {"badge_type": "xp",          "icon": "🔮", "description": "Earned 1000 total XP.",                     "tier": "gold"},
 }
 
-DAILY_CHALLENGES = [
-    {"task": "Complete 1 full checkpoint today",                                "bonus_xp": 20},
-    {"task": "Score 80% or higher on a quiz",                                   "bonus_xp": 25},
-    {"task": "Score 100% on any quiz — perfect run!",                           "bonus_xp": 50},
-    {"task": "Complete a learning session from start to finish",                 "bonus_xp": 40},
-    {"task": "Complete 3 checkpoints in a single day",                          "bonus_xp": 60},
-    {"task": "Use the Feynman explanation on a tough topic",                     "bonus_xp": 15},
-    {"task": "Retry a failed quiz and pass it",                                  "bonus_xp": 30},
-    {"task": "Start a brand new learning topic today",                           "bonus_xp": 20},
-    {"task": "Review your weak topics in the Analytics page",                    "bonus_xp": 10},
-    {"task": "Complete a quiz without skipping any questions",                   "bonus_xp": 15},
-    {"task": "Finish a session and download your study notes",                   "bonus_xp": 20},
-    {"task": "Earn at least 10 XP today",                                        "bonus_xp": 15},
-    {"task": "Pass a quiz on your very first attempt",                           "bonus_xp": 25},
-    {"task": "Achieve a checkpoint score above 90%",                             "bonus_xp": 30},
-    {"task": "Maintain your streak — complete any study activity today!",        "bonus_xp": 10},
-    {"task": "Complete an intermediate or advanced-level checkpoint",             "bonus_xp": 35},
-    {"task": "Complete 2 different sessions today",                              "bonus_xp": 45},
-    {"task": "Explore a topic you have never studied before",                    "bonus_xp": 20},
-    {"task": "Answer 10 quiz questions correctly across any quizzes",            "bonus_xp": 25},
-    {"task": "Reach a new personal best quiz score on any checkpoint",           "bonus_xp": 30},
-]
-
-
-def update_streak(user: User, db: Session):
-    analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == user.id).first()
-    if not analytics:
-        analytics = UserAnalytics(user_id=user.id)
-        db.add(analytics)
-        db.flush()
-
-    today = datetime.utcnow().date()
-    last_study = analytics.last_study_date.date() if analytics.last_study_date else None
-
-    if last_study == today:
-        return
-
-    if last_study == today - timedelta(days=1):
-        analytics.current_streak += 1
-    else:
-        analytics.current_streak = 1
-
-    analytics.longest_streak = max(analytics.longest_streak, analytics.current_streak)
-    analytics.last_study_date = datetime.utcnow()
-    db.commit()
-
-
 def award_badge(user_id: int, badge_name: str, existing_badges: set, db: Session):
     if badge_name in existing_badges or badge_name not in BADGE_DEFINITIONS:
         return None
@@ -109,8 +66,7 @@ def award_badge(user_id: int, badge_name: str, existing_badges: set, db: Session
     return {"badge_name": badge_name, "description": badge.description, "tier": defn["tier"]}
 
 @router.get("/profile", response_model=UserResponse)
-def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    update_streak(current_user, db)
+def get_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
 
@@ -132,8 +88,8 @@ def get_badges(current_user: User = Depends(get_current_user), db: Session = Dep
 
 
 @router.get("/badge-definitions")
-def get_badge_definitions():
-    return BADGE_DEFINITIONS
+def get_badge_definitions(request: Request):
+    return http_cache.cached_json(request, BADGE_DEFINITIONS, http_cache.PUBLIC_STATIC)
 
 
 @router.post("/badges/check")
@@ -175,7 +131,7 @@ def check_and_award_badges(current_user: User = Depends(get_current_user), db: S
     if perfect_scores:           add("perfect_score")
     if len(perfect_scores) >= 3: add("flawless")
 
-    streak = analytics.current_streak if analytics else 0
+    streak = effective_streak(analytics)
     if streak >= 3:  add("consistent")
     if streak >= 7:  add("week_warrior")
     if streak >= 30: add("month_legend")
@@ -213,6 +169,42 @@ def check_and_award_badges(current_user: User = Depends(get_current_user), db: S
     return {"newly_awarded": newly_awarded}
 
 
+@router.get("/xp-history", response_model=List[XpLedgerResponse])
+def get_xp_history(limit: int = 50, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    limit = max(1, min(limit, 200))
+    entries = db.query(XpLedger).filter(
+        XpLedger.user_id == current_user.id
+    ).order_by(XpLedger.created_at.desc(), XpLedger.id.desc()).limit(limit).all()
+    return entries
+
+
+@router.get("/leaderboard")
+def get_leaderboard(scope: str = "global", limit: int = 10, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if scope not in ("global", "weekly"):
+        raise HTTPException(status_code=400, detail="Invalid leaderboard scope")
+    limit = max(1, min(limit, 100))
+
+    board = leaderboard.get_board(scope)
+    top = board.top(limit)
+
+    names = dict(
+        db.query(User.id, User.name).filter(User.id.in_([user_id for _, user_id, _ in top])).all()
+    ) if top else {}
+
+    return {
+        "scope": scope,
+        "total_users": len(board),
+        "entries": [
+            {"rank": rank, "user_id": user_id, "name": names.get(user_id, ""), "xp": xp}
+            for rank, user_id, xp in top
+        ],
+        "me": {
+            "rank": board.rank(current_user.id),
+            "xp": board.score(current_user.id) or 0
+        }
+    }
+
+
 @router.get("/weak-topics", response_model=List[WeakTopicResponse])
 def get_weak_topics(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     all_weak = db.query(WeakTopic).filter(
@@ -248,11 +240,7 @@ def get_daily_challenge(current_user: User = Depends(get_current_user), db: Sess
                 DailyChallenge.date >= datetime.utcnow() - timedelta(days=7)
             ).all()
         }
-        available = [c for c in DAILY_CHALLENGES if c["task"] not in recent_tasks]
-        if not available:
-            available = DAILY_CHALLENGES
-
-        chosen = random.choice(available)
+        chosen = pick_challenge(recent_tasks)
         challenge = DailyChallenge(
             user_id=current_user.id,
             task=chosen["task"],
@@ -277,12 +265,16 @@ def complete_daily_challenge(challenge_id: int, current_user: User = Depends(get
     if challenge.completed:
         raise HTTPException(status_code=400, detail="Challenge already completed")
 
-    challenge.completed = True
-    current_user.xp += challenge.bonus_xp
-    if current_user.xp >= (current_user.level * 100):
-        current_user.level += 1
+    claimed = db.query(DailyChallenge).filter(
+        DailyChallenge.id == challenge.id,
+        DailyChallenge.completed == False
+    ).update({DailyChallenge.completed: True}, synchronize_session=False)
+    if not claimed:
+        raise HTTPException(status_code=400, detail="Challenge already completed")
+
+    award_xp(current_user, challenge.bonus_xp, "daily_challenge", db, source_id=challenge.id)
 
-    update_streak(current_user, db)
+    record_study_activity(current_user.id, db)
     db.commit()
 
     completed_count = db.query(DailyChallenge).filter(
@@ -312,18 +304,19 @@ def create_note(note: NoteCreate, current_user: User = Depends(get_current_user)
 
 
 @router.get("/notes/{session_id}", response_model=List[NoteResponse])
-def get_notes(session_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_notes(session_id: int, request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     notes = db.query(UserNote).filter(
         UserNote.user_id == current_user.id,
         UserNote.session_id == session_id
     ).order_by(UserNote.created_at.desc()).all()
-    return notes
+    return http_cache.cached_json(request, [NoteResponse.model_validate(note) for note in notes])
 
 
 @router.post("/notes/{session_id}/generate")
 def generate_smart_notes(
     session_id: int,
     notes_type: str = "comprehensive",
+    mode: str = "llm",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -334,23 +327,16 @@ def generate_smart_notes(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    checkpoints = db.query(Checkpoint).filter(Checkpoint.session_id == session.id).all()
-    checkpoint_data = [
-        {"topic": cp.topic, "objectives": cp.objectives or [], "key_concepts": cp.key_concepts or [], "level": cp.level or "intermediate"}
-        for cp in checkpoints
-    ]
     weak_topics = db.query(WeakTopic).filter(WeakTopic.user_id == current_user.id).limit(5).all()
     weak_areas = [f"{wt.topic}: {wt.concept}" for wt in weak_topics]
 
-    if notes_type == "cheatsheet":
-        notes_content = notes_generator.generate_cheat_sheet(session.topic, checkpoint_data)
-    elif notes_type == "questions":
-        notes_content = notes_generator.generate_practice_questions(session.topic, checkpoint_data)
-    else:
-        notes_content = notes_generator.generate_comprehensive_notes(session.topic, checkpoint_data, weak_areas)
+    if notes_type not in ("cheatsheet", "questions"):
+        notes_type = "comprehensive"
 
-    note = UserNote(user_id=current_user.id, session_id=session.id, content=notes_content)
-    db.add(note)
-    db.commit()
-    db.refresh(note)
-    return {"note": note, "content": notes_content}
\ No newline at end of file
+    if mode not in notes_service.NOTES_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(notes_service.NOTES_MODES)}")
+    if mode == "local" and notes_type not in notes_service.LOCAL_NOTES_TYPES:
+        raise HTTPException(status_code=400, detail="Local mode supports cheatsheet and questions notes only")
+    
+    note, cached = notes_service.get_or_generate_notes(db, current_user.id, session, notes_type, weak_areas, mode)
+    return {"note": note, "content": note.content, "cached": cached}
\ No newline at end of file
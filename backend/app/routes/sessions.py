@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session, undefer_group, joinedload, selectinload
+from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models import User, LearningSession, Checkpoint, UserAnalytics, UserNote
 from app.schemas import SessionCreate, SessionResponse, CheckpointResponse
 from app.auth import get_current_user
-from app.services import checkpoint_generator, notes_generator, question_generator
+from app.pagination import clamp_limit, decode_cursor, parse_fields, serialize, finish_page, newest_first
+from app import http_cache
+from app.services import checkpoint_generator, content_library, content_variants, notes_service, question_generator, question_store, singleflight
 from app.services.workflow import run_checkpoint_workflow
+from app.services.streak import record_study_activity
+from app.services.xp import award_xp
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+CHECKPOINT_CONTENT_FIELDS = {"context", "explanation"}
+CHECKPOINT_EXTRA_FIELDS = ("level", "key_concepts", "validation_score", "content_generated", "context", "explanation")
+
 @router.post("/", response_model=SessionResponse)
 def create_session(session: SessionCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     
@@ -30,18 +40,28 @@ def create_session(session: SessionCreate, current_user: User = Depends(get_curr
         analytics.total_sessions += 1
         db.commit()
     
-    print(f"✓ Created new session: {new_session.topic} (ID: {new_session.id})")
+    logger.info("Created session", extra={"session_id": new_session.id, "topic": new_session.topic})
     
     return new_session
 
-@router.get("/", response_model=List[SessionResponse])
-def get_sessions(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/")
+def get_sessions(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     
-    sessions = db.query(LearningSession).filter(
-        LearningSession.user_id == current_user.id
-    ).order_by(LearningSession.created_at.desc()).all()
+    limit = clamp_limit(limit, cursor)
+    selected = parse_fields(fields, SessionResponse.model_fields)
+    
+    query = db.query(LearningSession).filter(LearningSession.user_id == current_user.id)
+    sessions = newest_first(query, LearningSession.created_at, LearningSession.id, cursor, limit)
+    sessions = finish_page(response, sessions, limit, lambda s: s.created_at, lambda s: s.id)
     
-    return sessions
+    return serialize(sessions, SessionResponse, selected)
 
 @router.get("/{session_id}", response_model=SessionResponse)
 def get_session(session_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -67,68 +87,89 @@ def generate_checkpoints_route(session_id: int, current_user: User = Depends(get
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    existing = existing_checkpoint_plan(db, session.id)
+    if existing:
+        logger.info("Checkpoints already exist, returning existing ones", extra={"session_id": session_id})
+        return existing
     
-    existing_checkpoints = db.query(Checkpoint).filter(
-        Checkpoint.session_id == session.id
-    ).all()
-    
-    if existing_checkpoints:
-        print(f"⚠️ Checkpoints already exist for session {session_id}, returning existing ones")
-        return {
-            "checkpoints": [
-                {
-                    "id": cp.id,
-                    "topic": cp.topic,
-                    "objectives": cp.objectives,
-                    "key_concepts": cp.key_concepts,
-                    "level": cp.level,
-                    "success_threshold": 0.7
-                }
-                for cp in existing_checkpoints
-            ]
-        }
-    
-    print(f"📚 Generating checkpoints for session {session_id}: {session.topic}")
-    print(f"👤 User tutor mode: {current_user.tutor_mode}")
-    
-    question_generator.clear_question_history(session_id)
-    
-    checkpoints = checkpoint_generator.generate_checkpoints(
-        topic=session.topic,
-        current_level="beginner",
-        target_level="intermediate",
-        purpose="general learning",
-        tutor_mode=current_user.tutor_mode
-    )
-    
-    print(f"✓ Generated {len(checkpoints)} checkpoint definitions")
-    
-    created_checkpoints = []
-    for idx, cp_data in enumerate(checkpoints):
-        checkpoint = Checkpoint(
-            session_id=session.id,
-            checkpoint_index=idx,
-            topic=cp_data['topic'],
-            objectives=cp_data['objectives'],
-            key_concepts=cp_data.get('key_concepts', []),
-            level=cp_data.get('level', 'intermediate'),
-            status="pending",
-            content_generated=False
+    def generate():
+        # Re-check under the lock: a concurrent request may have just saved a plan.
+        existing = existing_checkpoint_plan(db, session.id)
+        if existing:
+            return existing
+        
+        logger.info("Generating checkpoints", extra={"session_id": session_id, "topic": session.topic, "tutor_mode": current_user.tutor_mode})
+        
+        question_generator.clear_question_history(session_id)
+        
+        checkpoints = content_library.plan(db, session.topic) or checkpoint_generator.generate_checkpoints(
+            topic=session.topic,
+            current_level="beginner",
+            target_level="intermediate",
+            purpose="general learning",
+            tutor_mode=current_user.tutor_mode
         )
-        db.add(checkpoint)
-        created_checkpoints.append(checkpoint)
-    
-    db.commit()
+        
+        logger.debug("Generated checkpoint definitions", extra={"session_id": session_id, "count": len(checkpoints)})
+        
+        created_checkpoints = []
+        for idx, cp_data in enumerate(checkpoints):
+            checkpoint = Checkpoint(
+                session_id=session.id,
+                checkpoint_index=idx,
+                topic=cp_data['topic'],
+                objectives=cp_data['objectives'],
+                key_concepts=cp_data.get('key_concepts', []),
+                level=cp_data.get('level', 'intermediate'),
+                status="pending",
+                content_generated=False
+            )
+            db.add(checkpoint)
+            created_checkpoints.append(checkpoint)
+        
+        db.commit()
+        
+        for cp in created_checkpoints:
+            db.refresh(cp)
+        
+        logger.info("Saved checkpoints", extra={"session_id": session_id, "count": len(created_checkpoints)})
+        
+        return {"checkpoints": checkpoints}
     
-    for cp in created_checkpoints:
-        db.refresh(cp)
+    return singleflight.run(f"checkpoints:{session.id}", generate, db=db)
+
+def existing_checkpoint_plan(db: Session, session_id: int):
+    existing_checkpoints = db.query(Checkpoint).filter(
+        Checkpoint.session_id == session_id
+    ).all()
     
-    print(f"✓ Saved {len(created_checkpoints)} checkpoints to database")
+    if not existing_checkpoints:
+        return None
     
-    return {"checkpoints": checkpoints}
+    return {
+        "checkpoints": [
+            {
+                "id": cp.id,
+                "topic": cp.topic,
+                "objectives": cp.objectives,
+                "key_concepts": cp.key_concepts,
+                "level": cp.level,
+                "success_threshold": 0.7
+            }
+            for cp in existing_checkpoints
+        ]
+    }
 
-@router.get("/{session_id}/checkpoints", response_model=List[CheckpointResponse])
-def get_checkpoints(session_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/{session_id}/checkpoints")
+def get_checkpoints(
+    session_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     
     session = db.query(LearningSession).filter(
         LearningSession.id == session_id,
@@ -138,123 +179,199 @@ def get_checkpoints(session_id: int, current_user: User = Depends(get_current_us
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    checkpoints = db.query(Checkpoint).filter(
-        Checkpoint.session_id == session.id
-    ).order_by(Checkpoint.checkpoint_index).all()
-    
-    return checkpoints
+    limit = clamp_limit(limit, cursor)
+    selected = parse_fields(fields, set(CheckpointResponse.model_fields) | set(CHECKPOINT_EXTRA_FIELDS))
+    
+    query = db.query(Checkpoint).filter(Checkpoint.session_id == session.id)
+    if cursor:
+        after_index = decode_cursor(cursor)[0]
+        if not isinstance(after_index, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(Checkpoint.checkpoint_index > after_index)
+    if selected and selected & CHECKPOINT_CONTENT_FIELDS:
+        query = query.options(selectinload(Checkpoint.content))
+    
+    query = query.order_by(Checkpoint.checkpoint_index)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    checkpoints = query.all()
+    checkpoints = finish_page(response, checkpoints, limit, lambda cp: cp.checkpoint_index)
+    
+    return serialize(checkpoints, CheckpointResponse, selected, CHECKPOINT_EXTRA_FIELDS)
 
 @router.get("/{session_id}/checkpoints/{checkpoint_id}/content")
-def get_checkpoint_content(session_id: int, checkpoint_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_checkpoint_content(session_id: int, checkpoint_id: int, request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     
     checkpoint = db.query(Checkpoint).filter(
         Checkpoint.id == checkpoint_id,
         Checkpoint.session_id == session_id
-    ).first()
+    ).options(joinedload(Checkpoint.content)).first()
     
     if not checkpoint:
         raise HTTPException(status_code=404, detail="Checkpoint not found")
     
     
     if checkpoint.content_generated and checkpoint.context and checkpoint.explanation:
-        print(f"✓ Returning cached content for checkpoint {checkpoint_id}")
-        return {
+        logger.debug("Checkpoint content cache hit", extra={"checkpoint_id": checkpoint_id})
+        return http_cache.cached_json(request, {
             "context": checkpoint.context,
-            "explanation": checkpoint.explanation,
+            "explanation": content_variants.explanation_for(db, checkpoint, current_user.tutor_mode),
             "validation_score": checkpoint.validation_score
-        }
-    
-    print(f"📝 Generating content for checkpoint {checkpoint_id}: {checkpoint.topic}")
-    print(f"👤 Using tutor mode: {current_user.tutor_mode}")
-    
-    checkpoint_data = {
-        "id": checkpoint.id,
-        "topic": checkpoint.topic,
-        "objectives": checkpoint.objectives,
-        "key_concepts": checkpoint.key_concepts,
-        "level": checkpoint.level
-    }
+        })
     
-    result = run_checkpoint_workflow(
-        checkpoint=checkpoint_data,
-        tutor_mode=current_user.tutor_mode
-    )
-    
-    checkpoint.context = result['context']
-    checkpoint.explanation = result['explanation']
-    checkpoint.validation_score = result['validation_score']
-    checkpoint.content_generated = True
-    
-    db.commit()
-    db.refresh(checkpoint)
-    
-    print(f"✓ Content generated and cached for checkpoint {checkpoint_id}")
+    def generate():
+        db.refresh(checkpoint)
+        if checkpoint.content_generated and checkpoint.context and checkpoint.explanation:
+            return {
+                "context": checkpoint.context,
+                "explanation": content_variants.explanation_for(db, checkpoint, current_user.tutor_mode),
+                "validation_score": checkpoint.validation_score
+            }
+        
+        logger.info("Generating checkpoint content", extra={"checkpoint_id": checkpoint_id, "tutor_mode": current_user.tutor_mode})
+        
+        checkpoint_data = {
+            "id": checkpoint.id,
+            "topic": checkpoint.topic,
+            "objectives": checkpoint.objectives,
+            "key_concepts": checkpoint.key_concepts,
+            "level": checkpoint.level
+        }
+        
+        if content_library.fill_checkpoint(db, checkpoint, checkpoint_data):
+            db.commit()
+            return {
+                "context": checkpoint.context,
+                "explanation": content_variants.explanation_for(db, checkpoint, current_user.tutor_mode),
+                "validation_score": checkpoint.validation_score
+            }
+        
+        result = run_checkpoint_workflow(
+            checkpoint=checkpoint_data,
+            tutor_mode=current_user.tutor_mode
+        )
+        
+        if result.get('fallback') or not result.get('workflow_complete'):
+            # Stand-in content from an LLM outage: show it, but leave the
+            # checkpoint ungenerated so the next request tries again.
+            logger.warning("Serving unsaved fallback content", extra={"checkpoint_id": checkpoint_id})
+            return {
+                "context": result['context'],
+                "explanation": result['explanation'],
+                "validation_score": result['validation_score']
+            }
+        
+        checkpoint.context = result['context']
+        checkpoint.explanation = result['explanation']
+        checkpoint.content_tutor_mode = current_user.tutor_mode
+        checkpoint.validation_score = result['validation_score']
+        # The workflow also generates questions; keep them so the questions
+        # endpoint does not generate a second set.
+        if result['questions'] and not question_store.checkpoint_questions(checkpoint):
+            question_store.set_checkpoint_questions(db, checkpoint, result['questions'])
+        checkpoint.content_generated = True
+        
+        db.commit()
+        db.refresh(checkpoint)
+        
+        logger.info("Checkpoint content generated", extra={"checkpoint_id": checkpoint_id})
+        
+        return {
+            "context": result['context'],
+            "explanation": result['explanation'],
+            "validation_score": result['validation_score']
+        }
     
-    return {
-        "context": result['context'],
-        "explanation": result['explanation'],
-        "validation_score": result['validation_score']
-    }
+    content = singleflight.run(f"checkpoint-content:{checkpoint.id}", generate, db=db, lock=f"checkpoint:{checkpoint.id}")
+    return http_cache.cached_json(request, content)
 
 @router.get("/{session_id}/checkpoints/{checkpoint_id}/questions")
-def get_checkpoint_questions(session_id: int, checkpoint_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_checkpoint_questions(session_id: int, checkpoint_id: int, request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     
     checkpoint = db.query(Checkpoint).filter(
         Checkpoint.id == checkpoint_id,
         Checkpoint.session_id == session_id
+    ).options(
+        undefer_group("questions"),
+        joinedload(Checkpoint.question_set),
+        joinedload(Checkpoint.content)
     ).first()
     
     if not checkpoint:
         raise HTTPException(status_code=404, detail="Checkpoint not found")
     
-    if checkpoint.questions_cache:
-        print(f"✓ Returning cached questions for checkpoint {checkpoint_id}")
-        return {"questions": checkpoint.questions_cache}
-    
-    print(f"❓ Generating questions for checkpoint {checkpoint_id}: {checkpoint.topic}")
-    print(f"👤 Using tutor mode: {current_user.tutor_mode}")
-    
-    checkpoint_data = {
-        "id": checkpoint.id,
-        "topic": checkpoint.topic,
-        "objectives": checkpoint.objectives,
-        "key_concepts": checkpoint.key_concepts,
-        "level": checkpoint.level
-    }
+    cached_questions = question_store.checkpoint_questions(checkpoint)
+    if cached_questions:
+        logger.debug("Checkpoint questions cache hit", extra={"checkpoint_id": checkpoint_id})
+        return http_cache.cached_json(request, {"questions": cached_questions})
     
-    if not checkpoint.content_generated:
-        result = run_checkpoint_workflow(
+    def generate():
+        db.refresh(checkpoint)
+        cached_questions = question_store.checkpoint_questions(checkpoint)
+        if cached_questions:
+            return {"questions": cached_questions}
+        
+        logger.info("Generating checkpoint questions", extra={"checkpoint_id": checkpoint_id, "tutor_mode": current_user.tutor_mode})
+        
+        checkpoint_data = {
+            "id": checkpoint.id,
+            "topic": checkpoint.topic,
+            "objectives": checkpoint.objectives,
+            "key_concepts": checkpoint.key_concepts,
+            "level": checkpoint.level
+        }
+        
+        if not checkpoint.content_generated and content_library.fill_checkpoint(db, checkpoint, checkpoint_data):
+            db.commit()
+            cached_questions = question_store.checkpoint_questions(checkpoint)
+            if cached_questions:
+                return {"questions": cached_questions}
+        
+        if not checkpoint.content_generated:
+            result = run_checkpoint_workflow(
+                checkpoint=checkpoint_data,
+                tutor_mode=current_user.tutor_mode
+            )
+        
+            if result.get('fallback') or not result.get('workflow_complete'):
+                logger.warning("Serving unsaved fallback questions", extra={"checkpoint_id": checkpoint_id})
+                return {"questions": result['questions']}
+        
+            checkpoint.context = result['context']
+            checkpoint.explanation = result['explanation']
+            checkpoint.content_tutor_mode = current_user.tutor_mode
+            checkpoint.validation_score = result['validation_score']
+            question_store.set_checkpoint_questions(db, checkpoint, result['questions'])
+            checkpoint.content_generated = True
+        
+            db.commit()
+            db.refresh(checkpoint)
+        
+            logger.info("Checkpoint content generated with questions", extra={"checkpoint_id": checkpoint_id})
+        
+            return {"questions": result['questions']}
+        
+        questions = question_generator.generate_questions(
             checkpoint=checkpoint_data,
-            tutor_mode=current_user.tutor_mode
+            context=checkpoint.context,
+            level=checkpoint.level,
+            tutor_mode=current_user.tutor_mode,
+            session_id=session_id  
         )
         
-        checkpoint.context = result['context']
-        checkpoint.explanation = result['explanation']
-        checkpoint.validation_score = result['validation_score']
-        checkpoint.questions_cache = result['questions']
-        checkpoint.content_generated = True
+        if not questions:
+            logger.warning("Serving unsaved fallback questions", extra={"checkpoint_id": checkpoint_id})
+            return {"questions": question_generator.previous_questions(checkpoint.topic)}
         
+        question_store.set_checkpoint_questions(db, checkpoint, questions)
         db.commit()
-        db.refresh(checkpoint)
         
-        print(f"✓ Full content generated for checkpoint {checkpoint_id}")
+        logger.info("Checkpoint questions generated", extra={"checkpoint_id": checkpoint_id})
         
-        return {"questions": result['questions']}
-    
-    questions = question_generator.generate_questions(
-        checkpoint=checkpoint_data,
-        context=checkpoint.context,
-        level=checkpoint.level,
-        tutor_mode=current_user.tutor_mode,
-        session_id=session_id  
-    )
-    
-    checkpoint.questions_cache = questions
-    db.commit()
-    
-    print(f"✓ Questions generated and cached for checkpoint {checkpoint_id}")
+        return {"questions": questions}
     
-    return {"questions": questions}
+    questions = singleflight.run(f"checkpoint-questions:{checkpoint.id}", generate, db=db, lock=f"checkpoint:{checkpoint.id}")
+    return http_cache.cached_json(request, questions)
 
 @router.post("/{session_id}/checkpoints/{checkpoint_id}/questions/retry")
 def get_retry_questions(
@@ -269,7 +386,7 @@ def get_retry_questions(
     checkpoint = db.query(Checkpoint).filter(
         Checkpoint.id == checkpoint_id,
         Checkpoint.session_id == session_id
-    ).first()
+    ).options(joinedload(Checkpoint.content)).first()
 
     if not checkpoint:
         raise HTTPException(status_code=404, detail="Checkpoint not found")
@@ -284,22 +401,33 @@ def get_retry_questions(
 
     attempt_number = checkpoint.attempts
 
-    questions = question_generator.generate_questions(
-        checkpoint=checkpoint_data,
-        context=checkpoint.context or "",
-        level=checkpoint.level,
-        tutor_mode=current_user.tutor_mode,
-        weak_areas=weak_areas or [],
-        attempt_number=attempt_number,
-        session_id=session_id
-    )
+    def generate():
+        questions = question_generator.generate_questions(
+            checkpoint=checkpoint_data,
+            context=checkpoint.context or "",
+            level=checkpoint.level,
+            tutor_mode=current_user.tutor_mode,
+            weak_areas=weak_areas or [],
+            attempt_number=attempt_number,
+            session_id=session_id
+        )
 
-    # Update the questions cache with the new targeted ones
-    checkpoint.questions_cache = questions
-    db.commit()
+        if not questions:
+            # Keep the current set rather than replacing it with another checkpoint's.
+            logger.warning("Serving unsaved fallback questions", extra={"checkpoint_id": checkpoint_id})
+            return {"questions": question_generator.previous_questions(checkpoint.topic)}
 
-    print(f"✓ Retry questions generated for checkpoint {checkpoint_id}, weak areas: {weak_areas}")
-    return {"questions": questions}
+        # Update the questions cache with the new targeted ones
+        question_store.set_checkpoint_questions(db, checkpoint, questions)
+        db.commit()
+
+        logger.info("Retry questions generated", extra={"checkpoint_id": checkpoint_id, "weak_areas": weak_areas})
+        return {"questions": questions}
+
+    # A double-submitted retry shares one new question set.
+    return singleflight.run(
+        f"retry-questions:{checkpoint.id}:{attempt_number}", generate, db=db, lock=f"checkpoint:{checkpoint.id}"
+    )
 
 
 
@@ -317,11 +445,7 @@ def complete_checkpoint(session_id: int, checkpoint_id: int, current_user: User
     checkpoint.completed_at = datetime.utcnow()
     checkpoint.xp_earned = 2
     
-    current_user.xp += 2
-    
-    if current_user.xp >= (current_user.level * 100):
-        current_user.level += 1
-        print(f"🎉 User leveled up to level {current_user.level}!")
+    award_xp(current_user, 2, "checkpoint_completed", db, source_id=checkpoint.id)
     
     analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == current_user.id).first()
     if analytics:
@@ -329,7 +453,7 @@ def complete_checkpoint(session_id: int, checkpoint_id: int, current_user: User
 
     db.commit()
     
-    print(f"✓ Checkpoint {checkpoint_id} completed")
+    logger.info("Checkpoint completed", extra={"checkpoint_id": checkpoint_id})
     
     return {
         "message": "Checkpoint completed", 
@@ -366,24 +490,19 @@ def complete_session(session_id: int, current_user: User = Depends(get_current_u
     session.completed_at = datetime.utcnow()
     session.xp_earned = total_xp
     
-    current_user.xp += total_xp
-    
-    old_level = current_user.level
-    while current_user.xp >= (current_user.level * 100):
-        current_user.level += 1
-    
-    if current_user.level > old_level:
-        print(f"🎉 User leveled up to level {current_user.level}!")
+    xp_result = award_xp(current_user, total_xp, "session_completed", db, source_id=session.id)
     
     analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == current_user.id).first()
     if analytics:
         analytics.completed_sessions += 1
     
+    record_study_activity(current_user.id, db)
+    
     db.commit()
     
     question_generator.clear_question_history(session_id)
     
-    print(f"✓ Session {session_id} completed! Total XP: {total_xp}")
+    logger.info("Session completed", extra={"session_id": session_id, "total_xp": total_xp})
     
     return {
         "message": "🎉 Congratulations! Session completed!", 
@@ -391,7 +510,7 @@ def complete_session(session_id: int, current_user: User = Depends(get_current_u
         "bonus_xp": bonus_xp,
         "total_xp_earned": total_xp, 
         "new_level": current_user.level,
-        "level_up": current_user.level > old_level
+        "level_up": xp_result["level_up"]
     }
 
 @router.get("/{session_id}/can-complete")
@@ -418,7 +537,7 @@ def can_complete_session(session_id: int, current_user: User = Depends(get_curre
     }
 
 @router.post("/{session_id}/notes/generate")
-def generate_session_notes(session_id: int, notes_type: str = "comprehensive", current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def generate_session_notes(session_id: int, notes_type: str = "comprehensive", mode: str = "llm", current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     
     session = db.query(LearningSession).filter(
         LearningSession.id == session_id,
@@ -428,54 +547,20 @@ def generate_session_notes(session_id: int, notes_type: str = "comprehensive", c
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    checkpoints = db.query(Checkpoint).filter(Checkpoint.session_id == session.id).all()
-    
-    checkpoint_data = [
-        {
-            "topic": cp.topic,
-            "objectives": cp.objectives,
-            "key_concepts": cp.key_concepts,
-            "level": cp.level
-        }
-        for cp in checkpoints
-    ]
-    
-    
     from app.models import WeakTopic
     weak_topics = db.query(WeakTopic).filter(
         WeakTopic.user_id == current_user.id
     ).order_by(WeakTopic.strength_score.asc()).limit(5).all()
     weak_areas = [wt.concept for wt in weak_topics]
     
+    if notes_type not in ("comprehensive", "cheatsheet"):
+        notes_type = "questions"
     
-    if notes_type == "comprehensive":
-        notes_content = notes_generator.generate_comprehensive_notes(
-            session.topic,
-            checkpoint_data,
-            weak_areas
-        )
-    elif notes_type == "cheatsheet":
-        notes_content = notes_generator.generate_cheat_sheet(
-            session.topic,
-            checkpoint_data
-        )
-    else:
-        notes_content = notes_generator.generate_practice_questions(
-            session.topic,
-            checkpoint_data
-        )
-    
-    
-    note = UserNote(
-        user_id=current_user.id,
-        session_id=session.id,
-        content=notes_content
-    )
-    
-    db.add(note)
-    db.commit()
-    db.refresh(note)
+    if mode not in notes_service.NOTES_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(notes_service.NOTES_MODES)}")
+    if mode == "local" and notes_type not in notes_service.LOCAL_NOTES_TYPES:
+        raise HTTPException(status_code=400, detail="Local mode supports cheatsheet and questions notes only")
     
-    print(f"✓ Generated {notes_type} notes for session {session_id}")
+    note, cached = notes_service.get_or_generate_notes(db, current_user.id, session, notes_type, weak_areas, mode)
     
-    return {"note": note, "content": notes_content}
\ No newline at end of file
+    return {"note": note, "content": note.content, "cached": cached}
\ No newline at end of file
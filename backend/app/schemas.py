@@ -140,5 +140,15 @@ class NoteResponse(BaseModel):
     content: str
     created_at: datetime
     
+    class Config:
+        from_attributes = True
+
+class XpLedgerResponse(BaseModel):
+    id: int
+    amount: int
+    reason: str
+    source_id: Optional[int]
+    created_at: datetime
+    
     class Config:
         from_attributes = True
\ No newline at end of file
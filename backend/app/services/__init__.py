@@ -1,9 +1,7 @@
-from . import checkpoint_generator
-from . import context_gatherer
-from . import explainer
-from . import question_generator
-from . import evaluator
-from . import feynman
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562) so that
+# importing app.services does not load every LLM-backed service up front.
 
 __all__ = [
     'checkpoint_generator',
@@ -13,4 +11,10 @@ __all__ = [
     'evaluator',
     'feynman',
     'workflow'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,18 +1,11 @@
+import logging
 from typing import Dict, List
 import json
 import re
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-import os
-from dotenv import load_dotenv
+from app.services import llm
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY")
-)
 
 def clean_json(text: str) -> str:
     if not text:
@@ -28,8 +21,7 @@ def safe_json_load(text: str):
     try:
         return json.loads(text)
     except Exception as e:
-        print("JSON Parse Error:", e)
-        print("RAW OUTPUT:\n", text)
+        logger.warning("Checkpoint JSON parse error", extra={"error": str(e), "raw_output": text[:2000]})
         return None
 
 def generate_checkpoints(
@@ -52,7 +44,7 @@ def generate_checkpoints(
         tutor_personalities["supportive_buddy"]
     )
     
-    system_msg = SystemMessage(content=f"""
+    system_msg = f"""
 You are an expert curriculum designer.
 
 {personality}
@@ -60,9 +52,9 @@ You are an expert curriculum designer.
 Return ONLY valid JSON array.
 No markdown.
 No explanation.
-""")
+"""
     
-    human_msg = HumanMessage(content=f"""
+    human_msg = f"""
 Create learning path for: {topic}
 
 Current: {current_level}
@@ -82,10 +74,14 @@ Format:
     "key_concepts": ["..."]
   }}
 ]
-""")
+"""
     
     try:
-        response = llm.invoke([system_msg, human_msg])
+        response = llm.chat(
+            "checkpoints", system_msg, human_msg,
+            tutor_mode=tutor_mode,
+            validate=lambda text: json.loads(clean_json(text))
+        )
         
         raw = clean_json(response.content)
         
@@ -105,9 +101,13 @@ Format:
         return data
     
     except Exception as e:
-        print("generate_checkpoints error:", e)
+        if isinstance(e, llm.LLMUnavailable):
+            logger.warning("generate_checkpoints skipped LLM", extra={"error": str(e)})
+        else:
+            logger.exception("generate_checkpoints failed")
         
-        return create_default_checkpoints(topic, current_level)
+        from app.services.fallback_content import previous_checkpoints
+        return previous_checkpoints(topic) or create_default_checkpoints(topic, current_level)
 
 def create_default_checkpoints(topic, level):
     return [
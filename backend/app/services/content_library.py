@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import Checkpoint, LibraryContent, LibraryPlan
+from app.services import question_store
+
+logger = logging.getLogger(__name__)
+
+# Reusable checkpoint plans and content, filled ahead of time by
+# scripts/warm_topics.py. Plans are keyed by the normalised session topic,
+# content by the checkpoint definition (topic, objectives, key concepts,
+# level), so any session whose plan came from the library reuses its
+# content too. Only the warm-up writes here; routes copy entries into the
+# user's own checkpoints instead of running the generators.
+
+
+def topic_key(topic: str) -> str:
+    return " ".join((topic or "").lower().split())
+
+
+def content_key(checkpoint: Dict) -> str:
+    definition = {
+        "topic": topic_key(checkpoint.get("topic")),
+        "objectives": checkpoint.get("objectives") or [],
+        "key_concepts": checkpoint.get("key_concepts") or [],
+        "level": checkpoint.get("level") or "intermediate",
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _insert_ignore(db: Session, model, values: Dict, exists):
+    if db.bind.dialect.name == "postgresql":
+        db.execute(postgresql.insert(model).values(**values).on_conflict_do_nothing())
+    elif db.bind.dialect.name == "sqlite":
+        db.execute(sqlite.insert(model).values(**values).on_conflict_do_nothing())
+    elif not exists():
+        db.add(model(**values))
+        db.flush()
+
+
+def plan(db: Session, topic: str) -> Optional[List[Dict]]:
+    """A stored checkpoint plan for `topic`, in generator format."""
+    return db.query(LibraryPlan.checkpoints).filter(LibraryPlan.topic_key == topic_key(topic)).scalar()
+
+
+def store_plan(db: Session, topic: str, checkpoints: List[Dict], tutor_mode: Optional[str]):
+    """Does not commit."""
+    values = {"topic_key": topic_key(topic), "topic": topic, "checkpoints": checkpoints, "tutor_mode": tutor_mode}
+    _insert_ignore(db, LibraryPlan, values, lambda: plan(db, topic) is not None)
+
+
+def content(db: Session, checkpoint: Dict) -> Optional[LibraryContent]:
+    return db.get(LibraryContent, content_key(checkpoint))
+
+
+def store_content(db: Session, checkpoint: Dict, tutor_mode: Optional[str], result: Dict):
+    """Store a workflow result for this checkpoint definition. Does not commit."""
+    question_set_hash = question_store.store_question_set(db, result["questions"]) if result.get("questions") else None
+    values = {
+        "content_key": content_key(checkpoint),
+        "topic": checkpoint.get("topic"),
+        "tutor_mode": tutor_mode,
+        "context": result["context"],
+        "explanation": result["explanation"],
+        "question_set_hash": question_set_hash,
+        "validation_score": result.get("validation_score"),
+    }
+    _insert_ignore(db, LibraryContent, values, lambda: content(db, checkpoint) is not None)
+
+
+def fill_checkpoint(db: Session, checkpoint: Checkpoint, checkpoint_data: Dict) -> bool:
+    """Copy library content into `checkpoint` if there is an entry for it. Does not commit."""
+    item = content(db, checkpoint_data)
+    if item is None:
+        return False
+
+    checkpoint.context = item.context
+    checkpoint.explanation = item.explanation
+    checkpoint.content_tutor_mode = item.tutor_mode
+    checkpoint.validation_score = item.validation_score
+    if item.question_set_hash and not question_store.checkpoint_questions(checkpoint):
+        checkpoint.question_set_hash = item.question_set_hash
+        checkpoint.questions_cache = None
+        db.expire(checkpoint, ["question_set"])
+    checkpoint.content_generated = True
+
+    logger.info("Checkpoint content served from library", extra={"checkpoint_id": checkpoint.id})
+    return True
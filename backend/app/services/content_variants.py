@@ -0,0 +1,100 @@
+import logging
+import threading
+from typing import Dict, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import Checkpoint, CheckpointContentVariant
+from app.services import explainer, singleflight
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint explanations per tutor mode.
+#
+# The full pipeline (gather -> validate -> explain) runs once per checkpoint
+# and its explanation is stored with the mode it was written for. A reader in
+# any other mode gets a variant restyled from that explanation by one short
+# LLM call, stored on first use. Context is shared by all variants.
+#
+# Content from before variants existed has no recorded mode; it is credited
+# to the mode of its first reader.
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(tutor_mode: str, outcome: str):
+    with _stats_lock:
+        counts = _stats.setdefault(tutor_mode, dict.fromkeys(("base", "hits", "restyled", "failed"), 0))
+        counts[outcome] += 1
+
+
+def stored_variant(db: Session, checkpoint_id: int, tutor_mode: str) -> Optional[str]:
+    return db.query(CheckpointContentVariant.explanation).filter(
+        CheckpointContentVariant.checkpoint_id == checkpoint_id,
+        CheckpointContentVariant.tutor_mode == tutor_mode
+    ).scalar()
+
+
+def store_variant(db: Session, checkpoint_id: int, tutor_mode: str, explanation: str):
+    """Insert a variant unless another request already stored one. Does not commit."""
+    values = {"checkpoint_id": checkpoint_id, "tutor_mode": tutor_mode, "explanation": explanation}
+
+    if db.bind.dialect.name == "postgresql":
+        db.execute(postgresql.insert(CheckpointContentVariant).values(**values).on_conflict_do_nothing())
+    elif db.bind.dialect.name == "sqlite":
+        db.execute(sqlite.insert(CheckpointContentVariant).values(**values).on_conflict_do_nothing())
+    elif stored_variant(db, checkpoint_id, tutor_mode) is None:
+        db.add(CheckpointContentVariant(**values))
+        db.flush()
+
+
+def explanation_for(db: Session, checkpoint: Checkpoint, tutor_mode: Optional[str]) -> str:
+    """
+    The checkpoint's explanation in `tutor_mode`, restyling and storing it on
+    first use. Falls back to the stored explanation if the restyle fails.
+    """
+    base = checkpoint.explanation
+    if not tutor_mode or not base:
+        return base
+
+    if checkpoint.content_tutor_mode is None:
+        checkpoint.content_tutor_mode = tutor_mode
+        db.commit()
+    if checkpoint.content_tutor_mode == tutor_mode:
+        _count(tutor_mode, "base")
+        return base
+
+    explanation = stored_variant(db, checkpoint.id, tutor_mode)
+    if explanation is not None:
+        _count(tutor_mode, "hits")
+        return explanation
+
+    def restyle():
+        stored = stored_variant(db, checkpoint.id, tutor_mode)
+        if stored is not None:
+            _count(tutor_mode, "hits")
+            return stored
+        try:
+            restyled = explainer.restyle_explanation(base, tutor_mode)
+        except Exception:
+            logger.warning("Restyle failed, serving stored explanation",
+                           extra={"checkpoint_id": checkpoint.id, "tutor_mode": tutor_mode}, exc_info=True)
+            _count(tutor_mode, "failed")
+            return base
+        store_variant(db, checkpoint.id, tutor_mode, restyled)
+        db.commit()
+        _count(tutor_mode, "restyled")
+        logger.info("Stored restyled explanation", extra={"checkpoint_id": checkpoint.id, "tutor_mode": tutor_mode})
+        return restyled
+
+    return singleflight.run(f"checkpoint-variant:{checkpoint.id}:{tutor_mode}", restyle, db=db)
+
+
+def stats() -> Dict:
+    """Per tutor mode: served from the base row, stored variant hits, restyles and failed restyles."""
+    with _stats_lock:
+        result = {}
+        for mode, counts in _stats.items():
+            served = sum(counts.values())
+            result[mode] = {**counts, "hit_rate": round((counts["base"] + counts["hits"]) / served, 3) if served else 0.0}
+        return result
@@ -1,17 +1,11 @@
+import logging
 from typing import Dict
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-import os
 import json
-from dotenv import load_dotenv
+from app.services import context_validator, llm
+from app.services.context_packer import pack_context
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY")
-)
 
 def gather_context(
     checkpoint: Dict,
@@ -30,9 +24,7 @@ def gather_context(
         tutor_personalities["supportive_buddy"]
     )
     
-    system_msg = SystemMessage(
-        content=f"You are an expert teacher. {personality}"
-    )
+    system_msg = f"You are an expert teacher. {personality}"
     
     objectives = "\n".join(
         f"- {o}" for o in checkpoint.get("objectives", [])
@@ -41,7 +33,7 @@ def gather_context(
     key_concepts = checkpoint.get("key_concepts", [])
     key_concepts_text = ", ".join(key_concepts) if key_concepts else "Core fundamentals"
     
-    human_msg = HumanMessage(content=f"""
+    human_msg = f"""
 TOPIC: {checkpoint.get("topic")}
 LEVEL: {checkpoint.get("level", "intermediate")}
 
@@ -53,15 +45,43 @@ KEY CONCEPTS: {key_concepts_text}
 Write comprehensive educational content (600-800 words) covering these objectives.
 Include examples, explanations, and key concepts.
 Make it thorough so students can learn effectively.
-""")
+"""
     
-    response = llm.invoke([system_msg, human_msg])
+    response = llm.chat("context", system_msg, human_msg, tutor_mode=tutor_mode)
     
     return response.content
 
 def validate_context(checkpoint: Dict, context: str) -> Dict:
+    """
+    Score context locally with embeddings; only borderline scores (or a
+    missing model) go to the LLM validator.
+    """
+    if context_validator.CONTEXT_VALIDATOR == "embedding":
+        scores = context_validator.embedding_scores(checkpoint, context)
+        if scores is not None:
+            borderline = context_validator.is_borderline(scores["score"])
+            logger.debug("Context scored locally", extra={**scores, "borderline": borderline})
+            if not borderline:
+                return scores
+    
+    return llm_validate_context(checkpoint, context)
+
+def _parse_validation(content: str) -> Dict:
+    content = content.strip()
+    
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0]
+    elif '```' in content:
+        content = content.split('```')[1].split('```')[0]
     
-    system_msg = SystemMessage(content="""You are a content quality validator.
+    validation = json.loads(content.strip())
+    if not isinstance(validation, dict) or 'score' not in validation:
+        raise ValueError("Validation response has no score")
+    return validation
+
+def llm_validate_context(checkpoint: Dict, context: str) -> Dict:
+    
+    system_msg = """You are a content quality validator.
 
 Evaluate if the educational content adequately covers the stated objectives.
 
@@ -71,11 +91,11 @@ Return ONLY JSON:
   "coverage": <0-100>,
   "clarity": <0-100>,
   "relevance": <0-100>
-}""")
+}"""
     
     objectives_text = "\n".join(f"  • {obj}" for obj in checkpoint.get('objectives', []))
     
-    human_msg = HumanMessage(content=f"""Validate this content:
+    human_msg = f"""Validate this content:
 
 TOPIC: {checkpoint.get('topic')}
 
@@ -83,26 +103,22 @@ OBJECTIVES:
 {objectives_text}
 
 CONTENT:
-{context[:2000]}
+{pack_context(context, checkpoint, "validation")}
 
-Rate the content quality and return JSON.""")
+Rate the content quality and return JSON."""
     
     try:
-        response = llm.invoke([system_msg, human_msg])
-        content = response.content.strip()
-        
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0]
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0]
-        
-        validation = json.loads(content.strip())
+        response = llm.chat("validation", system_msg, human_msg, validate=_parse_validation)
+        validation = _parse_validation(response.content)
         
         score = validation.get('score', 85)
         
-        print(f"  ✓ Coverage: {validation.get('coverage', score)}/100")
-        print(f"  ✓ Clarity: {validation.get('clarity', score)}/100")
-        print(f"  ✓ Relevance: {validation.get('relevance', score)}/100")
+        logger.debug("Context validated", extra={
+            "score": score,
+            "coverage": validation.get('coverage', score),
+            "clarity": validation.get('clarity', score),
+            "relevance": validation.get('relevance', score),
+        })
         
         return {
             'score': score,
@@ -112,7 +128,7 @@ Rate the content quality and return JSON.""")
         }
         
     except Exception as e:
-        print(f"⚠️ Validation error: {e}, defaulting to passing score")
+        logger.warning("Context validation failed, defaulting to passing score", extra={"error": str(e)})
         return {
             'score': 85,
             'coverage': 85,
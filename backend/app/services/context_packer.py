@@ -0,0 +1,165 @@
+import logging
+import math
+import os
+import re
+import threading
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Fits gathered context into a per-call token budget by whole paragraphs,
+# keeping the ones most relevant to the checkpoint objectives, instead of
+# cutting the text at a fixed character offset.
+#
+#   CONTEXT_TOKENIZER  path to a Hugging Face tokenizer.json used for
+#                      counting. Defaults to the GPT-2 tokenizer shipped
+#                      next to this module (see tokenizer.README.md), so
+#                      nothing is downloaded. Uses a chars/4 estimate while
+#                      it loads and when the tokenizers package or the file
+#                      is missing.
+#
+# The routed models are Llama 3.x, whose tokenizer is gated on the Hub, so
+# counts and BUDGETS are approximate for the model that reads the prompt.
+
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER", os.path.join(os.path.dirname(__file__), "tokenizer.json"))
+CHARS_PER_TOKEN = 4
+
+# Prompt token budgets for the context section of each call.
+BUDGETS = {
+    "explanation": 900,
+    "questions": 900,
+    "questions_fallback": 600,
+    "validation": 600,
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "how", "in", "into",
+    "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "use", "using",
+    "what", "when", "which", "with", "understand", "explain", "learn", "apply", "identify",
+}
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+_tokenizer = None
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def _load_tokenizer():
+    global _tokenizer
+    try:
+        from tokenizers import Tokenizer
+        _tokenizer = Tokenizer.from_file(CONTEXT_TOKENIZER)
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, estimating tokens from length",
+                       extra={"tokenizer": CONTEXT_TOKENIZER, "error": str(e)})
+        _tokenizer = False
+
+
+def _get_tokenizer():
+    """
+    The counting tokenizer, or None/False while it loads or if it cannot be
+    loaded. Loading happens in a background thread so the first request is
+    not held up by it.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = threading.Thread(target=_load_tokenizer, name="tokenizer-load", daemon=True)
+                _loader.start()
+    return _tokenizer
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    tokenizer = _get_tokenizer()
+    if not tokenizer:
+        return [math.ceil(len(t) / CHARS_PER_TOKEN) for t in texts]
+    return [len(encoding.ids) for encoding in tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2}
+
+
+def _query_terms(checkpoint: Dict) -> set:
+    parts = [checkpoint.get("topic") or ""]
+    parts += [str(o) for o in checkpoint.get("objectives") or []]
+    parts += [str(c) for c in checkpoint.get("key_concepts") or []]
+    return _terms(" ".join(parts))
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Blank-line separated blocks; a heading stays attached to the block after it."""
+    blocks = [b.strip() for b in re.split(r"\n\s*\n", text or "") if b.strip()]
+    paragraphs = []
+    heading = None
+    for block in blocks:
+        if block.startswith("#") and "\n" not in block:
+            heading = block if heading is None else f"{heading}\n{block}"
+            continue
+        paragraphs.append(f"{heading}\n{block}" if heading else block)
+        heading = None
+    if heading:
+        paragraphs.append(heading)
+    return paragraphs
+
+
+def _split_oversized(paragraphs: List[str], sizes: List[int], budget: int):
+    """Break paragraphs larger than the whole budget into sentences so they can still be packed."""
+    if all(size <= budget for size in sizes):
+        return paragraphs, sizes
+    pieces = []
+    for paragraph, size in zip(paragraphs, sizes):
+        pieces.extend(_SENTENCE_SPLIT.split(paragraph) if size > budget else [paragraph])
+    return pieces, count_tokens(pieces)
+
+
+def pack_context(context: str, checkpoint: Dict, task: str, budget: int = None) -> str:
+    """
+    Return `context` trimmed to `budget` tokens (default BUDGETS[task]).
+    Paragraphs are ranked by how many objective/concept terms they cover,
+    packed greedily, and emitted in their original order. Context that
+    already fits is returned unchanged.
+    """
+    if not context:
+        return context
+    budget = budget or BUDGETS[task]
+
+    paragraphs = split_paragraphs(context)
+    sizes = count_tokens(paragraphs)
+    total = sum(sizes)
+    if total <= budget:
+        return context
+
+    paragraphs, sizes = _split_oversized(paragraphs, sizes, budget)
+    query = _query_terms(checkpoint)
+
+    def relevance(i):
+        terms = _terms(paragraphs[i])
+        # Coverage of distinct objective terms, lightly penalising length
+        # so one long paragraph does not crowd out several focused ones.
+        return len(terms & query) / math.sqrt(max(sizes[i], 1)), -i
+
+    chosen = []
+    used = 0
+    for i in sorted(range(len(paragraphs)), key=relevance, reverse=True):
+        if used + sizes[i] <= budget:
+            chosen.append(i)
+            used += sizes[i]
+
+    if not chosen:
+        # A single sentence longer than the budget; fall back to a plain cut.
+        return context[:budget * CHARS_PER_TOKEN]
+
+    packed = "\n\n".join(paragraphs[i] for i in sorted(chosen))
+    logger.info("Context packed", extra={
+        "task": task,
+        "budget": budget,
+        "tokens_in": total,
+        "tokens_out": used,
+        "tokens_saved": total - used,
+        "paragraphs_kept": len(chosen),
+        "paragraphs_total": len(paragraphs),
+    })
+    return packed
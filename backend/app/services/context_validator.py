@@ -0,0 +1,114 @@
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional
+from app.services.context_packer import split_paragraphs
+
+logger = logging.getLogger(__name__)
+
+# Scores gathered context against the checkpoint objectives with a local
+# sentence-transformers model instead of an LLM call.
+#
+#   coverage   mean over objectives of the best paragraph similarity
+#   relevance  mean over paragraphs of their similarity to the checkpoint
+#   clarity    sentence-length heuristic (long run-on sentences score lower)
+#
+# Cosine similarities are mapped linearly from [SIM_FLOOR, SIM_CEILING] onto
+# 0-100; the bounds suit MiniLM-style models, where on-topic prose sits
+# around 0.5-0.7 and unrelated text below 0.15.
+#
+#   CONTEXT_VALIDATOR        "embedding" (default) or "llm"
+#   CONTEXT_VALIDATOR_MODEL  directory holding a saved sentence-transformers
+#                            model (default backend/models/all-MiniLM-L6-v2)
+#   VALIDATOR_BORDERLINE     "LOW:HIGH"; embedding scores in [LOW, HIGH) are
+#                            re-checked by the LLM validator (default 70:85)
+#
+# The model is loaded from disk only, never downloaded by a worker. Put it
+# in place at deploy time with `python -m scripts.fetch_validator_model`;
+# until then validation goes to the LLM.
+
+CONTEXT_VALIDATOR = os.getenv("CONTEXT_VALIDATOR", "embedding")
+CONTEXT_VALIDATOR_MODEL = os.getenv(
+    "CONTEXT_VALIDATOR_MODEL",
+    os.path.join(os.path.dirname(__file__), "..", "..", "models", "all-MiniLM-L6-v2")
+)
+BORDERLINE_LOW, BORDERLINE_HIGH = (float(v) for v in os.getenv("VALIDATOR_BORDERLINE", "70:85").split(":"))
+
+SIM_FLOOR = 0.15
+SIM_CEILING = 0.6
+WEIGHTS = {"coverage": 0.5, "relevance": 0.3, "clarity": 0.2}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+_model = None
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def _load_model():
+    global _model
+    try:
+        if not os.path.isdir(CONTEXT_VALIDATOR_MODEL):
+            raise FileNotFoundError(f"{CONTEXT_VALIDATOR_MODEL} not found; run python -m scripts.fetch_validator_model")
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(CONTEXT_VALIDATOR_MODEL, local_files_only=True)
+    except Exception as e:
+        logger.warning("Embedding validator unavailable, using LLM validation",
+                       extra={"model": CONTEXT_VALIDATOR_MODEL, "error": str(e)})
+        _model = False
+
+
+def _get_model():
+    """
+    The embedding model, or None/False while it loads in the background or
+    if it cannot be loaded; validation goes to the LLM until it is ready.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = threading.Thread(target=_load_model, name="validator-model-load", daemon=True)
+                _loader.start()
+    return _model
+
+
+def _scale(similarity: float) -> float:
+    return round(100 * min(1.0, max(0.0, (similarity - SIM_FLOOR) / (SIM_CEILING - SIM_FLOOR))), 1)
+
+
+def _clarity(paragraphs) -> float:
+    sentences = [s for p in paragraphs for s in _SENTENCE_SPLIT.split(p) if s.strip()]
+    if not sentences:
+        return 0.0
+    words = sum(len(s.split()) for s in sentences) / len(sentences)
+    # Full marks up to 22 words per sentence, falling to 50 at 40 words.
+    return round(max(50.0, min(100.0, 100 - (words - 22) * 50 / 18)), 1)
+
+
+def embedding_scores(checkpoint: Dict, context: str) -> Optional[Dict]:
+    """Local validation scores, or None if the model cannot be loaded or there is nothing to compare."""
+    model = _get_model()
+    objectives = [str(o) for o in checkpoint.get("objectives") or []]
+    paragraphs = split_paragraphs(context)
+    if not model or not objectives or not paragraphs:
+        return None
+
+    topic = checkpoint.get("topic") or ""
+    query = f"{topic}: " + "; ".join(objectives)
+    vectors = model.encode(objectives + [query] + paragraphs, normalize_embeddings=True, convert_to_numpy=True)
+    objective_vecs = vectors[:len(objectives)]
+    query_vec = vectors[len(objectives)]
+    paragraph_vecs = vectors[len(objectives) + 1:]
+
+    coverage = _scale(float((objective_vecs @ paragraph_vecs.T).max(axis=1).mean()))
+    relevance = _scale(float((paragraph_vecs @ query_vec).mean()))
+    clarity = _clarity(paragraphs)
+    score = round(
+        WEIGHTS["coverage"] * coverage + WEIGHTS["relevance"] * relevance + WEIGHTS["clarity"] * clarity
+    )
+    return {"score": score, "coverage": coverage, "clarity": clarity, "relevance": relevance}
+
+
+def is_borderline(score: float) -> bool:
+    return BORDERLINE_LOW <= score < BORDERLINE_HIGH
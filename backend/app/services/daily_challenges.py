@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Set
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models import DailyChallenge, UserAnalytics
+
+DAILY_CHALLENGES = [
+    {"task": "Complete 1 full checkpoint today",                                "bonus_xp": 20},
+    {"task": "Score 80% or higher on a quiz",                                   "bonus_xp": 25},
+    {"task": "Score 100% on any quiz — perfect run!",                           "bonus_xp": 50},
+    {"task": "Complete a learning session from start to finish",                 "bonus_xp": 40},
+    {"task": "Complete 3 checkpoints in a single day",                          "bonus_xp": 60},
+    {"task": "Use the Feynman explanation on a tough topic",                     "bonus_xp": 15},
+    {"task": "Retry a failed quiz and pass it",                                  "bonus_xp": 30},
+    {"task": "Start a brand new learning topic today",                           "bonus_xp": 20},
+    {"task": "Review your weak topics in the Analytics page",                    "bonus_xp": 10},
+    {"task": "Complete a quiz without skipping any questions",                   "bonus_xp": 15},
+    {"task": "Finish a session and download your study notes",                   "bonus_xp": 20},
+    {"task": "Earn at least 10 XP today",                                        "bonus_xp": 15},
+    {"task": "Pass a quiz on your very first attempt",                           "bonus_xp": 25},
+    {"task": "Achieve a checkpoint score above 90%",                             "bonus_xp": 30},
+    {"task": "Maintain your streak — complete any study activity today!",        "bonus_xp": 10},
+    {"task": "Complete an intermediate or advanced-level checkpoint",             "bonus_xp": 35},
+    {"task": "Complete 2 different sessions today",                              "bonus_xp": 45},
+    {"task": "Explore a topic you have never studied before",                    "bonus_xp": 20},
+    {"task": "Answer 10 quiz questions correctly across any quizzes",            "bonus_xp": 25},
+    {"task": "Reach a new personal best quiz score on any checkpoint",           "bonus_xp": 30},
+]
+
+RECENT_TASK_WINDOW_DAYS = 7
+
+
+def pick_challenge(recent_tasks: Set[str]) -> Dict:
+    available = [c for c in DAILY_CHALLENGES if c["task"] not in recent_tasks]
+    if not available:
+        available = DAILY_CHALLENGES
+    return random.choice(available)
+
+
+def assign_daily_challenges(db: Session, active_days: int = 7, now: datetime = None) -> int:
+    """
+    Give every recently active user today's challenge in one bulk insert.
+
+    Users who already have a challenge for today are skipped, so running this
+    twice on the same day is harmless. Does not commit.
+    """
+    now = now or datetime.utcnow()
+    today_start = datetime(now.year, now.month, now.day)
+
+    active_user_ids = {
+        user_id for (user_id,) in db.query(UserAnalytics.user_id).filter(
+            UserAnalytics.last_study_date >= now - timedelta(days=active_days)
+        ).all()
+    }
+    if not active_user_ids:
+        return 0
+
+    already_assigned = {
+        user_id for (user_id,) in db.query(DailyChallenge.user_id).filter(
+            DailyChallenge.date >= today_start
+        ).distinct().all()
+    }
+    pending = active_user_ids - already_assigned
+    if not pending:
+        return 0
+
+    recent_by_user: Dict[int, Set[str]] = {}
+    for user_id, task in db.query(DailyChallenge.user_id, DailyChallenge.task).filter(
+        DailyChallenge.user_id.in_(pending),
+        DailyChallenge.date >= now - timedelta(days=RECENT_TASK_WINDOW_DAYS)
+    ).all():
+        recent_by_user.setdefault(user_id, set()).add(task)
+
+    rows = []
+    for user_id in pending:
+        chosen = pick_challenge(recent_by_user.get(user_id, set()))
+        rows.append({
+            "user_id": user_id,
+            "task": chosen["task"],
+            "bonus_xp": chosen["bonus_xp"],
+            "completed": False,
+            "date": now
+        })
+
+    db.execute(insert(DailyChallenge), rows)
+    return len(rows)
@@ -1,6 +1,9 @@
+import logging
 from typing import Dict, List
 import re
 
+logger = logging.getLogger(__name__)
+
 def normalize_answer(text):
     if not text:
         return ""
@@ -13,7 +16,7 @@ def evaluate_answers(
     answers: List[str]
 ) -> Dict:
     
-    print(f"Evaluating {len(answers)} answers against {len(questions)} questions")
+    logger.debug("Evaluating answers", extra={"answers": len(answers), "questions": len(questions)})
     
     correct = 0
     details = []
@@ -33,7 +36,6 @@ def evaluate_answers(
         
         if ok:
             correct += 1
-            print(f"Question {i+1}: Correct")
         else:
             tested_concept = q.get('tested_concept', q.get('key_points', ['Unknown'])[0])
             weak_areas.append(tested_concept)
@@ -46,7 +48,6 @@ def evaluate_answers(
                 'explanation': q.get('explanation')
             })
             
-            print(f"Question {i+1}: Incorrect - Weak in {tested_concept}")
         
         scores.append(score)
         
@@ -64,9 +65,7 @@ def evaluate_answers(
     
     weak_areas_unique = list(dict.fromkeys(weak_areas))[:5]
     
-    print(f"Results: {correct}/{len(questions)} correct ({avg:.1f}%)")
-    if weak_areas_unique:
-        print(f"Weak areas identified: {', '.join(weak_areas_unique)}")
+    logger.info("Answers evaluated", extra={"correct": correct, "total": len(questions), "score": round(avg, 1), "weak_areas": weak_areas_unique})
     
     return {
         "understanding_score": avg / 100,
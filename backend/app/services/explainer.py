@@ -1,16 +1,14 @@
 from typing import Dict
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-import os
-from dotenv import load_dotenv
+from app.services import llm
+from app.services.context_packer import pack_context
 
-load_dotenv()
+TUTOR_PERSONALITIES = {
+    "chill_friend": "Teach in a casual, friendly way with relatable examples.",
+    "strict_mentor": "Provide structured, detailed explanations with precision.",
+    "supportive_buddy": "Explain warmly with encouragement and clear examples.",
+    "exam_mode": "Focus on exam-relevant points with concise clarity."
+}
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY")
-)
 
 def explain_checkpoint(
     checkpoint: Dict,
@@ -18,27 +16,18 @@ def explain_checkpoint(
     tutor_mode: str = "supportive_buddy"
 ) -> str:
     
-    tutor_personalities = {
-        "chill_friend": "Teach in a casual, friendly way with relatable examples.",
-        "strict_mentor": "Provide structured, detailed explanations with precision.",
-        "supportive_buddy": "Explain warmly with encouragement and clear examples.",
-        "exam_mode": "Focus on exam-relevant points with concise clarity."
-    }
-    
-    personality = tutor_personalities.get(
+    personality = TUTOR_PERSONALITIES.get(
         tutor_mode,
-        tutor_personalities["supportive_buddy"]
+        TUTOR_PERSONALITIES["supportive_buddy"]
     )
     
-    system_msg = SystemMessage(
-        content=f"You are an educational content creator. {personality}"
-    )
+    system_msg = f"You are an educational content creator. {personality}"
     
     objectives_text = "\n".join(
         f"  • {obj}" for obj in checkpoint.get('objectives', [])
     )
     
-    human_msg = HumanMessage(content=f"""
+    human_msg = f"""
 TOPIC: {checkpoint.get('topic')}
 LEVEL: {checkpoint.get('level', 'intermediate')}
 
@@ -46,13 +35,40 @@ OBJECTIVES:
 {objectives_text}
 
 CONTENT:
-{context[:3000]}
+{pack_context(context, checkpoint, "explanation")}
 
 Create a clear, engaging explanation (600-1200 words) that teaches this topic effectively.
 Use examples, analogies, and memory aids where appropriate.
 Make it comprehensive so students can truly understand the material.
-""")
+"""
+    
+    response = llm.chat("explanation", system_msg, human_msg, tutor_mode=tutor_mode)
+    
+    return response.content
+
+
+def restyle_explanation(explanation: str, tutor_mode: str) -> str:
+    """
+    Rewrite an existing explanation in another tutor mode's voice. Much
+    cheaper than explaining from the gathered context again.
+    """
+    personality = TUTOR_PERSONALITIES.get(
+        tutor_mode,
+        TUTOR_PERSONALITIES["supportive_buddy"]
+    )
+    
+    system_msg = f"You are an educational content editor. {personality}"
+    
+    human_msg = f"""Rewrite the explanation below in this teaching voice.
+Keep every fact, example, heading and the overall structure; change only tone, phrasing and emphasis.
+Do not add new material. Return only the rewritten explanation.
+
+EXPLANATION:
+{explanation}
+"""
     
-    response = llm.invoke([system_msg, human_msg])
+    # A rewrite far shorter than the original has dropped material.
+    response = llm.chat("restyle", system_msg, human_msg, tutor_mode=tutor_mode,
+                        validate=lambda text: len(text) >= len(explanation) // 2)
     
-    return response.content
\ No newline at end of file
+    return response.content
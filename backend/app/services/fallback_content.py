@@ -0,0 +1,71 @@
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, undefer_group
+from app.database import SessionLocal
+from app.models import Checkpoint, LearningSession
+from app.services import question_store
+
+logger = logging.getLogger(__name__)
+
+# Previously generated content for the same topic, served when the LLM is
+# unavailable (circuit open, deadline passed) instead of failing the request.
+# Topics match case-insensitively; the most recent match wins.
+
+LOOKBACK = 5
+
+
+def previous_checkpoints(topic: str) -> Optional[List[Dict]]:
+    """The checkpoint plan of the latest session on `topic`, in generator format."""
+    db = SessionLocal()
+    try:
+        session_id = db.query(Checkpoint.session_id).join(LearningSession).filter(
+            func.lower(LearningSession.topic) == topic.strip().lower()
+        ).order_by(Checkpoint.session_id.desc()).limit(1).scalar()
+        if session_id is None:
+            return None
+        checkpoints = db.query(Checkpoint).filter(
+            Checkpoint.session_id == session_id
+        ).order_by(Checkpoint.checkpoint_index).all()
+        logger.info("Serving previous checkpoint plan", extra={"topic": topic, "source_session_id": session_id})
+        return [
+            {
+                "id": i,
+                "topic": cp.topic,
+                "level": cp.level,
+                "objectives": cp.objectives or [],
+                "success_threshold": 0.7,
+                "key_concepts": cp.key_concepts or [],
+            }
+            for i, cp in enumerate(checkpoints, 1)
+        ]
+    finally:
+        db.close()
+
+
+def previous_checkpoint_content(topic: str) -> Optional[Dict]:
+    """Context, explanation and questions of the latest generated checkpoint on `topic`."""
+    db = SessionLocal()
+    try:
+        candidates = db.query(Checkpoint).filter(
+            func.lower(Checkpoint.topic) == (topic or "").strip().lower(),
+            Checkpoint.content_generated.is_(True)
+        ).options(
+            joinedload(Checkpoint.content),
+            joinedload(Checkpoint.question_set),
+            undefer_group("legacy_content"),
+            undefer_group("questions")
+        ).order_by(Checkpoint.id.desc()).limit(LOOKBACK).all()
+
+        for cp in candidates:
+            if cp.context and cp.explanation:
+                logger.info("Serving previous checkpoint content", extra={"topic": topic, "source_checkpoint_id": cp.id})
+                return {
+                    "context": cp.context,
+                    "explanation": cp.explanation,
+                    "questions": question_store.checkpoint_questions(cp) or [],
+                    "validation_score": cp.validation_score or 0,
+                }
+        return None
+    finally:
+        db.close()
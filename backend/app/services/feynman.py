@@ -1,52 +1,65 @@
-from typing import Dict, List
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.5,
-    api_key=os.getenv("GROQ_API_KEY")
-)
-
-def apply_feynman_teaching(
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import Checkpoint, FeynmanExplanation, WeakTopic
+from app.observability import user_id_var
+from app.services import llm, singleflight
+
+logger = logging.getLogger(__name__)
+
+# An explanation depends only on the checkpoint, the set of weak areas, the
+# teaching approach (attempt % 5) and the tutor mode, so it is stored under a
+# hash of those and served to every later request with the same inputs.
+# Fallback text written when the LLM fails is never stored.
+
+TEACHING_APPROACHES = [
+    "everyday analogies and real-world examples",
+    "step-by-step breakdown with visual descriptions",
+    "storytelling and narrative explanation",
+    "question-answer format with guided reasoning",
+    "comparison with familiar concepts and metaphors"
+]
+
+TUTOR_PERSONALITIES = {
+    "chill_friend": "Explain like talking to a friend over coffee, using casual language and relatable examples.",
+    "strict_mentor": "Provide a rigorous, systematic explanation with precise terminology and thorough coverage.",
+    "supportive_buddy": "Give an encouraging, patient explanation that builds confidence step by step.",
+    "exam_mode": "Focus on essential points needed for exams with clear, memorizable explanations."
+}
+
+_stats = {"hits": 0, "misses": 0, "pregenerated": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def generate_feynman_explanation(
     checkpoint: Dict,
     weak_areas: List[str],
     attempt: int,
-    tutor_mode: str = "supportive_buddy"
+    tutor_mode: str = "supportive_buddy",
+    priority: Optional[str] = None
 ) -> str:
+    """Generate a re-explanation with the LLM. Raises if the call fails."""
     
-    print(f"Applying Feynman technique for checkpoint")
-    print(f"Weak areas: {weak_areas}")
-    print(f"Attempt: {attempt + 1}")
-    print(f"Tutor mode: {tutor_mode}")
-    
-    teaching_approaches = [
-        "everyday analogies and real-world examples",
-        "step-by-step breakdown with visual descriptions",
-        "storytelling and narrative explanation",
-        "question-answer format with guided reasoning",
-        "comparison with familiar concepts and metaphors"
-    ]
-    
-    current_approach = teaching_approaches[attempt % len(teaching_approaches)]
-    
-    tutor_personalities = {
-        "chill_friend": "Explain like talking to a friend over coffee, using casual language and relatable examples.",
-        "strict_mentor": "Provide a rigorous, systematic explanation with precise terminology and thorough coverage.",
-        "supportive_buddy": "Give an encouraging, patient explanation that builds confidence step by step.",
-        "exam_mode": "Focus on essential points needed for exams with clear, memorizable explanations."
-    }
+    logger.info("Applying Feynman technique", extra={"weak_areas": weak_areas, "attempt": attempt + 1, "tutor_mode": tutor_mode})
+    
+    current_approach = TEACHING_APPROACHES[attempt % len(TEACHING_APPROACHES)]
     
-    personality = tutor_personalities.get(
+    personality = TUTOR_PERSONALITIES.get(
         tutor_mode,
-        tutor_personalities["supportive_buddy"]
+        TUTOR_PERSONALITIES["supportive_buddy"]
     )
     
-    system_msg = SystemMessage(content=f"""You are a Feynman Technique expert. {personality}
+    system_msg = f"""You are a Feynman Technique expert. {personality}
 
 Your goal: Help student understand difficult concepts by:
 1. First explaining PREREQUISITE concepts needed to understand the weak areas
@@ -54,7 +67,7 @@ Your goal: Help student understand difficult concepts by:
 3. Building from basics to advanced understanding
 4. Using simple language and concrete examples
 
-Make complex ideas crystal clear.""")
+Make complex ideas crystal clear."""
     
     weak_text = "\n".join(f"  {i+1}. {area}" for i, area in enumerate(weak_areas))
     
@@ -62,7 +75,7 @@ Make complex ideas crystal clear.""")
         f"  - {obj}" for obj in checkpoint.get('objectives', [])
     )
     
-    human_msg = HumanMessage(content=f"""Re-teach using {current_approach}:
+    human_msg = f"""Re-teach using {current_approach}:
 
 TOPIC: {checkpoint.get('topic')}
 LEVEL: {checkpoint.get('level', 'intermediate')}
@@ -85,24 +98,22 @@ INSTRUCTIONS:
 6. Include concrete examples and analogies
 7. Build understanding step-by-step
 
-Create a comprehensive re-explanation (500-800 words) that ensures understanding.""")
+Create a comprehensive re-explanation (500-800 words) that ensures understanding."""
     
-    try:
-        response = llm.invoke([system_msg, human_msg])
-        
-        explanation = response.content
-        
-        print(f"Feynman explanation generated: {len(explanation)} characters")
-        print(f"Teaching approach used: {current_approach}")
-        
-        return explanation
-        
-    except Exception as e:
-        print(f"Feynman teaching error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        fallback = f"""Let me help you understand {checkpoint.get('topic')} better.
+    response = llm.chat("feynman", system_msg, human_msg, temperature=0.5, priority=priority, tutor_mode=tutor_mode)
+    
+    explanation = response.content
+    
+    logger.debug("Feynman explanation generated", extra={"chars": len(explanation), "approach": current_approach})
+    
+    return explanation
+
+
+def fallback_explanation(checkpoint: Dict, weak_areas: List[str], attempt: int) -> str:
+    current_approach = TEACHING_APPROACHES[attempt % len(TEACHING_APPROACHES)]
+    weak_text = "\n".join(f"  {i+1}. {area}" for i, area in enumerate(weak_areas))
+    
+    return f"""Let me help you understand {checkpoint.get('topic')} better.
 
 We'll focus on these areas where you struggled:
 {weak_text}
@@ -116,5 +127,128 @@ First, let's understand the basics you need to know before tackling these concep
 Now let's look at each area where you had difficulty and explain it more clearly.
 
 Remember: Understanding takes time. Let's go through this together, one step at a time."""
+
+
+def checkpoint_data(checkpoint: Checkpoint) -> Dict:
+    return {
+        "id": checkpoint.id,
+        "topic": checkpoint.topic,
+        "objectives": checkpoint.objectives,
+        "key_concepts": checkpoint.key_concepts,
+        "level": checkpoint.level
+    }
+
+
+def weak_areas_for(db: Session, user_id: int, checkpoint: Checkpoint) -> List[str]:
+    """The user's three weakest concepts on this checkpoint's topic, else its first objectives."""
+    weak_topics = db.query(WeakTopic).filter(
+        WeakTopic.user_id == user_id,
+        WeakTopic.topic == checkpoint.topic
+    ).order_by(WeakTopic.strength_score.asc()).limit(3).all()
+    
+    return [wt.concept for wt in weak_topics] if weak_topics else (checkpoint.objectives or [])[:2]
+
+
+def cache_key(checkpoint_id: int, weak_areas: List[str], attempt: int, tutor_mode: Optional[str]) -> str:
+    payload = json.dumps(
+        [checkpoint_id, sorted(weak_areas), attempt % len(TEACHING_APPROACHES), tutor_mode],
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_explanation(db: Session, key: str) -> Optional[str]:
+    return db.query(FeynmanExplanation.explanation).filter(FeynmanExplanation.cache_key == key).scalar()
+
+
+def store_explanation(db: Session, key: str, checkpoint_id: int, weak_areas: List[str], attempt: int,
+                      tutor_mode: Optional[str], explanation: str):
+    """Insert an explanation unless another request already stored one. Does not commit."""
+    values = {
+        "cache_key": key,
+        "checkpoint_id": checkpoint_id,
+        "approach_index": attempt % len(TEACHING_APPROACHES),
+        "tutor_mode": tutor_mode,
+        "weak_areas": sorted(weak_areas),
+        "explanation": explanation,
+    }
+    
+    if db.bind.dialect.name == "postgresql":
+        db.execute(postgresql.insert(FeynmanExplanation).values(**values).on_conflict_do_nothing())
+    elif db.bind.dialect.name == "sqlite":
+        db.execute(sqlite.insert(FeynmanExplanation).values(**values).on_conflict_do_nothing())
+    elif cached_explanation(db, key) is None:
+        db.add(FeynmanExplanation(**values))
+        db.flush()
+
+
+def explanation_for(
+    db: Session,
+    checkpoint: Dict,
+    weak_areas: List[str],
+    attempt: int,
+    tutor_mode: Optional[str],
+    priority: Optional[str] = None,
+    prefetch: bool = False
+) -> str:
+    """
+    The stored explanation for these inputs, generating and committing it on
+    a miss. Concurrent misses for the same key share one LLM call. Raises if
+    generation fails. `prefetch` keeps background fills out of the hit rate.
+
+    Prefetches coalesce separately from interactive requests: a student
+    asking for an explanation never waits on a call queued at prefetch
+    priority, at the cost of a duplicate call when the two overlap.
+    """
+    key = cache_key(checkpoint["id"], weak_areas, attempt, tutor_mode)
+    explanation = cached_explanation(db, key)
+    if explanation is not None:
+        _count("hits")
+        return explanation
+    
+    def generate():
+        stored = cached_explanation(db, key)
+        if stored is not None:
+            if not prefetch:
+                _count("hits")
+            return stored
+        _count("pregenerated" if prefetch else "misses")
+        generated = generate_feynman_explanation(checkpoint, weak_areas, attempt, tutor_mode, priority=priority)
+        store_explanation(db, key, checkpoint["id"], weak_areas, attempt, tutor_mode, generated)
+        db.commit()
+        return generated
+    
+    return singleflight.run(f"feynman-prefetch:{key}" if prefetch else f"feynman:{key}", generate, db=db)
+
+
+def pregenerate_variants(checkpoint_id: int, user_id: int, tutor_mode: Optional[str]):
+    """
+    Generate every teaching approach for the user's current weak areas at
+    prefetch priority, so asking for another explanation is served from the
+    cache. Meant to run as a background task after a failed quiz attempt.
+    """
+    user_id_var.set(user_id)
+    db = SessionLocal()
+    try:
+        checkpoint = db.query(Checkpoint).filter(Checkpoint.id == checkpoint_id).first()
+        if not checkpoint:
+            return
+        data = checkpoint_data(checkpoint)
+        weak_areas = weak_areas_for(db, user_id, checkpoint)
         
-        return fallback
\ No newline at end of file
+        for approach in range(len(TEACHING_APPROACHES)):
+            key = cache_key(checkpoint_id, weak_areas, approach, tutor_mode)
+            if cached_explanation(db, key) is not None:
+                continue
+            explanation_for(db, data, weak_areas, approach, tutor_mode, priority="prefetch", prefetch=True)
+    except Exception:
+        logger.warning("Feynman pre-generation stopped", extra={"checkpoint_id": checkpoint_id}, exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def cache_stats() -> Dict:
+    with _stats_lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {**_stats, "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0}
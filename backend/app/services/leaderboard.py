@@ -0,0 +1,164 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import XpLedger
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "0"))
+
+
+class Leaderboard:
+    """
+    Order-statistics view of XP totals.
+
+    Entries are kept in a SortedList as (-xp, user_id) so the best score sorts
+    first. Rank and top-N lookups are O(log n); updates are O(log n).
+    """
+
+    def __init__(self):
+        self._scores: Dict[int, int] = {}
+        self._ranked = SortedList()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def load(self, scores: Dict[int, int]):
+        ranked = SortedList((-xp, user_id) for user_id, xp in scores.items())
+        with self._lock:
+            self._scores = dict(scores)
+            self._ranked = ranked
+
+    def clear(self):
+        self.load({})
+
+    def add(self, user_id: int, delta: int):
+        with self._lock:
+            old = self._scores.get(user_id)
+            if old is not None:
+                self._ranked.remove((-old, user_id))
+            new = (old or 0) + delta
+            self._scores[user_id] = new
+            self._ranked.add((-new, user_id))
+
+    def score(self, user_id: int) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank; users with equal XP share a rank."""
+        with self._lock:
+            xp = self._scores.get(user_id)
+            if xp is None:
+                return None
+            return self._ranked.bisect_left((-xp,)) + 1
+
+    def top(self, n: int) -> List[Tuple[int, int, int]]:
+        """[(rank, user_id, xp)] for the best n users."""
+        with self._lock:
+            entries = list(self._ranked.islice(0, n))
+            result = []
+            for neg_xp, user_id in entries:
+                result.append((self._ranked.bisect_left((neg_xp,)) + 1, user_id, -neg_xp))
+            return result
+
+
+def week_start(now: datetime = None) -> datetime:
+    now = now or datetime.utcnow()
+    monday = now.date() - timedelta(days=now.weekday())
+    return datetime(monday.year, monday.month, monday.day)
+
+
+global_board = Leaderboard()
+weekly_board = Leaderboard()
+_weekly_since = week_start()
+_rebuild_lock = threading.Lock()
+
+
+def _roll_week():
+    global _weekly_since
+    current = week_start()
+    if current != _weekly_since:
+        weekly_board.clear()
+        _weekly_since = current
+
+
+def get_board(scope: str) -> Leaderboard:
+    if scope == "weekly":
+        _roll_week()
+        return weekly_board
+    return global_board
+
+
+def rebuild(db: Session = None):
+    """Reload both boards from xp_ledger totals."""
+    global _weekly_since
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        with _rebuild_lock:
+            since = week_start()
+            totals = db.query(XpLedger.user_id, func.sum(XpLedger.amount)).group_by(XpLedger.user_id).all()
+            weekly = db.query(XpLedger.user_id, func.sum(XpLedger.amount)).filter(
+                XpLedger.created_at >= since
+            ).group_by(XpLedger.user_id).all()
+
+            global_board.load({user_id: int(total) for user_id, total in totals})
+            weekly_board.load({user_id: int(total) for user_id, total in weekly})
+            _weekly_since = since
+
+        logger.info("Leaderboard rebuilt", extra={"users": len(global_board), "weekly_active": len(weekly_board)})
+    finally:
+        if own_session:
+            db.close()
+
+
+def start_refresh_loop():
+    """
+    Periodically rebuild from the ledger so awards made by other workers show up.
+
+    Disabled unless LEADERBOARD_REFRESH_SECONDS is set.
+    """
+    if LEADERBOARD_REFRESH_SECONDS <= 0:
+        return
+
+    def _tick():
+        try:
+            rebuild()
+        except Exception as e:
+            logger.exception("Leaderboard refresh failed")
+        _schedule()
+
+    def _schedule():
+        timer = threading.Timer(LEADERBOARD_REFRESH_SECONDS, _tick)
+        timer.daemon = True
+        timer.start()
+
+    _schedule()
+
+
+def record_award(db: Session, user_id: int, amount: int):
+    """Queue an XP award; it is applied to the boards once the session commits."""
+    db.info.setdefault("leaderboard_awards", []).append((user_id, amount))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_awards(session):
+    awards = session.info.pop("leaderboard_awards", None)
+    if not awards:
+        return
+    _roll_week()
+    for user_id, amount in awards:
+        global_board.add(user_id, amount)
+        weekly_board.add(user_id, amount)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_awards(session):
+    session.info.pop("leaderboard_awards", None)
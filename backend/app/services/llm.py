@@ -0,0 +1,449 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+from dotenv import load_dotenv
+from app.observability import add_timing, user_id_var
+from app.services import tracing
+from app.services.llm_scheduler import scheduler
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Model per task. Short JSON outputs go to the small model, long-form
+# teaching stays on the large one. LLM_ROUTES adds or overrides entries as a
+# comma list of "[tutor_mode:]task=model", e.g.
+#   LLM_ROUTES="questions=llama-3.3-70b-versatile,exam_mode:explanation=llama-3.1-8b-instant"
+DEFAULT_ROUTES = {
+    "validation": SMALL_MODEL,
+    "questions": SMALL_MODEL,
+    "checkpoints": SMALL_MODEL,
+    "restyle": SMALL_MODEL,
+    "context": DEFAULT_MODEL,
+    "explanation": DEFAULT_MODEL,
+    "feynman": DEFAULT_MODEL,
+    "notes": DEFAULT_MODEL,
+}
+# USD per million (input, output) tokens, for cost reporting.
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+
+def _parse_routes(spec: str) -> dict:
+    routes = {(None, task): model for task, model in DEFAULT_ROUTES.items()}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        key, _, model = entry.partition("=")
+        mode, _, task = key.rpartition(":")
+        routes[(mode or None, task.strip())] = model.strip()
+    return routes
+
+
+ROUTES = _parse_routes(os.getenv("LLM_ROUTES", ""))
+
+# Every call gets a deadline. A call still running after the task's recent
+# p95 latency is hedged with one duplicate request and the first success
+# wins. A circuit breaker opens when the recent error rate is too high, so
+# callers fail fast with LLMUnavailable and fall back to stored content
+# instead of holding a worker until Groq recovers.
+#
+#   LLM_TIMEOUT_SECONDS      deadline for one chat() call, covering the
+#                            rate-limit wait, hedging and the default-model
+#                            fallback; default 45
+#   LLM_HEDGE                "true" (default) / "false"
+#   LLM_HEDGE_MIN_SECONDS    never hedge earlier than this, default 2
+#   LLM_BREAKER_WINDOW       outcomes considered, default 20
+#   LLM_BREAKER_MIN_CALLS    outcomes needed before tripping, default 10
+#   LLM_BREAKER_ERROR_RATE   trip at this failure ratio, default 0.5
+#   LLM_BREAKER_COOLDOWN     seconds open before a half-open probe, default 30
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "45"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "true").lower() == "true"
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "2"))
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_LATENCY_SAMPLES = 200
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "32"))
+
+# Scheduler priority class per task; anything unlisted is interactive.
+TASK_PRIORITY = {"feynman": "retry", "notes": "notes"}
+# Expected completion size per task, added to the prompt estimate when
+# reserving tokens-per-minute capacity.
+COMPLETION_TOKENS = {"notes": 2500, "explanation": 1500, "questions": 1500, "context": 1200, "feynman": 1200,
+                     "restyle": 1500, "checkpoints": 800, "validation": 100}
+
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling Groq when the breaker is open or the deadline passes."""
+
+
+class CircuitBreaker:
+    def __init__(self, window: int, min_calls: int, error_rate: float, cooldown: float):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.outcomes = deque(maxlen=window)
+        self.state = "closed"
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def cancel(self):
+        """Give back a permission from allow() for a call that was never sent."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if self.state == "half_open":
+                if ok:
+                    self.state = "closed"
+                    self.outcomes.clear()
+                    logger.info("LLM circuit closed")
+                else:
+                    self._open()
+                return
+            self.outcomes.append(ok)
+            failures = self.outcomes.count(False)
+            if (self.state == "closed" and len(self.outcomes) >= self.min_calls
+                    and failures / len(self.outcomes) >= self.error_rate):
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._probe_in_flight = False
+        logger.warning("LLM circuit opened", extra={"failures": self.outcomes.count(False), "window": len(self.outcomes)})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            outcomes = list(self.outcomes)
+            return {
+                "state": self.state,
+                "error_rate": round(outcomes.count(False) / len(outcomes), 3) if outcomes else 0.0,
+                "window": len(outcomes),
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state != "closed" else 0,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+breaker = CircuitBreaker(
+    window=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "10")),
+    error_rate=float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5")),
+    cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+)
+
+_latencies = {}
+_route_stats = {}
+_call_stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "errors": 0}
+_stats_lock = threading.Lock()
+# Per-caller usage totals, shared by reference with the LLM pool threads
+# that copy the caller's context (see track_usage()).
+_usage_var = contextvars.ContextVar("llm_usage", default=None)
+_executor = None
+_executor_lock = threading.Lock()
+
+# ChatGroq clients keyed by (model, temperature), built on first use so that
+# importing a service does not pull in langchain_groq or open connections.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(temperature: float = 0.0, model: str = DEFAULT_MODEL):
+    key = (model, temperature)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                from langchain_groq import ChatGroq
+                client = ChatGroq(
+                    model=model,
+                    temperature=temperature,
+                    api_key=os.getenv("GROQ_API_KEY"),
+                    request_timeout=LLM_TIMEOUT_SECONDS,
+                )
+                _clients[key] = client
+    return client
+
+
+def route(task: str, tutor_mode: Optional[str] = None) -> str:
+    """Model for `task`, preferring a tutor-mode specific route."""
+    return ROUTES.get((tutor_mode, task)) or ROUTES.get((None, task)) or DEFAULT_MODEL
+
+
+def chat(
+    task: str,
+    system: Optional[str],
+    human: str,
+    temperature: float = 0.0,
+    priority: Optional[str] = None,
+    tutor_mode: Optional[str] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+):
+    """
+    Single entry point for chat completions. `task` names the caller
+    (e.g. "explanation", "questions") for logging and routing; `priority`
+    overrides the scheduler class from TASK_PRIORITY.
+
+    The model comes from the routing table. When `validate` is given and
+    rejects (or raises on) the output of a routed smaller model, the call is
+    repeated once on DEFAULT_MODEL.
+
+    Returns the LangChain message; read `.content` for the text.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    messages = [HumanMessage(content=human)]
+    if system:
+        messages.insert(0, SystemMessage(content=system))
+
+    estimated = (len(system or "") + len(human)) // 4 + COMPLETION_TOKENS.get(task, 1000)
+    priority = priority or TASK_PRIORITY.get(task, "interactive")
+    model = route(task, tutor_mode)
+    deadline = time.monotonic() + LLM_TIMEOUT_SECONDS
+
+    response = _call(task, model, messages, temperature, priority, estimated, deadline)
+    if validate is None or model == DEFAULT_MODEL or _passes(validate, response.content):
+        return response
+
+    _route_stat(task, model, "fallbacks")
+    logger.info("Routed model output failed validation, retrying on default model",
+                extra={"task": task, "model": model, "fallback_model": DEFAULT_MODEL})
+    return _call(task, DEFAULT_MODEL, messages, temperature, priority, estimated, deadline)
+
+
+def _passes(validate, content) -> bool:
+    try:
+        return bool(validate(content))
+    except Exception:
+        return False
+
+
+def _route_stat(task: str, model: str, key: str, amount: float = 1):
+    with _stats_lock:
+        stats = _route_stats.setdefault((task, model), dict.fromkeys(
+            ("calls", "errors", "fallbacks", "latency_ms", "prompt_tokens", "completion_tokens"), 0))
+        stats[key] += amount
+
+
+@contextmanager
+def track_usage():
+    """
+    Collect calls, errors, tokens and cost of the LLM calls made in this
+    context, e.g. to report what one batch job or topic cost.
+    """
+    usage = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+    token = _usage_var.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_var.reset(token)
+
+
+def _track_usage(model: str, ok: bool, prompt_tokens: int = 0, completion_tokens: int = 0):
+    usage = _usage_var.get()
+    if usage is None:
+        return
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    with _stats_lock:
+        usage["calls"] += 1
+        usage["errors"] += 0 if ok else 1
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage["cost_usd"] += (prompt_tokens * price_in + completion_tokens * price_out) / 1e6
+
+
+def _call(task: str, model: str, messages, temperature: float, priority: str, estimated: int, deadline: float):
+    # Everything that can fail before the request is sent happens before
+    # the scheduler reservation; from _submit on, the request settles it.
+    client = get_client(temperature, model)
+    if not breaker.allow():
+        _track_usage(model, False)
+        raise LLMUnavailable(f"LLM circuit open, skipping {task} call")
+    if not scheduler.acquire(priority, user_id_var.get(), estimated, timeout=deadline - time.monotonic()):
+        breaker.cancel()
+        _track_usage(model, False)
+        raise LLMUnavailable(f"{task} call ran out of its {LLM_TIMEOUT_SECONDS:.0f}s deadline waiting for rate limit capacity")
+
+    route_key = f"{task}@{model}"
+    started = time.perf_counter()
+    ok = False
+    token_usage = {}
+    try:
+        with tracing.span(f"llm.{task}", model=model, temperature=temperature):
+            response = _invoke_with_deadline(route_key, client, messages, estimated, deadline)
+        ok = True
+        token_usage = _token_usage(response)
+        _route_stat(task, model, "prompt_tokens", token_usage.get("prompt_tokens", 0))
+        _route_stat(task, model, "completion_tokens", token_usage.get("completion_tokens", 0))
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        breaker.record(ok)
+        add_timing("llm", elapsed)
+        _route_stat(task, model, "calls")
+        _route_stat(task, model, "latency_ms", elapsed * 1000)
+        if not ok:
+            _route_stat(task, model, "errors")
+        _track_usage(model, ok, token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0))
+        with _stats_lock:
+            _call_stats["calls"] += 1
+            if ok:
+                _latencies.setdefault(route_key, deque(maxlen=LLM_LATENCY_SAMPLES)).append(elapsed)
+            else:
+                _call_stats["errors"] += 1
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="llm")
+    return _executor
+
+
+def _token_usage(message) -> dict:
+    return (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+
+
+def _submit(client, messages, estimated: int):
+    """
+    Send one request on the LLM pool. When it finishes, won or abandoned,
+    its token reservation is corrected to the real usage; a failed request
+    gives its reservation back.
+    """
+    def settle(future):
+        error = future.exception()
+        scheduler.settle(estimated, 0 if error is not None else _token_usage(future.result()).get("total_tokens"))
+
+    future = _pool().submit(contextvars.copy_context().run, _generate, client, messages)
+    future.add_done_callback(settle)
+    return future
+
+
+def _generate(client, messages):
+    """client.invoke, but keeping the provider's token usage on the message as response_metadata."""
+    result = client.generate([messages])
+    message = result.generations[0][0].message
+    if not getattr(message, "response_metadata", None):
+        message.response_metadata = result.llm_output or {}
+    return message
+
+
+def _hedge_delay(route_key: str) -> Optional[float]:
+    """Recent p95 latency for a task@model route, or None until there are enough samples to trust it."""
+    with _stats_lock:
+        samples = sorted(_latencies.get(route_key, ()))
+    if not LLM_HEDGE or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    return max(LLM_HEDGE_MIN_SECONDS, samples[int(len(samples) * 0.95) - 1])
+
+
+def _invoke_with_deadline(route_key: str, client, messages, estimated: int, deadline: float):
+    """
+    Run the request on the LLM pool, sending one hedge request once the
+    p95 delay passes. Abandoned requests finish in the background (bounded by
+    the client's request_timeout); the caller is released at `deadline`
+    (time.monotonic()).
+    """
+    started = time.monotonic()
+    primary = _submit(client, messages, estimated)
+    hedge_at = _hedge_delay(route_key)
+    pending = {primary}
+    error = None
+
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        timeout = deadline - now
+        if hedge_at is not None:
+            timeout = min(timeout, max(0.0, started + hedge_at - now))
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    with _stats_lock:
+                        _call_stats["hedge_wins"] += 1
+                return future.result()
+            error = future.exception()
+
+        if hedge_at is not None and pending and time.monotonic() >= started + hedge_at:
+            hedge_at = None
+            if breaker.state == "closed" and scheduler.try_acquire(estimated):
+                pending.add(_submit(client, messages, estimated))
+                with _stats_lock:
+                    _call_stats["hedged"] += 1
+                logger.debug("Hedging LLM call", extra={"route": route_key})
+
+    if error is not None and not pending:
+        raise error
+    with _stats_lock:
+        _call_stats["timeouts"] += 1
+    raise LLMUnavailable(f"{route_key} call ran out of its {LLM_TIMEOUT_SECONDS:.0f}s deadline")
+
+
+def route_stats() -> dict:
+    """Per task@model call counts, mean latency, token cost and fallback rate."""
+    with _stats_lock:
+        snapshot = {key: dict(stats) for key, stats in _route_stats.items()}
+    report = {}
+    for (task, model), stats in sorted(snapshot.items()):
+        price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+        calls = stats["calls"] or 1
+        report[f"{task}@{model}"] = {
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "mean_latency_ms": round(stats["latency_ms"] / calls, 1),
+            "prompt_tokens": stats["prompt_tokens"],
+            "completion_tokens": stats["completion_tokens"],
+            "cost_usd": round((stats["prompt_tokens"] * price_in + stats["completion_tokens"] * price_out) / 1e6, 4),
+            "fallback_rate": round(stats["fallbacks"] / calls, 3),
+        }
+    return report
+
+
+def health() -> dict:
+    """Breaker state, call counters, hedge delays, scheduler queues and routes, for /health/llm."""
+    with _stats_lock:
+        stats = dict(_call_stats)
+        tasks = list(_latencies)
+    return {
+        "breaker": breaker.snapshot(),
+        "calls": stats,
+        "hedge_delay_seconds": {t: (round(d, 2) if (d := _hedge_delay(t)) else None) for t in tasks},
+        "timeout_seconds": LLM_TIMEOUT_SECONDS,
+        "scheduler": scheduler.stats(),
+        "routes": route_stats(),
+    }
@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Admission control for outbound LLM calls. Every call takes one request
+# from the requests-per-minute bucket and its estimated tokens from the
+# tokens-per-minute bucket; when either is short, callers queue. Queues are
+# served strictly by priority class and round-robin across users within a
+# class, so one user's notes burst cannot starve another student's quiz.
+#
+#   LLM_RPM   requests per minute, default 1000 (0 disables the bucket)
+#   LLM_TPM   tokens per minute, default 300000 (0 disables the bucket)
+#
+# Token estimates are corrected with the usage Groq reports once the call
+# finishes (see settle()).
+
+LLM_RPM = float(os.getenv("LLM_RPM", "1000"))
+LLM_TPM = float(os.getenv("LLM_TPM", "300000"))
+
+PRIORITIES = ("interactive", "retry", "prefetch", "notes")
+WAIT_SAMPLES = 500
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def shortfall_seconds(self, amount: float) -> float:
+        """Seconds until `amount` is available (amounts above capacity only need a full bucket)."""
+        if not self.enabled:
+            return 0.0
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+
+class Ticket:
+    __slots__ = ("priority", "user", "tokens", "enqueued")
+
+    def __init__(self, priority: str, user, tokens: int):
+        self.priority = priority
+        self.user = user
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+
+
+class LLMScheduler:
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._queues = {p: OrderedDict() for p in PRIORITIES}
+        self._waits = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES}
+        self._granted = {p: 0 for p in PRIORITIES}
+        self._timeouts = {p: 0 for p in PRIORITIES}
+
+    def set_limits(self, rpm: float, tpm: float):
+        """Replace both buckets (batch jobs leave headroom for the live app sharing the API key)."""
+        with self._cond:
+            self.requests = TokenBucket(rpm)
+            self.tokens = TokenBucket(tpm)
+            self._cond.notify_all()
+
+    def _head(self) -> Optional[Ticket]:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _pop(self, ticket: Ticket):
+        queue = self._queues[ticket.priority]
+        tickets = queue[ticket.user]
+        tickets.popleft()
+        if tickets:
+            # Round robin: the user's next ticket waits behind other users.
+            queue.move_to_end(ticket.user)
+        else:
+            del queue[ticket.user]
+
+    def _remove(self, ticket: Ticket):
+        queue = self._queues[ticket.priority]
+        tickets = queue.get(ticket.user)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del queue[ticket.user]
+
+    def _try_take(self, tokens: int) -> float:
+        """Deduct one request and `tokens` if both are available; otherwise return seconds to wait."""
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.shortfall_seconds(1), self.tokens.shortfall_seconds(tokens))
+        if wait > 0:
+            return wait
+        if self.requests.enabled:
+            self.requests.level -= 1
+        if self.tokens.enabled:
+            self.tokens.level -= tokens
+        return 0.0
+
+    def acquire(self, priority: str, user, tokens: int, timeout: float) -> bool:
+        """Block until this call may go out. Returns False if `timeout` passes first."""
+        ticket = Ticket(priority if priority in PRIORITIES else "interactive", user, tokens)
+        deadline = ticket.enqueued + timeout
+        with self._cond:
+            self._queues[ticket.priority].setdefault(user, deque()).append(ticket)
+            while True:
+                wait = self._try_take(tokens) if self._head() is ticket else None
+                if wait == 0.0:
+                    self._pop(ticket)
+                    self._granted[ticket.priority] += 1
+                    self._waits[ticket.priority].append(time.monotonic() - ticket.enqueued)
+                    self._cond.notify_all()
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(ticket)
+                    self._timeouts[ticket.priority] += 1
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(min(remaining, wait) if wait else remaining)
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take capacity only if nobody is queued and it is available now (used for hedge requests)."""
+        with self._cond:
+            return self._head() is None and self._try_take(tokens) == 0.0
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the real usage of a call is known (0 refunds the estimate)."""
+        if actual is None or not self.tokens.enabled:
+            return
+        with self._cond:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            classes = {}
+            for priority in PRIORITIES:
+                waits = sorted(self._waits[priority])
+                classes[priority] = {
+                    "queued": sum(len(t) for t in self._queues[priority].values()),
+                    "queued_users": len(self._queues[priority]),
+                    "granted": self._granted[priority],
+                    "timeouts": self._timeouts[priority],
+                    "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                    "wait_ms_p95": round(waits[int(len(waits) * 0.95) - 1] * 1000, 1) if len(waits) >= 20 else None,
+                    "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+                }
+            return {
+                "rpm_available": round(self.requests.level, 1) if self.requests.enabled else None,
+                "tpm_available": round(self.tokens.level) if self.tokens.enabled else None,
+                "classes": classes,
+            }
+
+
+scheduler = LLMScheduler(LLM_RPM, LLM_TPM)
@@ -0,0 +1,171 @@
+import re
+from datetime import datetime
+from typing import Dict, List
+
+# Extractive cheat sheets and practice sets built from content the session
+# already stores: checkpoint explanations and validated question sets.
+# No LLM calls; scikit-learn is imported on first use.
+
+SENTENCES_PER_CHECKPOINT = 4
+QUESTIONS_PER_CHECKPOINT = 3
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+
+_MARKDOWN = re.compile(r"[#*_`>|]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Plain sentences from markdown-ish explanation text, skipping headings and fragments."""
+    sentences = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        line = _MARKDOWN.sub("", line).strip(" -•\t")
+        for sentence in _SENTENCE_SPLIT.split(line):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= 6:
+                sentences.append(sentence)
+    return sentences
+
+
+def key_sentences(text: str, limit: int = SENTENCES_PER_CHECKPOINT, boost_terms: List[str] = None) -> List[str]:
+    """
+    TextRank over TF-IDF sentence vectors: sentences similar to many other
+    sentences rank highest. Sentences mentioning a key concept get a small
+    boost. Returned in their original order.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= limit:
+        return sentences
+
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    try:
+        matrix = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    except ValueError:
+        return sentences[:limit]
+
+    similarity = (matrix @ matrix.T).toarray()
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = 1.0
+    transition = similarity / row_sums
+
+    n = len(sentences)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * transition.T @ scores
+
+    terms = [t.lower() for t in (boost_terms or []) if t]
+    if terms:
+        for i, sentence in enumerate(sentences):
+            lowered = sentence.lower()
+            if any(t in lowered for t in terms):
+                scores[i] *= 1.25
+
+    top = sorted(np.argsort(-scores)[:limit])
+    return [sentences[i] for i in top]
+
+
+def build_cheat_sheet(session_topic: str, checkpoints: List[Dict]) -> str:
+    """checkpoints: dicts with topic, key_concepts and explanation."""
+    blocks = []
+    for cp in checkpoints:
+        concepts = cp.get("key_concepts") or []
+        lines = [f"## {cp.get('topic')}"]
+        if concepts:
+            lines.append(f"**Key concepts:** {', '.join(concepts)}")
+        points = key_sentences(cp.get("explanation") or "", boost_terms=concepts)
+        if points:
+            lines.append("")
+            lines.extend(f"- {p}" for p in points)
+        elif not concepts:
+            continue
+        blocks.append("\n".join(lines))
+
+    body = "\n\n".join(blocks) or "_No generated content yet. Work through a checkpoint to build this sheet._"
+
+    return f"""# {session_topic} - Quick Reference
+
+**Generated:** {datetime.now().strftime("%B %d, %Y")}
+
+---
+
+{body}
+
+---
+
+*Quick reference only - Review full notes for details*
+"""
+
+
+def _question_key(question: Dict) -> str:
+    return re.sub(r"\s+", " ", str(question.get("question", "")).strip().lower())
+
+
+def pick_practice_questions(
+    questions: List[Dict],
+    weak_areas: List[str] = None,
+    limit: int = QUESTIONS_PER_CHECKPOINT
+) -> List[Dict]:
+    """Distinct questions, those testing a weak area first."""
+    weak = [w.lower() for w in (weak_areas or [])]
+    seen = set()
+    unique = []
+    for q in questions:
+        key = _question_key(q)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(q)
+
+    def is_weak(q):
+        concept = str(q.get("tested_concept", "")).lower()
+        return bool(concept) and any(concept in w or w in concept for w in weak)
+
+    unique.sort(key=lambda q: not is_weak(q))
+    return unique[:limit]
+
+
+def build_practice_set(session_topic: str, checkpoints: List[Dict], weak_areas: List[str] = None) -> str:
+    """checkpoints: dicts with topic and questions (stored MCQs for that checkpoint)."""
+    blocks = []
+    answers = []
+    number = 0
+    for cp in checkpoints:
+        picked = pick_practice_questions(cp.get("questions") or [], weak_areas)
+        if not picked:
+            continue
+        lines = [f"## {cp.get('topic')}"]
+        for q in picked:
+            number += 1
+            lines.append(f"\n**{number}. {q.get('question')}**")
+            for letter, option in zip("ABCDEFGH", q.get("options") or []):
+                lines.append(f"- {letter}) {option}")
+            answer = f"**{number}.** {q.get('correct_answer')}"
+            if q.get("explanation"):
+                answer += f" - {q.get('explanation')}"
+            answers.append(answer)
+        blocks.append("\n".join(lines))
+
+    if not blocks:
+        body = "_No stored questions yet. Take a checkpoint quiz to build a practice set._"
+    else:
+        body = "\n\n".join(blocks) + "\n\n---\n\n## Answer Key\n\n" + "\n\n".join(answers)
+
+    return f"""# {session_topic} - Practice Questions
+
+**Generated:** {datetime.now().strftime("%B %d, %Y")}
+
+Test your understanding with these practice questions!
+
+---
+
+{body}
+
+---
+
+*Practice makes perfect! Keep testing yourself! 🎯*
+"""
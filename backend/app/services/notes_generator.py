@@ -1,25 +1,88 @@
-from typing import Dict, List
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
+import logging
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import os
 from datetime import datetime
-from dotenv import load_dotenv
+from app.services import llm
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY")
-)
+NOTES_MAX_WORKERS = int(os.getenv("NOTES_MAX_WORKERS", "4"))
+
+def record_usage(usage: Optional[Dict], response):
+    """Accumulate call count and token usage reported by Groq, if the caller asked for it."""
+    if usage is None:
+        return
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage", {})
+    usage["llm_calls"] = usage.get("llm_calls", 0) + 1
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + token_usage.get("prompt_tokens", 0)
+    usage["completion_tokens"] = usage.get("completion_tokens", 0) + token_usage.get("completion_tokens", 0)
+    usage["total_tokens"] = usage.get("total_tokens", 0) + token_usage.get("total_tokens", 0)
+
+def _wrap_comprehensive(session_topic: str, checkpoint_count: int, body: str) -> str:
+    return f"""# Complete Learning Notes: {session_topic}
+
+**Generated:** {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
+**Total Checkpoints:** {checkpoint_count}
+
+---
+
+{body}
+
+---
+
+## 📌 Study Tips for Mastery
+
+1. **Spaced Repetition**: Review these notes at increasing intervals
+   - Day 1: After completion
+   - Day 3: First review
+   - Week 1: Second review
+   - Week 2: Third review
+   - Month 1: Long-term retention check
+
+2. **Active Recall**: Test yourself without looking at notes
+   - Cover sections and try to remember
+   - Explain concepts out loud
+   - Teach someone else
+
+3. **Feynman Technique**: Simplify and explain
+   - Explain in simple words
+   - Identify gaps in understanding
+   - Review and simplify further
+
+4. **Practice Application**: Use what you learned
+   - Work on real projects
+   - Solve related problems
+   - Build something practical
+
+5. **Community Engagement**: Learn with others
+   - Join online forums
+   - Participate in discussions
+   - Share your knowledge
+
+## 🎯 Action Items
+
+- [ ] Review all checkpoints systematically
+- [ ] Complete all practice questions
+- [ ] Build a project using {session_topic}
+- [ ] Teach these concepts to someone
+- [ ] Explore advanced topics
+
+---
+
+*Generated by Conceptly - Your AI Learning Companion*
+*Keep learning, keep growing! 🌱*
+"""
 
 def generate_comprehensive_notes(
     session_topic: str,
     checkpoints: List[Dict],
-    weak_areas: List[str] = None
+    weak_areas: List[str] = None,
+    usage: Dict = None
 ) -> str:
     
-    system_msg = SystemMessage(content="""You are an expert study notes creator.
+    system_msg = """You are an expert study notes creator.
 
 Create comprehensive, well-structured study notes with:
 - Clear section organization
@@ -28,16 +91,16 @@ Create comprehensive, well-structured study notes with:
 - Review questions
 - Practical applications
 
-Use markdown formatting for structure.""")
+Use markdown formatting for structure."""
     
     checkpoints_text = "\n".join([
-        f"{i+1}. {cp.get('topic')} (Level: {cp.get('level', 'intermediate')})"
+        f"{i+1}. {cp.get('topic')} (Level: {cp.get('level', 'intermediate')}; {_progress_text(cp)})"
         for i, cp in enumerate(checkpoints)
     ])
     
     weak_areas_text = "\n".join(f"- {area}" for area in (weak_areas or []))
     
-    human_msg = HumanMessage(content=f"""Create comprehensive study notes for:
+    human_msg = f"""Create comprehensive study notes for:
 
 MAIN TOPIC: {session_topic}
 
@@ -56,72 +119,211 @@ Create detailed notes with:
 6. Study tips
 7. Next steps
 
-Format: Markdown with clear headers and structure.""")
+Format: Markdown with clear headers and structure."""
     
-    response = llm.invoke([system_msg, human_msg])
+    response = llm.chat("notes", system_msg, human_msg)
     
-    notes = f"""# Complete Learning Notes: {session_topic}
+    record_usage(usage, response)
+    
+    return _wrap_comprehensive(session_topic, len(checkpoints), response.content)
 
-**Generated:** {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
-**Total Checkpoints:** {len(checkpoints)}
+def _progress_text(checkpoint: Dict) -> str:
+    status = checkpoint.get('status') or "pending"
+    score = checkpoint.get('score')
+    if score is None:
+        return status
+    return f"{status}, understanding {score}%"
 
----
+def _fallback_section(index: int, checkpoint: Dict) -> str:
+    objectives = "\n".join(f"- {o}" for o in checkpoint.get('objectives', []))
+    concepts = ", ".join(checkpoint.get('key_concepts', [])) or "Core fundamentals"
+    return f"""## {index}. {checkpoint.get('topic')}
 
-{response.content}
+**Level:** {checkpoint.get('level', 'intermediate')}
 
----
+### Objectives
+{objectives}
 
-## 📌 Study Tips for Mastery
+### Key Concepts
+{concepts}
+"""
 
-1. **Spaced Repetition**: Review these notes at increasing intervals
-   - Day 1: After completion
-   - Day 3: First review
-   - Week 1: Second review
-   - Week 2: Third review
-   - Month 1: Long-term retention check
+def generate_checkpoint_section(
+    session_topic: str,
+    index: int,
+    checkpoint: Dict,
+    weak_areas: List[str] = None,
+    usage: Dict = None
+) -> str:
+    """Map step: notes for a single checkpoint, headed '## {index}. {topic}'."""
+    
+    system_msg = """You are an expert study notes creator.
 
-2. **Active Recall**: Test yourself without looking at notes
-   - Cover sections and try to remember
-   - Explain concepts out loud
-   - Teach someone else
+Write ONE section of a larger set of study notes.
+Use markdown. Start with the exact heading you are given and use ### for sub-headings.
+Do not write a table of contents, introduction or conclusion for the whole document."""
+    
+    objectives_text = "\n".join(f"- {o}" for o in checkpoint.get('objectives', []))
+    concepts_text = ", ".join(checkpoint.get('key_concepts', [])) or "Core fundamentals"
+    weak_text = "\n".join(f"- {area}" for area in (weak_areas or []))
+    
+    human_msg = f"""MAIN TOPIC: {session_topic}
 
-3. **Feynman Technique**: Simplify and explain
-   - Explain in simple words
-   - Identify gaps in understanding
-   - Review and simplify further
+HEADING: ## {index}. {checkpoint.get('topic')}
+LEVEL: {checkpoint.get('level', 'intermediate')}
+STUDENT PROGRESS: {_progress_text(checkpoint)}
 
-4. **Practice Application**: Use what you learned
-   - Work on real projects
-   - Solve related problems
-   - Build something practical
+OBJECTIVES:
+{objectives_text}
 
-5. **Community Engagement**: Learn with others
-   - Join online forums
-   - Participate in discussions
-   - Share your knowledge
+KEY CONCEPTS: {concepts_text}
 
-## 🎯 Action Items
+STUDENT WEAK AREAS (emphasise if relevant to this section):
+{weak_text if weak_areas else "None identified"}
 
-- [ ] Review all checkpoints systematically
-- [ ] Complete all practice questions
-- [ ] Build a project using {session_topic}
-- [ ] Teach these concepts to someone
-- [ ] Explore advanced topics
+Include:
+1. Summary
+2. Key concepts and definitions
+3. Memory aids and mnemonics
+4. 2-3 practice questions
+If the student scored below 70% here, end with a short "Review First" list."""
+    
+    try:
+        response = llm.chat("notes", system_msg, human_msg)
+        record_usage(usage, response)
+        return response.content.strip()
+    except Exception as e:
+        logger.warning("Notes section failed", extra={"section": index, "error": str(e)})
+        if usage is not None:
+            usage["failed_calls"] = usage.get("failed_calls", 0) + 1
+        return _fallback_section(index, checkpoint)
+
+def generate_notes_overview(
+    session_topic: str,
+    checkpoints: List[Dict],
+    weak_areas: List[str] = None,
+    usage: Dict = None
+) -> str:
+    """Reduce step: table of contents plus a short cross-cutting summary."""
+    
+    system_msg = """You are an expert study notes creator.
 
----
+Write the opening of a set of study notes whose sections already exist.
+Use markdown. Keep it short."""
+    
+    headings = "\n".join(
+        f"{i}. {cp.get('topic')}: {', '.join(cp.get('key_concepts', [])[:4])}"
+        for i, cp in enumerate(checkpoints, 1)
+    )
+    weak_text = "\n".join(f"- {area}" for area in (weak_areas or []))
+    
+    human_msg = f"""MAIN TOPIC: {session_topic}
 
-*Generated by Conceptly - Your AI Learning Companion*
-*Keep learning, keep growing! 🌱*
-"""
+SECTIONS (number. title: key concepts):
+{headings}
+
+WEAK AREAS:
+{weak_text if weak_areas else "None identified"}
+
+Write:
+1. "## Table of Contents" listing every section above in order
+2. "## Overview" (150-250 words) explaining how the sections connect
+3. "## Focus Areas" with 3-5 bullets on what to review first"""
+    
+    try:
+        response = llm.chat("notes", system_msg, human_msg)
+        record_usage(usage, response)
+        return response.content.strip()
+    except Exception as e:
+        logger.warning("Notes overview failed", extra={"error": str(e)})
+        if usage is not None:
+            usage["failed_calls"] = usage.get("failed_calls", 0) + 1
+        toc = "\n".join(f"{i}. {cp.get('topic')}" for i, cp in enumerate(checkpoints, 1))
+        return f"## Table of Contents\n\n{toc}"
+
+def section_weak_areas(checkpoint: Dict, weak_areas: List[str] = None) -> List[str]:
+    """Weak areas that mention this checkpoint's topic or one of its key concepts."""
+    terms = [checkpoint.get('topic') or ""] + list(checkpoint.get('key_concepts') or [])
+    terms = [t.lower() for t in terms if t]
+    relevant = []
+    for area in weak_areas or []:
+        lowered = area.lower()
+        if any(t in lowered or lowered in t for t in terms):
+            relevant.append(area)
+    return sorted(relevant)
+
+def generate_note_parts(
+    session_topic: str,
+    checkpoints: List[Dict],
+    weak_areas: List[str] = None,
+    section_indexes: Optional[List[int]] = None,
+    include_overview: bool = True,
+    usage: Dict = None
+):
+    """
+    Generate the overview and the requested checkpoint sections concurrently.
+
+    section_indexes are 1-based; None means every checkpoint. Returns
+    (overview or None, {index: section}, failed) where failed holds the
+    indexes, and "overview", whose LLM call failed and got a plain fallback.
+    """
+    if section_indexes is None:
+        section_indexes = list(range(1, len(checkpoints) + 1))
+    section_usage = {i: {} for i in section_indexes}
+    overview_usage = {}
+    overview = None
+    
+    with ThreadPoolExecutor(max_workers=max(1, NOTES_MAX_WORKERS)) as pool:
+        # copy_context keeps request timing and trace spans attached to the caller.
+        futures = {
+            i: pool.submit(
+                contextvars.copy_context().run,
+                generate_checkpoint_section, session_topic, i, checkpoints[i - 1],
+                section_weak_areas(checkpoints[i - 1], weak_areas), section_usage[i]
+            )
+            for i in section_indexes
+        }
+        if include_overview:
+            overview = generate_notes_overview(session_topic, checkpoints, weak_areas, overview_usage)
+        sections = {i: f.result() for i, f in futures.items()}
+    
+    failed = {i for i, part in section_usage.items() if part.get("failed_calls")}
+    if overview_usage.get("failed_calls"):
+        failed.add("overview")
     
-    return notes
+    if usage is not None:
+        for part in list(section_usage.values()) + [overview_usage]:
+            for key, value in part.items():
+                usage[key] = usage.get(key, 0) + value
+    
+    return overview, sections, failed
+
+def assemble_comprehensive_notes(session_topic: str, overview: str, sections: List[str]) -> str:
+    body = overview + "\n\n---\n\n" + "\n\n---\n\n".join(sections)
+    return _wrap_comprehensive(session_topic, len(sections), body)
+
+def generate_comprehensive_notes_parallel(
+    session_topic: str,
+    checkpoints: List[Dict],
+    weak_areas: List[str] = None,
+    usage: Dict = None
+) -> str:
+    """
+    Map-reduce variant of generate_comprehensive_notes for long sessions.
+
+    Each checkpoint section is generated concurrently on a bounded pool. The
+    reduce step (table of contents and overview) only needs the checkpoint
+    list, so it runs alongside the sections instead of after them.
+    """
+    overview, sections, _ = generate_note_parts(session_topic, checkpoints, weak_areas, usage=usage)
+    return assemble_comprehensive_notes(session_topic, overview, [sections[i] for i in sorted(sections)])
 
 def generate_cheat_sheet(
     session_topic: str,
     checkpoints: List[Dict]
 ) -> str:
     
-    system_msg = SystemMessage(content="""Create a concise cheat sheet.
+    system_msg = """Create a concise cheat sheet.
 
 Include:
 - Key concepts only
@@ -130,23 +332,23 @@ Include:
 - No lengthy explanations
 - Easy to scan
 
-Keep it under 500 words.""")
+Keep it under 500 words."""
     
     checkpoints_text = "\n".join([
         f"- {cp.get('topic')}: {', '.join(cp.get('key_concepts', [])[:3])}"
         for cp in checkpoints
     ])
     
-    human_msg = HumanMessage(content=f"""Create quick reference cheat sheet for:
+    human_msg = f"""Create quick reference cheat sheet for:
 
 TOPIC: {session_topic}
 
 CHECKPOINTS:
 {checkpoints_text}
 
-Format: Markdown with clear sections and bullet points.""")
+Format: Markdown with clear sections and bullet points."""
     
-    response = llm.invoke([system_msg, human_msg])
+    response = llm.chat("notes", system_msg, human_msg)
     
     return f"""# {session_topic} - Quick Reference
 
@@ -166,7 +368,7 @@ def generate_practice_questions(
     checkpoints: List[Dict]
 ) -> str:
     
-    system_msg = SystemMessage(content="""Generate practice questions for review.
+    system_msg = """Generate practice questions for review.
 
 Create:
 - Multiple types of questions (MCQ, short answer, conceptual)
@@ -174,23 +376,23 @@ Create:
 - Cover all major topics
 - Include answer key hints
 
-Format: Clear question numbering with space for answers.""")
+Format: Clear question numbering with space for answers."""
     
     checkpoints_text = "\n".join([
         f"{i+1}. {cp.get('topic')}: {', '.join(cp.get('objectives', [])[:2])}"
         for i, cp in enumerate(checkpoints)
     ])
     
-    human_msg = HumanMessage(content=f"""Generate comprehensive practice questions for:
+    human_msg = f"""Generate comprehensive practice questions for:
 
 TOPIC: {session_topic}
 
 CHECKPOINTS:
 {checkpoints_text}
 
-Create at least 2-3 questions per checkpoint covering key concepts.""")
+Create at least 2-3 questions per checkpoint covering key concepts."""
     
-    response = llm.invoke([system_msg, human_msg])
+    response = llm.chat("notes", system_msg, human_msg)
     
     return f"""# {session_topic} - Practice Questions
 
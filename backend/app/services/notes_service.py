@@ -0,0 +1,294 @@
+import logging
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer, undefer_group
+from app.models import Checkpoint, LearningSession, NoteSection, QuizAttempt, UserNote
+from app.services import local_notes, notes_generator
+from app.services.question_store import attempt_questions, checkpoint_questions
+
+logger = logging.getLogger(__name__)
+
+NOTES_TYPES = ("comprehensive", "cheatsheet", "questions")
+NOTES_MODES = ("llm", "local")
+# Types that can be built from stored content without an LLM call.
+LOCAL_NOTES_TYPES = ("cheatsheet", "questions")
+
+# "single" = one prompt, "map_reduce" = per-checkpoint sections, "auto" picks
+# map_reduce once a session has NOTES_PARALLEL_THRESHOLD checkpoints, and for
+# every refresh of a session's comprehensive notes, so that completing one
+# checkpoint regenerates one section rather than the whole document.
+NOTES_MODE = os.getenv("NOTES_MODE", "auto")
+NOTES_PARALLEL_THRESHOLD = int(os.getenv("NOTES_PARALLEL_THRESHOLD", "6"))
+
+
+def session_checkpoint_data(db: Session, session_id: int, with_progress: bool = False) -> List[Dict]:
+    """
+    Checkpoint inputs for the notes generators. Comprehensive notes also get
+    each checkpoint's id, status and score so completing a checkpoint changes
+    its section.
+    """
+    checkpoints = db.query(Checkpoint).filter(
+        Checkpoint.session_id == session_id
+    ).order_by(Checkpoint.checkpoint_index).all()
+    data = []
+    for cp in checkpoints:
+        item = {
+            "topic": cp.topic,
+            "objectives": cp.objectives or [],
+            "key_concepts": cp.key_concepts or [],
+            "level": cp.level or "intermediate"
+        }
+        if with_progress:
+            item["id"] = cp.id
+            item["status"] = cp.status or "pending"
+            item["score"] = round(cp.understanding_score * 100) if cp.understanding_score is not None else None
+        data.append(item)
+    return data
+
+
+def local_checkpoint_data(db: Session, session_id: int) -> List[Dict]:
+    """Stored explanation text and every distinct question set seen per checkpoint."""
+    checkpoints = db.query(Checkpoint).options(
+        joinedload(Checkpoint.content),
+        selectinload(Checkpoint.question_set),
+        undefer_group("legacy_content"),
+        undefer_group("questions")
+    ).filter(
+        Checkpoint.session_id == session_id
+    ).order_by(Checkpoint.checkpoint_index).all()
+
+    attempts = db.query(QuizAttempt).options(
+        selectinload(QuizAttempt.question_set),
+        undefer(QuizAttempt.questions_used)
+    ).filter(
+        QuizAttempt.checkpoint_id.in_([cp.id for cp in checkpoints])
+    ).order_by(QuizAttempt.attempted_at.desc()).all() if checkpoints else []
+
+    by_checkpoint = {}
+    for attempt in attempts:
+        by_checkpoint.setdefault(attempt.checkpoint_id, []).append(attempt_questions(attempt) or [])
+
+    data = []
+    for cp in checkpoints:
+        questions = list(checkpoint_questions(cp) or [])
+        for attempt_set in by_checkpoint.get(cp.id, []):
+            questions.extend(attempt_set)
+        data.append({
+            "topic": cp.topic,
+            "key_concepts": cp.key_concepts or [],
+            "explanation": cp.explanation or "",
+            "questions": questions,
+        })
+    return data
+
+
+def _hash(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def notes_fingerprint(session_topic: str, checkpoint_data: List[Dict], weak_areas: List[str], notes_type: str) -> str:
+    """Hash of everything the notes generator sees; unchanged inputs mean unchanged notes."""
+    return _hash({
+        "topic": session_topic,
+        "checkpoints": checkpoint_data,
+        "weak_areas": sorted(weak_areas or []),
+        "notes_type": notes_type,
+    })
+
+
+def section_fingerprint(session_topic: str, index: int, checkpoint: Dict, weak_areas: List[str]) -> str:
+    return _hash({
+        "topic": session_topic,
+        "index": index,
+        "checkpoint": {k: v for k, v in checkpoint.items() if k != "id"},
+        "weak_areas": notes_generator.section_weak_areas(checkpoint, weak_areas),
+    })
+
+
+def overview_fingerprint(session_topic: str, checkpoint_data: List[Dict], weak_areas: List[str]) -> str:
+    # Mirrors what generate_notes_overview reads: titles, leading concepts, weak areas.
+    return _hash({
+        "topic": session_topic,
+        "sections": [[cp["topic"], cp["key_concepts"][:4]] for cp in checkpoint_data],
+        "weak_areas": sorted(weak_areas or []),
+    })
+
+
+def use_map_reduce(checkpoint_count: int, refresh: bool = False) -> bool:
+    if NOTES_MODE == "map_reduce":
+        return True
+    if NOTES_MODE == "single":
+        return False
+    return refresh or checkpoint_count >= NOTES_PARALLEL_THRESHOLD
+
+
+def update_sectioned_notes(
+    db: Session,
+    user_id: int,
+    session: LearningSession,
+    previous: Optional[UserNote],
+    checkpoint_data: List[Dict],
+    weak_areas: List[str],
+    fingerprint: str
+) -> UserNote:
+    """
+    Build comprehensive notes from per-checkpoint sections, regenerating only
+    the sections whose inputs changed since `previous` and splicing them into
+    it. Without a previous sectioned note every section is generated.
+    """
+    existing = {}
+    if previous is not None:
+        existing = {(s.kind, s.checkpoint_id): s for s in previous.sections}
+
+    wanted = [
+        section_fingerprint(session.topic, i, cp, weak_areas)
+        for i, cp in enumerate(checkpoint_data, 1)
+    ]
+    stale = [
+        i for i, cp in enumerate(checkpoint_data, 1)
+        if getattr(existing.get(("checkpoint", cp["id"])), "fingerprint", None) != wanted[i - 1]
+    ]
+    overview_fp = overview_fingerprint(session.topic, checkpoint_data, weak_areas)
+    overview_row = existing.get(("overview", None))
+    overview_stale = overview_row is None or overview_row.fingerprint != overview_fp
+
+    usage = {}
+    overview, fresh, failed = notes_generator.generate_note_parts(
+        session.topic, checkpoint_data, weak_areas, stale, overview_stale, usage
+    )
+
+    # Fallback text from a failed call is stored without a fingerprint, and so
+    # is the note itself, so the next request misses the cache and retries
+    # just the failed sections.
+    sections = []
+    if overview_stale:
+        overview_row = overview_row or NoteSection(kind="overview")
+        overview_row.content = overview
+        overview_row.fingerprint = "" if "overview" in failed else overview_fp
+    overview_row.position = 0
+    sections.append(overview_row)
+
+    for i, cp in enumerate(checkpoint_data, 1):
+        row = existing.get(("checkpoint", cp["id"]))
+        if i in fresh:
+            row = row or NoteSection(kind="checkpoint", checkpoint_id=cp["id"])
+            row.content = fresh[i]
+            row.fingerprint = "" if i in failed else wanted[i - 1]
+        row.position = i
+        sections.append(row)
+
+    note = previous or UserNote(user_id=user_id, session_id=session.id, notes_type="comprehensive")
+    note.sections = sections
+    note.fingerprint = "" if failed else fingerprint
+    note.content = notes_generator.assemble_comprehensive_notes(
+        session.topic, overview_row.content, [row.content for row in sections[1:]]
+    )
+    if previous is None:
+        db.add(note)
+    db.commit()
+    db.refresh(note)
+
+    reused = len(checkpoint_data) - len(stale)
+    logger.info("Sectioned notes refreshed", extra={
+        "session_id": session.id,
+        "sections_regenerated": len(stale),
+        "sections_reused": reused,
+        "overview_regenerated": overview_stale,
+        "llm_calls": usage.get("llm_calls", 0),
+    })
+    return note
+
+
+def _has_comprehensive_note(db: Session, user_id: int, session_id: int) -> bool:
+    return db.query(UserNote.id).filter(
+        UserNote.user_id == user_id,
+        UserNote.session_id == session_id,
+        UserNote.notes_type == "comprehensive"
+    ).first() is not None
+
+
+def _latest_sectioned_note(db: Session, user_id: int, session_id: int) -> Optional[UserNote]:
+    return db.query(UserNote).filter(
+        UserNote.user_id == user_id,
+        UserNote.session_id == session_id,
+        UserNote.notes_type == "comprehensive",
+        UserNote.sections.any()
+    ).order_by(UserNote.created_at.desc()).first()
+
+
+def _build_local(notes_type: str, session_topic: str, checkpoint_data: List[Dict], weak_areas: List[str]) -> str:
+    if notes_type == "cheatsheet":
+        return local_notes.build_cheat_sheet(session_topic, checkpoint_data)
+    return local_notes.build_practice_set(session_topic, checkpoint_data, weak_areas)
+
+
+def _generate(notes_type: str, session_topic: str, checkpoint_data: List[Dict], weak_areas: List[str]) -> str:
+    if notes_type == "cheatsheet":
+        return notes_generator.generate_cheat_sheet(session_topic, checkpoint_data)
+    if notes_type == "questions":
+        return notes_generator.generate_practice_questions(session_topic, checkpoint_data)
+    # Sectioned comprehensive notes go through update_sectioned_notes.
+    return notes_generator.generate_comprehensive_notes(session_topic, checkpoint_data, weak_areas)
+
+
+def get_or_generate_notes(
+    db: Session,
+    user_id: int,
+    session: LearningSession,
+    notes_type: str,
+    weak_areas: List[str],
+    mode: str = "llm"
+) -> Tuple[UserNote, bool]:
+    """
+    Return the stored note for these exact inputs, generating one only on a miss.
+
+    mode="local" builds cheat sheets and practice sets from stored
+    explanations and questions with no LLM call. The second element is True
+    when the note came from the cache.
+    """
+    local = mode == "local" and notes_type in LOCAL_NOTES_TYPES
+    if local:
+        checkpoint_data = local_checkpoint_data(db, session.id)
+        fingerprint = notes_fingerprint(session.topic, checkpoint_data, weak_areas, f"{notes_type}:local")
+    else:
+        checkpoint_data = session_checkpoint_data(db, session.id, with_progress=notes_type == "comprehensive")
+        fingerprint = notes_fingerprint(session.topic, checkpoint_data, weak_areas, notes_type)
+
+    cached = db.query(UserNote).filter(
+        UserNote.user_id == user_id,
+        UserNote.session_id == session.id,
+        UserNote.fingerprint == fingerprint
+    ).order_by(UserNote.created_at.desc()).first()
+
+    if cached:
+        logger.debug("Notes cache hit", extra={"session_id": session.id, "notes_type": notes_type})
+        return cached, True
+
+    if notes_type == "comprehensive":
+        # A single-prompt note is converted to sections on its first refresh.
+        previous = _latest_sectioned_note(db, user_id, session.id)
+        if previous is not None or use_map_reduce(
+                len(checkpoint_data), refresh=_has_comprehensive_note(db, user_id, session.id)):
+            return update_sectioned_notes(db, user_id, session, previous, checkpoint_data, weak_areas, fingerprint), False
+
+    if local:
+        content = _build_local(notes_type, session.topic, checkpoint_data, weak_areas)
+    else:
+        content = _generate(notes_type, session.topic, checkpoint_data, weak_areas)
+
+    note = UserNote(
+        user_id=user_id,
+        session_id=session.id,
+        content=content,
+        notes_type=notes_type,
+        fingerprint=fingerprint
+    )
+    db.add(note)
+    db.commit()
+    db.refresh(note)
+
+    logger.info("Generated notes", extra={"session_id": session.id, "notes_type": notes_type, "local": local})
+    return note, False
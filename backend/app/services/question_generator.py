@@ -1,26 +1,17 @@
+import logging
 from typing import Dict, List
 import json
 import re
 import hashlib
 from fractions import Fraction
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
 import os
-from dotenv import load_dotenv
+from app.services import llm
+from app.services.context_packer import pack_context
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.4,
-    api_key=os.getenv("GROQ_API_KEY")
-)
-
-llm_strict = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.1,
-    api_key=os.getenv("GROQ_API_KEY")
-)
+QUESTION_TEMPERATURE = 0.4
+QUESTION_TEMPERATURE_STRICT = 0.1
 
 _question_history: Dict[str, set] = {}
 _question_text_history: Dict[str, List[str]] = {}
@@ -120,7 +111,7 @@ def is_question_unique(checkpoint_id: int, question_text: str, session_id: int =
 
     for past_q in _question_text_history[key]:
         if _questions_are_similar(question_text, past_q):
-            print(f"   ⏭️  Similar question detected, skipping")
+            logger.debug("Similar question skipped")
             return False
 
     _question_history[key].add(sig)
@@ -140,6 +131,12 @@ def clear_question_history(session_id: int = None):
         _question_text_history.clear()
 
 
+def forget_checkpoint_history(checkpoint_id, session_id: int = None):
+    key = f"{session_id}_{checkpoint_id}" if session_id else str(checkpoint_id)
+    _question_history.pop(key, None)
+    _question_text_history.pop(key, None)
+
+
 def _call_llm_for_questions(
     checkpoint: Dict,
     context: str,
@@ -213,7 +210,7 @@ LEARNING OBJECTIVES:
 KEY CONCEPTS: {concepts_text}
 
 TAUGHT CONTENT (base all questions on this):
-{context[:3000]}
+{pack_context(context, checkpoint, "questions")}
 {weak_focus}{already_used}
 
 Output format:
@@ -236,13 +233,21 @@ Output format:
 REMEMBER: Wrong options must be realistic misconceptions about {topic}, NOT generic labels.
 IMPORTANT: Each question must test a completely different concept from the others."""
 
-    model = llm_strict if use_strict else llm
-    response = model.invoke([
-        SystemMessage(content=system_content),
-        HumanMessage(content=human_content),
-    ])
+    response = llm.chat(
+        "questions",
+        system_content,
+        human_content,
+        temperature=QUESTION_TEMPERATURE_STRICT if use_strict else QUESTION_TEMPERATURE,
+        priority="retry" if attempt_number > 0 else None,
+        tutor_mode=tutor_mode,
+        validate=_parse_questions,
+    )
+
+    return _parse_questions(response.content)
+
 
-    raw = str(response.content).strip()
+def _parse_questions(content) -> List[Dict]:
+    raw = str(content).strip()
     raw = re.sub(r'^```json\s*', '', raw)
     raw = re.sub(r'^```\s*', '', raw)
     raw = re.sub(r'\s*```$', '', raw)
@@ -260,12 +265,12 @@ def _validate_question(q: dict, checkpoint_id: int, session_id: int, concepts_us
         return None
 
     if not is_question_unique(checkpoint_id, question_text, session_id):
-        print(f"   ⏭️  Duplicate question skipped")
+        logger.debug("Duplicate question skipped")
         return None
 
     tested_concept = q.get("tested_concept", "").strip()
     if tested_concept and tested_concept in concepts_used:
-        print(f"   ⏭️  Repeated concept skipped: {tested_concept}")
+        logger.debug("Repeated concept skipped", extra={"concept": tested_concept})
         return None
 
     options = q.get("options", [])[:4]
@@ -278,7 +283,7 @@ def _validate_question(q: dict, checkpoint_id: int, session_id: int, concepts_us
 
     for opt in unique_options:
         if _contains_placeholder(opt):
-            print(f"   ❌ Placeholder option detected: '{opt}' — rejecting question")
+            logger.debug("Placeholder option rejected", extra={"option": opt})
             return None
 
     correct = q.get("correct_answer", "").strip()
@@ -321,10 +326,13 @@ def generate_questions(
     checkpoint_id = checkpoint.get('id', 0)
     topic = checkpoint.get('topic', 'the topic')
 
-    print(f"📝 Generating questions — checkpoint {checkpoint_id}: {topic}")
-    print(f"   Mode: {tutor_mode} | Level: {level} | Attempt: {attempt_number}")
-    if weak_areas:
-        print(f"   Weak areas: {weak_areas}")
+    logger.info("Generating questions", extra={
+        "checkpoint_id": checkpoint_id,
+        "tutor_mode": tutor_mode,
+        "level": level,
+        "attempt": attempt_number,
+        "weak_areas": weak_areas or [],
+    })
 
     kc = len(checkpoint.get('key_concepts', []))
     ob = len(checkpoint.get('objectives', []))
@@ -354,7 +362,7 @@ def generate_questions(
         if attempt_llm == 1 and len(validated) >= num_questions:
             break
         if attempt_llm == 1:
-            print(f"   🔄 Retrying with strict LLM (got {len(validated)}/{num_questions})")
+            logger.info("Retrying questions with strict temperature", extra={"validated": len(validated), "wanted": num_questions})
 
         try:
             raw_questions = _call_llm_for_questions(
@@ -379,25 +387,38 @@ def generate_questions(
                     concepts_used.add(vq["tested_concept"])
 
         except Exception as e:
-            print(f"   ❌ LLM call {attempt_llm + 1} failed: {e}")
-            import traceback; traceback.print_exc()
+            logger.exception("Question LLM call failed", extra={"call": attempt_llm + 1})
 
     if len(validated) >= num_questions:
-        print(f"✓ Generated {len(validated)} valid questions")
+        logger.debug("Questions validated", extra={"count": len(validated)})
         return validated[:num_questions]
 
     shortage = num_questions - len(validated)
-    print(f"   ⚠️  Still short {shortage} questions — using targeted fallback LLM call")
+    logger.warning("Questions still short, using fallback call", extra={"shortage": shortage})
     fallback_qs = _llm_fallback(topic, context, shortage, level, concepts_used)
     validated.extend(fallback_qs)
 
-    print(f"✓ Final question count: {len(validated[:num_questions])}")
+    logger.info("Questions generated", extra={"checkpoint_id": checkpoint_id, "count": len(validated[:num_questions])})
     return validated[:num_questions]
 
 
+def previous_questions(topic: str) -> List[Dict]:
+    """
+    Questions of another checkpoint on `topic`, for when generation produced
+    none. Callers serve them without storing them, so the checkpoint gets its
+    own questions once the LLM is back.
+    """
+    from app.services.fallback_content import previous_checkpoint_content
+    previous = previous_checkpoint_content(topic)
+    if previous and previous["questions"]:
+        logger.warning("No questions generated, reusing previous questions for topic", extra={"topic": topic})
+        return previous["questions"]
+    return []
+
+
 def _llm_fallback(topic: str, context: str, num: int, level: str, concepts_used: set) -> List[Dict]:
     try:
-        snippet = context[:2000] if context else f"The topic is {topic}."
+        snippet = pack_context(context, {"topic": topic}, "questions_fallback") if context else f"The topic is {topic}."
         already_used = f"Do NOT test these concepts (already covered): {', '.join(concepts_used)}" if concepts_used else ""
         prompt = f"""Write {num} multiple-choice questions about "{topic}" based on this text:
 
@@ -415,15 +436,8 @@ Rules:
 
 [{{"question": "...", "options": ["...", "...", "...", "..."], "correct_answer": "...", "explanation": "...", "tested_concept": "..."}}]"""
 
-        response = llm_strict.invoke([HumanMessage(content=prompt)])
-        raw = str(response.content).strip()
-        raw = re.sub(r'^```json\s*', '', raw)
-        raw = re.sub(r'^```\s*', '', raw)
-        raw = re.sub(r'\s*```$', '', raw)
-
-        parsed = json.loads(raw.strip())
-        if not isinstance(parsed, list):
-            parsed = [parsed]
+        response = llm.chat("questions", None, prompt, temperature=QUESTION_TEMPERATURE_STRICT, validate=_parse_questions)
+        parsed = _parse_questions(response.content)
 
         result = []
         for q in parsed:
@@ -456,6 +470,6 @@ Rules:
             return result
 
     except Exception as e:
-        print(f"   ❌ Fallback LLM also failed: {e}")
+        logger.warning("Fallback question call failed", extra={"error": str(e)})
 
     return []
\ No newline at end of file
@@ -0,0 +1,56 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import Checkpoint, QuizAttempt, QuestionSet
+
+
+def canonical_json(questions: List[Dict]) -> str:
+    return json.dumps(questions, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(questions: List[Dict]) -> str:
+    return hashlib.sha256(canonical_json(questions).encode("utf-8")).hexdigest()
+
+
+def store_question_set(db: Session, questions: List[Dict]) -> str:
+    """
+    Persist a question set once and return its hash.
+
+    Identical sets (same questions, options and explanations) share a row no
+    matter how many checkpoints or attempts reference them. Does not commit.
+    """
+    digest = content_hash(questions)
+    values = {"content_hash": digest, "questions": questions, "question_count": len(questions)}
+
+    if db.bind.dialect.name == "postgresql":
+        db.execute(postgresql.insert(QuestionSet).values(**values).on_conflict_do_nothing())
+    elif db.bind.dialect.name == "sqlite":
+        db.execute(sqlite.insert(QuestionSet).values(**values).on_conflict_do_nothing())
+    elif db.get(QuestionSet, digest) is None:
+        db.add(QuestionSet(**values))
+        db.flush()
+
+    return digest
+
+
+def set_checkpoint_questions(db: Session, checkpoint: Checkpoint, questions: List[Dict]) -> str:
+    digest = store_question_set(db, questions)
+    checkpoint.question_set_hash = digest
+    checkpoint.questions_cache = None
+    db.expire(checkpoint, ["question_set"])
+    return digest
+
+
+def checkpoint_questions(checkpoint: Checkpoint) -> Optional[List[Dict]]:
+    """Current questions for a checkpoint, falling back to the legacy inline column."""
+    if checkpoint.question_set_hash and checkpoint.question_set:
+        return checkpoint.question_set.questions
+    return checkpoint.questions_cache
+
+
+def attempt_questions(attempt: QuizAttempt) -> Optional[List[Dict]]:
+    if attempt.question_set_hash and attempt.question_set:
+        return attempt.question_set.questions
+    return attempt.questions_used
@@ -0,0 +1,158 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, date
+from typing import Callable, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app.models import UserAnalytics, WeakTopic, SchedulerRun
+from app.services.daily_challenges import assign_daily_challenges
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_RUN_AT = os.getenv("SCHEDULER_RUN_AT", "00:05")
+ACTIVE_USER_DAYS = int(os.getenv("ACTIVE_USER_DAYS", "7"))
+WEAK_TOPIC_DECAY = float(os.getenv("WEAK_TOPIC_DECAY", "0.95"))
+
+# Arbitrary but fixed key for pg_try_advisory_lock; every worker uses the same one.
+LEADER_LOCK_KEY = 72140529
+
+_stop = threading.Event()
+_thread = None
+
+
+def reset_broken_streaks(db: Session, now: datetime) -> int:
+    yesterday_start = datetime(now.year, now.month, now.day) - timedelta(days=1)
+    return db.query(UserAnalytics).filter(
+        UserAnalytics.current_streak > 0,
+        (UserAnalytics.last_study_date == None) | (UserAnalytics.last_study_date < yesterday_start)
+    ).update({UserAnalytics.current_streak: 0}, synchronize_session=False)
+
+
+def decay_weak_topics(db: Session, now: datetime) -> int:
+    """Topics not practiced since yesterday drift weaker so they resurface for review."""
+    today_start = datetime(now.year, now.month, now.day)
+    return db.query(WeakTopic).filter(
+        WeakTopic.last_practiced < today_start,
+        WeakTopic.strength_score > 0
+    ).update(
+        {WeakTopic.strength_score: WeakTopic.strength_score * WEAK_TOPIC_DECAY},
+        synchronize_session=False
+    )
+
+
+def assign_challenges(db: Session, now: datetime) -> int:
+    return assign_daily_challenges(db, active_days=ACTIVE_USER_DAYS, now=now)
+
+
+DAILY_JOBS: List[Tuple[str, Callable[[Session, datetime], int]]] = [
+    ("reset_broken_streaks", reset_broken_streaks),
+    ("decay_weak_topics", decay_weak_topics),
+    ("assign_daily_challenges", assign_challenges),
+]
+
+
+def _already_ran(db: Session, job_name: str, run_date: date) -> bool:
+    return db.query(SchedulerRun.id).filter(
+        SchedulerRun.job_name == job_name,
+        SchedulerRun.run_date == run_date
+    ).first() is not None
+
+
+def run_daily_jobs(now: datetime = None):
+    """
+    Run each daily job at most once per UTC date.
+
+    A job's changes and its scheduler_runs row commit together, so a crash
+    mid-run is retried on the next tick without double-applying decay.
+    """
+    now = now or datetime.utcnow()
+    run_date = now.date()
+
+    for job_name, job in DAILY_JOBS:
+        db = SessionLocal()
+        try:
+            if _already_ran(db, job_name, run_date):
+                continue
+
+            started = time.perf_counter()
+            affected = job(db, now)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+
+            db.add(SchedulerRun(
+                job_name=job_name,
+                run_date=run_date,
+                affected_rows=affected,
+                duration_ms=duration_ms
+            ))
+            db.commit()
+            logger.info("Scheduler job finished", extra={"job": job_name, "rows": affected, "duration_ms": duration_ms})
+        except IntegrityError:
+            db.rollback()
+            logger.info("Scheduler job already recorded, skipping", extra={"job": job_name, "run_date": str(run_date)})
+        except Exception as e:
+            db.rollback()
+            logger.exception("Scheduler job failed", extra={"job": job_name})
+        finally:
+            db.close()
+
+
+def run_as_leader(now: datetime = None) -> bool:
+    """
+    Run the daily jobs if this worker wins the advisory lock.
+
+    On databases without advisory locks (SQLite in development) the caller is
+    always the leader.
+    """
+    if engine.dialect.name != "postgresql":
+        run_daily_jobs(now)
+        return True
+
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LEADER_LOCK_KEY}).scalar()
+        if not acquired:
+            return False
+        try:
+            run_daily_jobs(now)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LEADER_LOCK_KEY})
+    return True
+
+
+def next_run_after(now: datetime) -> datetime:
+    hour, minute = (int(part) for part in SCHEDULER_RUN_AT.split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def _loop():
+    # Catch up on start in case the process was down at the scheduled time;
+    # scheduler_runs makes this a no-op when today's jobs already ran.
+    while not _stop.is_set():
+        try:
+            run_as_leader()
+        except Exception as e:
+            logger.exception("Scheduler tick failed")
+
+        wait_seconds = (next_run_after(datetime.utcnow()) - datetime.utcnow()).total_seconds()
+        _stop.wait(max(wait_seconds, 1))
+
+
+def start():
+    global _thread
+    if not SCHEDULER_ENABLED or (_thread and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="maintenance-scheduler", daemon=True)
+    _thread.start()
+    logger.info("Maintenance scheduler started", extra={"run_at_utc": SCHEDULER_RUN_AT})
+
+
+def stop():
+    _stop.set()
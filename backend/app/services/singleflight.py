@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, TypeVar
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Request coalescing for generation endpoints.
+#
+# Within a process, concurrent callers with the same key wait for the one
+# in-flight call and share its result (or exception). The leader also holds
+# a named lock, so different keys guarding the same data (checkpoint content
+# and checkpoint questions both run the workflow) do not generate twice.
+#
+# Across workers, the leader takes a Postgres transaction-level advisory
+# lock on the request's own session, released when it commits or rolls
+# back. A second worker blocks until the first has committed, so `fn` must
+# re-read the database and return a stored result when there is one.
+
+T = TypeVar("T")
+
+_calls = {}
+_calls_lock = threading.Lock()
+_locks = {}
+_stats = {"leaders": 0, "followers": 0}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def lock_key(name: str) -> int:
+    """Signed 64-bit advisory lock id for `name`."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+@contextmanager
+def _named_lock(name: str):
+    with _calls_lock:
+        entry = _locks.setdefault(name, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _calls_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[name]
+
+
+def run(key: str, fn: Callable[[], T], db: Optional[Session] = None, lock: Optional[str] = None) -> T:
+    """
+    Run `fn` once for all concurrent callers with the same key. `lock` names
+    the data being generated (defaults to `key`); pass the request's `db` to
+    also serialise across workers on Postgres.
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+            _stats["leaders"] += 1
+        else:
+            _stats["followers"] += 1
+
+    if not leader:
+        logger.debug("Joining in-flight generation", extra={"key": key})
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    lock = lock or key
+    try:
+        with _named_lock(lock):
+            if db is not None and db.bind.dialect.name == "postgresql":
+                db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": lock_key(lock)})
+            call.result = fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            del _calls[key]
+        call.done.set()
+
+
+def stats() -> dict:
+    with _calls_lock:
+        return {**_stats, "in_flight": len(_calls)}
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models import UserAnalytics
+
+
+def effective_streak(analytics: Optional[UserAnalytics], today=None) -> int:
+    """
+    Streak as it stands right now, derived from last_study_date.
+
+    The stored current_streak is only rewritten on study events, so a user who
+    skipped a day still has the old value in the row. Read paths use this
+    instead of resetting the row.
+    """
+    if not analytics or not analytics.last_study_date:
+        return 0
+
+    today = today or datetime.utcnow().date()
+    last_study = analytics.last_study_date.date()
+
+    if last_study >= today - timedelta(days=1):
+        return analytics.current_streak or 0
+    return 0
+
+
+def record_study_activity(user_id: int, db: Session) -> UserAnalytics:
+    """
+    Advance the streak for a real study event (quiz, challenge, session).
+
+    Does not commit; the caller's transaction carries the change.
+    """
+    analytics = db.query(UserAnalytics).filter(UserAnalytics.user_id == user_id).first()
+    if not analytics:
+        analytics = UserAnalytics(user_id=user_id, current_streak=0, longest_streak=0)
+        db.add(analytics)
+
+    now = datetime.utcnow()
+    today = now.date()
+    last_study = analytics.last_study_date.date() if analytics.last_study_date else None
+
+    if last_study == today:
+        return analytics
+
+    if last_study == today - timedelta(days=1):
+        analytics.current_streak = (analytics.current_streak or 0) + 1
+    else:
+        analytics.current_streak = 1
+
+    analytics.longest_streak = max(analytics.longest_streak or 0, analytics.current_streak)
+    analytics.last_study_date = now
+    return analytics
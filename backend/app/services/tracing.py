@@ -0,0 +1,226 @@
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Sampled tracing with a local sink. The sampling decision is made once per
+# root span and inherited by its children, so a trace is either complete or
+# absent. Finished spans go into an in-process buffer that a daemon thread
+# flushes to the configured exporters; request threads never do I/O.
+#
+#   TRACE_SAMPLE_RATE   0.0-1.0, default 0 (off: decorated calls run untouched)
+#   TRACE_EXPORTERS     comma list of "jsonl" and/or "langsmith", default "jsonl"
+#   TRACE_FILE          JSONL output path, default "traces.jsonl"
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_EXPORTERS = [e.strip() for e in os.getenv("TRACE_EXPORTERS", "jsonl").split(",") if e.strip()]
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "2"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "10000"))
+LANGSMITH_PROJECT = os.getenv("LANGCHAIN_PROJECT", "learning-agent-groq")
+
+_current = contextvars.ContextVar("trace_span", default=None)
+_NOT_SAMPLED = {}
+
+_buffer = deque()
+_stats = {"spans": 0, "dropped": 0, "exported": 0, "export_errors": 0}
+_flush_lock = threading.Lock()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _new_id():
+    return os.urandom(16).hex()
+
+
+def _open(name, attributes):
+    """Start a span under the current one. Returns (record, token); both None when not tracing."""
+    parent = _current.get()
+    if parent is _NOT_SAMPLED:
+        return None, None
+    if parent is None:
+        if TRACE_SAMPLE_RATE <= 0:
+            return None, None
+        if random.random() >= TRACE_SAMPLE_RATE:
+            return None, _current.set(_NOT_SAMPLED)
+        trace_id, parent_id = _new_id(), None
+    else:
+        trace_id, parent_id = parent["trace_id"], parent["span_id"]
+
+    record = {
+        "trace_id": trace_id,
+        "span_id": _new_id(),
+        "parent_id": parent_id,
+        "name": name,
+        "start": time.time(),
+        "status": "ok",
+        "attributes": attributes,
+    }
+    record["_started"] = time.perf_counter()
+    return record, _current.set(record)
+
+
+def _close(record, token, error=None):
+    _current.reset(token)
+    if record is None:
+        return
+    record["duration_ms"] = round((time.perf_counter() - record.pop("_started")) * 1000, 3)
+    if error is not None:
+        record["status"] = "error"
+        record["error"] = repr(error)[:500]
+    _enqueue(record)
+
+
+class span:
+    """
+    Context manager recording `name` as a span if this trace is sampled;
+    otherwise a no-op. A plain class rather than @contextmanager to keep the
+    unsampled path cheap.
+    """
+
+    __slots__ = ("name", "attributes", "record", "token")
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.record, self.token = _open(self.name, self.attributes)
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.token is not None:
+            _close(self.record, self.token, exc if isinstance(exc, Exception) else None)
+        return False
+
+
+def traced(name: str = None):
+    """
+    Decorator form of span(). When TRACE_SAMPLE_RATE is 0 at import time the
+    function is returned undecorated, so disabled tracing costs nothing.
+    """
+    def decorator(fn):
+        if TRACE_SAMPLE_RATE <= 0:
+            return fn
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            record, token = _open(span_name, {})
+            if token is None:
+                return fn(*args, **kwargs)
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _close(record, token, error)
+        return wrapper
+    return decorator
+
+
+def current_trace_id():
+    record = _current.get()
+    return record["trace_id"] if record and record is not _NOT_SAMPLED else None
+
+
+def _enqueue(record):
+    if len(_buffer) >= TRACE_BUFFER_SIZE:
+        _stats["dropped"] += 1
+        return
+    _buffer.append(record)
+    _stats["spans"] += 1
+    _ensure_flusher()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="trace-flusher", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(TRACE_FLUSH_SECONDS)
+        flush()
+
+
+def _timestamp(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def _export_jsonl(spans):
+    with open(TRACE_FILE, "a", encoding="utf-8") as f:
+        for record in spans:
+            line = dict(record, start=_timestamp(record["start"]).isoformat())
+            f.write(json.dumps(line, default=str) + "\n")
+
+
+def _export_langsmith(spans):
+    from langsmith import Client
+
+    client = Client()
+    for record in spans:
+        client.create_run(
+            name=record["name"],
+            inputs=record["attributes"],
+            run_type="chain",
+            id=uuid.UUID(record["span_id"]),
+            parent_run_id=uuid.UUID(record["parent_id"]) if record["parent_id"] else None,
+            start_time=_timestamp(record["start"]),
+            end_time=_timestamp(record["start"] + record["duration_ms"] / 1000),
+            error=record.get("error"),
+            project_name=LANGSMITH_PROJECT,
+        )
+
+
+EXPORTERS = {
+    "jsonl": _export_jsonl,
+    "langsmith": _export_langsmith,
+}
+
+
+def flush():
+    """Drain the buffer into every configured exporter. Safe to call from any thread."""
+    with _flush_lock:
+        spans = []
+        while _buffer:
+            spans.append(_buffer.popleft())
+        if not spans:
+            return 0
+
+        for exporter_name in TRACE_EXPORTERS:
+            exporter = EXPORTERS.get(exporter_name)
+            if exporter is None:
+                continue
+            try:
+                exporter(spans)
+            except Exception as e:
+                _stats["export_errors"] += 1
+                logger.warning("Trace export failed", extra={"exporter": exporter_name, "error": str(e)})
+        _stats["exported"] += len(spans)
+        return len(spans)
+
+
+def stats():
+    return dict(_stats, buffered=len(_buffer), sample_rate=TRACE_SAMPLE_RATE)
+
+
+atexit.register(flush)
@@ -1,10 +1,12 @@
-from langgraph.graph import StateGraph, END
+import logging
 from typing import TypedDict, List, Dict, Any, Optional
-from langsmith import traceable
-import os
+import threading
+from app.services.tracing import traced
 
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "learning-agent-groq"
+logger = logging.getLogger(__name__)
+
+_compiled_workflow = None
+_compiled_lock = threading.Lock()
 
 class LearningState(TypedDict):
     checkpoint: Dict
@@ -17,14 +19,14 @@ class LearningState(TypedDict):
     weak_areas: List[str]
     attempt_number: int
     workflow_complete: bool
+    # Set when any part was served from another checkpoint's stored content;
+    # such results are shown but never stored.
+    fallback: bool
 
-@traceable(name="gather_context_node")
+@traced("gather_context_node")
 def gather_context_node(state: LearningState) -> LearningState:
     from app.services import context_gatherer
     
-    print(f"Gathering context for: {state['checkpoint']['topic']}")
-    print(f"Using tutor mode: {state['tutor_mode']}")
-    
     context = context_gatherer.gather_context(
         state['checkpoint'],
         state['tutor_mode']
@@ -33,16 +35,14 @@ def gather_context_node(state: LearningState) -> LearningState:
     state['context'] = context
     state['context_validated'] = False
     
-    print(f"Context gathered: {len(context)} characters")
+    logger.debug("Context gathered", extra={"chars": len(context)})
     
     return state
 
-@traceable(name="validate_context_node")
+@traced("validate_context_node")
 def validate_context_node(state: LearningState) -> LearningState:
     from app.services.context_gatherer import validate_context
     
-    print(f"Validating context quality...")
-    
     validation_result = validate_context(
         state['checkpoint'],
         state['context']
@@ -51,21 +51,17 @@ def validate_context_node(state: LearningState) -> LearningState:
     state['validation_score'] = validation_result['score']
     state['context_validated'] = validation_result['score'] >= 85
     
-    print(f"Validation score: {validation_result['score']}/100")
-    if state['context_validated']:
-        print("✓ Context validation passed")
-    else:
-        print("⚠ Context validation failed, will retry")
+    logger.debug("Context validation", extra={
+        "score": validation_result['score'],
+        "passed": state['context_validated'],
+    })
     
     return state
 
-@traceable(name="explain_node")
+@traced("explain_node")
 def explain_node(state: LearningState) -> LearningState:
     from app.services import explainer
     
-    print(f"Creating explanation for checkpoint...")
-    print(f"Using tutor mode: {state['tutor_mode']}")
-    
     explanation = explainer.explain_checkpoint(
         state['checkpoint'],
         state['context'],
@@ -74,18 +70,14 @@ def explain_node(state: LearningState) -> LearningState:
     
     state['explanation'] = explanation
     
-    print(f"Explanation created: {len(explanation)} characters")
+    logger.debug("Explanation created", extra={"chars": len(explanation)})
     
     return state
 
-@traceable(name="generate_questions_node")
+@traced("generate_questions_node")
 def generate_questions_node(state: LearningState) -> LearningState:
     from app.services import question_generator
     
-    print(f"Generating assessment questions...")
-    print(f"Using tutor mode: {state['tutor_mode']}")
-    print(f"Attempt number: {state.get('attempt_number', 0)}")
-    
     questions = question_generator.generate_questions(
         state['checkpoint'],
         state['context'],
@@ -95,11 +87,14 @@ def generate_questions_node(state: LearningState) -> LearningState:
         state.get('attempt_number', 0)
     )
     
+    if not questions:
+        questions = question_generator.previous_questions(state['checkpoint'].get('topic', ''))
+        state['fallback'] = bool(questions)
+    
     state['questions'] = questions
     state['workflow_complete'] = True
     
-    print(f"✓ Generated {len(questions)} questions")
-    print("✓ Workflow execution completed successfully")
+    logger.debug("Questions generated", extra={"count": len(questions)})
     
     return state
 
@@ -113,11 +108,13 @@ def should_retry_context(state: LearningState) -> str:
         return "retry" if state.get('validation_score', 0) < 85 else "proceed"
     
     
-    print("Using current context (retry limit reached or score acceptable)")
+    logger.debug("Using current context (retry limit reached or score acceptable)")
     state['context_validated'] = True
     return "proceed"
 
 def create_workflow():
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(LearningState)    
     
     workflow.add_node("gather_context", gather_context_node)
@@ -143,7 +140,16 @@ def create_workflow():
     
     return workflow.compile()
 
-@traceable(name="run_checkpoint_workflow")
+def get_workflow():
+    """The compiled graph is stateless between runs; build it once per process."""
+    global _compiled_workflow
+    if _compiled_workflow is None:
+        with _compiled_lock:
+            if _compiled_workflow is None:
+                _compiled_workflow = create_workflow()
+    return _compiled_workflow
+
+@traced("run_checkpoint_workflow")
 def run_checkpoint_workflow(
     checkpoint: Dict,
     tutor_mode: str,
@@ -163,16 +169,14 @@ def run_checkpoint_workflow(
         Final workflow state with context, explanation, and questions
     """
     
-    print("=" * 60)
-    print(f"Starting checkpoint workflow")
-    print(f"Topic: {checkpoint.get('topic')}")
-    print(f"Tutor mode: {tutor_mode}")
-    print(f"Attempt number: {attempt_number}")
-    if weak_areas:
-        print(f"Weak areas to focus on: {weak_areas}")
-    print("=" * 60)
+    logger.info("Starting checkpoint workflow", extra={
+        "topic": checkpoint.get('topic'),
+        "tutor_mode": tutor_mode,
+        "attempt": attempt_number,
+        "weak_areas": weak_areas or [],
+    })
     
-    workflow = create_workflow()
+    workflow = get_workflow()
     
     
     initial_state: LearningState = {
@@ -185,28 +189,34 @@ def run_checkpoint_workflow(
         'context_validated': False,
         'weak_areas': weak_areas or [],
         'attempt_number': attempt_number,
-        'workflow_complete': False
+        'workflow_complete': False,
+        'fallback': False
     }
     
     try:
         result = workflow.invoke(initial_state)
         
         if result.get('workflow_complete'):
-            print("=" * 60)
-            print("✓ Workflow completed successfully")
-            print(f"✓ Context length: {len(result.get('context', ''))} chars")
-            print(f"✓ Explanation length: {len(result.get('explanation', ''))} chars")
-            print(f"✓ Questions generated: {len(result.get('questions', []))}")
-            print("=" * 60)
+            logger.info("Checkpoint workflow completed", extra={
+                "context_chars": len(result.get('context', '')),
+                "explanation_chars": len(result.get('explanation', '')),
+                "questions": len(result.get('questions', [])),
+            })
         else:
-            print("⚠ Warning: Workflow may not have completed fully")
+            logger.warning("Checkpoint workflow may not have completed fully")
         
         return result
         
     except Exception as e:
-        print(f"❌ Workflow execution error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Checkpoint workflow failed")
+        
+        from app.services.fallback_content import previous_checkpoint_content
+        previous = previous_checkpoint_content(checkpoint.get('topic'))
+        if previous:
+            initial_state.update(previous)
+            initial_state['workflow_complete'] = True
+            initial_state['fallback'] = True
+            return initial_state
         
         initial_state['workflow_complete'] = False
         return initial_state
\ No newline at end of file
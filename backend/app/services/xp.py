@@ -0,0 +1,55 @@
+import logging
+from typing import Dict
+from sqlalchemy import update, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models import User, XpLedger
+from app.services import leaderboard
+
+logger = logging.getLogger(__name__)
+
+XP_PER_LEVEL = 100
+
+
+def level_for_xp(xp: int) -> int:
+    return max(xp or 0, 0) // XP_PER_LEVEL + 1
+
+
+def award_xp(user: User, amount: int, reason: str, db: Session, source_id: int = None) -> Dict:
+    """
+    Append a ledger entry and bump users.xp/level in a single UPDATE.
+
+    The increment happens in SQL (xp = xp + amount) so concurrent awards for
+    the same user never overwrite each other. Does not commit.
+    """
+    old_level = user.level or 1
+
+    db.add(XpLedger(
+        user_id=user.id,
+        amount=amount,
+        reason=reason,
+        source_id=source_id
+    ))
+
+    new_xp = func.coalesce(User.xp, 0) + amount
+    row = db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(xp=new_xp, level=new_xp // XP_PER_LEVEL + 1)
+        .returning(User.xp, User.level)
+        .execution_options(synchronize_session=False)
+    ).one()
+
+    leaderboard.record_award(db, user.id, amount)
+
+    set_committed_value(user, "xp", row.xp)
+    set_committed_value(user, "level", row.level)
+
+    if row.level > old_level:
+        logger.info("User leveled up", extra={"user_id": user.id, "level": row.level})
+
+    return {
+        "xp": row.xp,
+        "level": row.level,
+        "level_up": row.level > old_level
+    }
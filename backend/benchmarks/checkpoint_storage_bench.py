@@ -0,0 +1,90 @@
+"""
+Checkpoint storage metrics: row size, buffer cache hit ratio, listing latency.
+
+Run against the target database before and after
+scripts/migrate_checkpoint_content.py and compare the output.
+
+    cd backend && python -m benchmarks.checkpoint_storage_bench --sessions 200
+"""
+import argparse
+import statistics
+import time
+from sqlalchemy import text
+from app.database import SessionLocal, engine
+from app.models import Checkpoint, LearningSession
+
+
+def postgres_stats():
+    with engine.connect() as conn:
+        row_size = conn.execute(text("SELECT avg(pg_column_size(c.*)) FROM checkpoints c")).scalar()
+        content_size = conn.execute(text(
+            "SELECT avg(pg_column_size(cc.*)) FROM checkpoint_contents cc"
+        )).scalar()
+        sizes = conn.execute(text("""
+            SELECT relname, pg_total_relation_size(relid)
+            FROM pg_statio_user_tables
+            WHERE relname IN ('checkpoints', 'checkpoint_contents')
+        """)).all()
+        hits = conn.execute(text("""
+            SELECT relname, heap_blks_hit, heap_blks_read
+            FROM pg_statio_user_tables
+            WHERE relname IN ('checkpoints', 'checkpoint_contents')
+        """)).all()
+    return row_size, content_size, dict(sizes), hits
+
+
+def listing_latency(session_ids, repeats):
+    """Same query shape as GET /sessions/{id}/checkpoints."""
+    samples = []
+    db = SessionLocal()
+    try:
+        for _ in range(repeats):
+            for session_id in session_ids:
+                start = time.perf_counter()
+                db.query(Checkpoint).filter(
+                    Checkpoint.session_id == session_id
+                ).order_by(Checkpoint.checkpoint_index).all()
+                samples.append((time.perf_counter() - start) * 1000)
+                db.expunge_all()
+    finally:
+        db.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    session_ids = [sid for (sid,) in db.query(LearningSession.id).join(Checkpoint).distinct().limit(args.sessions).all()]
+    db.close()
+
+    if engine.dialect.name == "postgresql":
+        row_size, content_size, sizes, hits = postgres_stats()
+        print(f"Avg checkpoints row size:          {float(row_size or 0):.0f} bytes")
+        print(f"Avg checkpoint_contents row size:  {float(content_size or 0):.0f} bytes")
+        for relname, size in sizes.items():
+            print(f"{relname} total size: {size / 1024:.1f} KB")
+        for relname, hit, read in hits:
+            total = (hit or 0) + (read or 0)
+            ratio = (hit / total * 100) if total else 0
+            print(f"{relname} heap cache hit ratio: {ratio:.2f}% ({hit} hit / {read} read)")
+    else:
+        print("Row size and cache hit ratio are only reported on PostgreSQL")
+
+    if not session_ids:
+        print("No sessions with checkpoints found")
+        return
+
+    samples = listing_latency(session_ids, args.repeats)
+    ordered = sorted(samples)
+    print(f"Listing latency over {len(samples)} queries: "
+          f"p50={statistics.median(samples):.2f}ms "
+          f"p95={ordered[int(len(ordered) * 0.95) - 1]:.2f}ms "
+          f"max={ordered[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
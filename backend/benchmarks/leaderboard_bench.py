@@ -0,0 +1,78 @@
+"""
+Rank lookup benchmark for the in-process leaderboard.
+
+Loads N synthetic users into a Leaderboard and times "my rank", "top N" and
+XP updates. Exits non-zero if p99 rank lookup exceeds the budget.
+
+    cd backend && python -m benchmarks.leaderboard_bench --users 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# The board itself never touches the database; a placeholder URL is enough
+# to import the services package.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.leaderboard import Leaderboard
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<14} p50={statistics.median(samples):8.2f}us  "
+          f"p99={percentile(samples, 99):8.2f}us  max={max(samples):9.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--budget-us", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    scores = {user_id: int(rng.paretovariate(1.2) * 20) for user_id in range(1, args.users + 1)}
+
+    board = Leaderboard()
+    start = time.perf_counter()
+    board.load(scores)
+    print(f"Loaded {len(board):,} users in {time.perf_counter() - start:.2f}s")
+
+    user_ids = [rng.randint(1, args.users) for _ in range(args.lookups)]
+    it = iter(user_ids)
+    rank_samples = timed(lambda: board.rank(next(it)), args.lookups)
+
+    top_samples = timed(lambda: board.top(10), 2_000)
+
+    it = iter(user_ids)
+    update_samples = timed(lambda: board.add(next(it), rng.choice((2, 20, 40))), args.lookups)
+
+    report("rank", rank_samples)
+    report("top 10", top_samples)
+    report("award", update_samples)
+
+    p99 = percentile(rank_samples, 99)
+    if p99 > args.budget_us:
+        print(f"✗ p99 rank lookup {p99:.1f}us exceeds budget {args.budget_us:.0f}us")
+        sys.exit(1)
+    print(f"✓ p99 rank lookup within {args.budget_us:.0f}us budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat completions API.
+
+Serves POST /openai/v1/chat/completions with canned responses shaped for
+each caller: JSON checkpoint plans for checkpoint_generator, JSON MCQ
+arrays that pass question_generator's validation (distinct wording,
+four full-sentence options), JSON scores for the context validator and
+markdown for everything else. Latency is drawn from a configurable
+distribution plus a per-token generation time, and output is deterministic
+for a given --seed. Standard library only.
+
+    cd backend && python -m benchmarks.llm_stub --port 8900 --latency lognormal:800:0.4
+    GROQ_API_BASE=http://127.0.0.1:8900 GROQ_API_KEY=stub uvicorn app.main:app
+
+Latency specs: fixed:MS, uniform:LOW_MS:HIGH_MS, lognormal:MEDIAN_MS:SIGMA.
+Per-model behaviour, for exercising model routing and its fallback:
+
+    --model-latency llama-3.1-8b-instant=fixed:150
+    --malformed-rate llama-3.1-8b-instant=0.2   (truncated JSON on JSON tasks)
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "tas", "vo", "qui", "zan", "pel", "dor", "fim", "gru", "hex", "jor", "nu", "sa"]
+VERBS = ["depends on", "is limited by", "is usually paired with", "can replace", "is derived from", "conflicts with"]
+
+
+class Stub:
+    def __init__(self, latency, tokens_per_second, error_rate, seed, model_latency=None, malformed_rate=None):
+        self.latency = latency
+        self.model_latency = model_latency or {}
+        self.malformed_rate = malformed_rate or {}
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.seed = seed
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "malformed": 0, "models": {}}
+
+    def rng(self):
+        # One deterministic stream per request, independent of thread scheduling.
+        with self.lock:
+            self.counter += 1
+            self.stats["requests"] += 1
+            return random.Random(f"{self.seed}:{self.counter}")
+
+    def delay_ms(self, rng, model=None):
+        kind, *params = self.model_latency.get(model, self.latency)
+        if kind == "fixed":
+            return params[0]
+        if kind == "uniform":
+            return rng.uniform(params[0], params[1])
+        return params[0] * math.exp(rng.gauss(0, params[1]))
+
+
+def parse_latency(spec):
+    kind, *values = spec.split(":")
+    values = [float(v) for v in values]
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise argparse.ArgumentTypeError(f"bad latency spec: {spec}")
+    return [kind] + values
+
+
+def parse_model_option(value, parse=str):
+    model, sep, spec = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected MODEL=VALUE: {value}")
+    return model, parse(spec)
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(3))
+
+
+def sentence(rng, topic, words=8):
+    return f"{topic} {rng.choice(VERBS)} " + " ".join(word(rng) for _ in range(words - 3)) + "."
+
+
+def checkpoints_response(rng, topic, count=4):
+    levels = ["beginner", "beginner", "intermediate", "intermediate", "advanced"]
+    return json.dumps([
+        {
+            "id": i,
+            "topic": f"{topic}: {word(rng).title()} {word(rng).title()}",
+            "level": levels[min(i - 1, len(levels) - 1)],
+            "objectives": [sentence(rng, topic, 7) for _ in range(3)],
+            "success_threshold": 0.7,
+            "success_criteria": sentence(rng, topic, 9),
+            "key_concepts": [word(rng).title() for _ in range(4)],
+        }
+        for i in range(1, count + 1)
+    ])
+
+
+def questions_response(rng, topic, count):
+    questions = []
+    for _ in range(count):
+        options = [sentence(rng, topic, 8) for _ in range(4)]
+        concept = f"{word(rng).title()} {word(rng).title()}"
+        questions.append({
+            # Mostly pseudo-words, so questions clear the word-overlap duplicate check.
+            "question": f"Which {word(rng)} {word(rng)} rule lets {word(rng)} {word(rng)} replace {word(rng)}?",
+            "options": options,
+            "correct_answer": options[rng.randrange(4)],
+            "explanation": sentence(rng, topic, 12),
+            "difficulty": "intermediate",
+            "tested_concept": concept,
+        })
+    return json.dumps(questions)
+
+
+def markdown_response(rng, topic, paragraphs=4):
+    parts = [f"## {topic}"]
+    for _ in range(paragraphs):
+        parts.append(" ".join(sentence(rng, topic, rng.randint(8, 14)) for _ in range(4)))
+    parts.append("### Key Points\n" + "\n".join(f"- {sentence(rng, topic, 7)}" for _ in range(4)))
+    return "\n\n".join(parts)
+
+
+def respond(rng, prompt):
+    """Pick a response shape from the prompt text the services send."""
+    m = re.search(r"Generate (\d+) quiz questions for: (.+)", prompt)
+    if m:
+        return "questions", questions_response(rng, m.group(2).strip(), int(m.group(1)))
+    m = re.search(r'Write (\d+) multiple-choice questions about "([^"]+)"', prompt)
+    if m:
+        return "questions", questions_response(rng, m.group(2), int(m.group(1)))
+    m = re.search(r"Create learning path for: (.+)", prompt)
+    if m:
+        return "checkpoints", checkpoints_response(rng, m.group(1).strip())
+    if prompt.startswith("Validate this content"):
+        score = rng.randint(80, 98)
+        return "validation", json.dumps({"score": score, "coverage": score, "clarity": score, "relevance": score})
+    m = re.search(r"(?:TOPIC|MAIN TOPIC): (.+)", prompt)
+    return "text", markdown_response(rng, m.group(1).strip() if m else "The topic")
+
+
+class Handler(BaseHTTPRequestHandler):
+    stub = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.stub.stats)
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+
+        rng = self.stub.rng()
+        messages = request.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        kind, content = respond(rng, prompt)
+        model = request.get("model", "stub")
+        with self.stub.lock:
+            self.stub.stats["models"][model] = self.stub.stats["models"].get(model, 0) + 1
+        if kind != "text" and rng.random() < self.stub.malformed_rate.get(model, 0.0):
+            content = content[:len(content) // 2]
+            self.stub.stats["malformed"] += 1
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        delay = self.stub.delay_ms(rng, model) / 1000
+        if self.stub.tokens_per_second > 0:
+            delay += completion_tokens / self.stub.tokens_per_second
+        time.sleep(delay)
+
+        if rng.random() < self.stub.error_rate:
+            self.stub.stats["errors"] += 1
+            self._send(503, {"error": {"message": "stub injected failure", "type": "server_error"}})
+            return
+
+        self._send(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "system_fingerprint": f"stub-{kind}",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "completion_time": round(delay, 3),
+            },
+        })
+
+
+def serve(host="127.0.0.1", port=8900, latency=("fixed", 0.0), tokens_per_second=0.0, error_rate=0.0, seed=0,
+          model_latency=None, malformed_rate=None):
+    """Start the stub in a daemon thread and return the server (call .shutdown() to stop)."""
+    Handler.stub = Stub(list(latency), tokens_per_second, error_rate, seed, model_latency, malformed_rate)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=parse_latency, default=parse_latency("lognormal:600:0.4"))
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-latency", action="append", default=[],
+                        type=lambda v: parse_model_option(v, parse_latency))
+    parser.add_argument("--malformed-rate", action="append", default=[],
+                        type=lambda v: parse_model_option(v, float))
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.tokens_per_second, args.error_rate, args.seed,
+                   dict(args.model_latency), dict(args.malformed_rate))
+    print(f"LLM stub on http://{args.host}:{args.port} (latency {':'.join(map(str, args.latency))}, "
+          f"{args.tokens_per_second} tok/s, error rate {args.error_rate})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+End-to-end load test of the learner journey.
+
+Each virtual user registers, logs in, creates a session, generates its
+checkpoints, loads the first checkpoint's content and questions, submits
+a quiz with one wrong answer, asks for a Feynman re-explanation and
+generates notes. Reports throughput, error counts and p50/p95/p99 latency
+per endpoint, followed by the app's per-route model stats from /health/llm.
+
+Run the app against the local LLM stub so results are reproducible and
+cost nothing:
+
+    cd backend && python -m benchmarks.llm_stub --port 8900 --seed 1
+    GROQ_API_BASE=http://127.0.0.1:8900 GROQ_API_KEY=stub uvicorn app.main:app --port 8000
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --users 20 --concurrency 5
+
+or let the harness start both (the app uses DATABASE_URL from the environment):
+
+    python -m benchmarks.load_test --spawn --users 20 --concurrency 5 --stub-latency lognormal:600:0.4
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+STEPS = ["register", "login", "create_session", "checkpoints", "content", "questions", "submit", "feynman", "notes"]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, step, client, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            with self.lock:
+                self.errors[step] += 1
+            raise
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.latencies[step].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[step] += 1
+        response.raise_for_status()
+        return response.json()
+
+
+def journey(base_url, recorder, topic, timeout):
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    password = "load-test-password"
+    with httpx.Client(base_url=base_url, timeout=timeout) as client:
+        recorder.call("register", client, "POST", "/auth/register",
+                      json={"email": email, "password": password, "name": "Load Test"})
+        token = recorder.call("login", client, "POST", "/auth/login",
+                              json={"email": email, "password": password})["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        session = recorder.call("create_session", client, "POST", "/sessions/", json={"topic": topic})
+        session_id = session["id"]
+        recorder.call("checkpoints", client, "POST", f"/sessions/{session_id}/checkpoints")
+        checkpoint_id = client.get(f"/sessions/{session_id}/checkpoints", params={"limit": 1}).json()[0]["id"]
+
+        recorder.call("content", client, "GET", f"/sessions/{session_id}/checkpoints/{checkpoint_id}/content")
+        questions = recorder.call("questions", client, "GET",
+                                  f"/sessions/{session_id}/checkpoints/{checkpoint_id}/questions")["questions"]
+
+        # Miss the first question so the Feynman step has a weak area to teach.
+        answers = [q.get("correct_answer", "") for q in questions]
+        if answers:
+            answers[0] = "not the answer"
+        recorder.call("submit", client, "POST", f"/checkpoints/{checkpoint_id}/submit", json={"answers": answers})
+        recorder.call("feynman", client, "GET", f"/checkpoints/{checkpoint_id}/feynman")
+        recorder.call("notes", client, "POST", f"/sessions/{session_id}/notes/generate")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def report(recorder, wall, completed, users):
+    print(f"\n{completed}/{users} journeys completed in {wall:.1f}s "
+          f"({completed / wall:.2f} journeys/s, {sum(map(len, recorder.latencies.values())) / wall:.1f} req/s)\n")
+    print(f"{'endpoint':<16}{'count':>7}{'errors':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for step in STEPS:
+        values = recorder.latencies.get(step)
+        if not values:
+            continue
+        ms = [v * 1000 for v in values]
+        print(f"{step:<16}{len(ms):>7}{recorder.errors[step]:>8}{statistics.fmean(ms):>9.0f}ms"
+              f"{percentile(ms, 50):>8.0f}ms{percentile(ms, 95):>8.0f}ms{percentile(ms, 99):>8.0f}ms")
+
+
+def report_routes(base_url):
+    try:
+        routes = httpx.get(f"{base_url}/health/llm", timeout=5).json().get("routes", {})
+    except (httpx.HTTPError, ValueError):
+        return
+    if not routes:
+        return
+    print(f"\n{'route':<44}{'calls':>7}{'mean':>10}{'fallback':>10}{'cost':>10}")
+    for name, stats in routes.items():
+        print(f"{name:<44}{stats['calls']:>7}{stats['mean_latency_ms']:>8.0f}ms"
+              f"{stats['fallback_rate']:>10.1%}{stats['cost_usd']:>9.4f}$")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn(args):
+    """Start the LLM stub in-process and the app under uvicorn; return (base_url, stop)."""
+    from benchmarks import llm_stub
+
+    stub_port, app_port = free_port(), free_port()
+    stub = llm_stub.serve(port=stub_port, latency=llm_stub.parse_latency(args.stub_latency),
+                          tokens_per_second=args.stub_tokens_per_second,
+                          error_rate=args.stub_error_rate, seed=args.seed)
+    env = dict(os.environ, GROQ_API_BASE=f"http://127.0.0.1:{stub_port}", GROQ_API_KEY="stub",
+               SCHEDULER_ENABLED="false", LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--workers", str(args.workers)],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{app_port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                break
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    else:
+        app.terminate()
+        raise SystemExit("app did not become healthy")
+
+    def stop():
+        app.terminate()
+        app.wait(timeout=10)
+        stub.shutdown()
+
+    return base_url, stop
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--topic", default="Binary search trees")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--spawn", action="store_true", help="start the LLM stub and the app locally")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stub-latency", default="lognormal:600:0.4")
+    parser.add_argument("--stub-tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_url, stop = spawn(args) if args.spawn else (args.base_url, lambda: None)
+    recorder = Recorder()
+    completed = 0
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(journey, base_url, recorder, args.topic, args.timeout) for _ in range(args.users)]
+            for future in futures:
+                try:
+                    future.result()
+                    completed += 1
+                except Exception as e:
+                    print(f"journey failed: {e}")
+        report(recorder, time.perf_counter() - started, completed, args.users)
+        report_routes(base_url)
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
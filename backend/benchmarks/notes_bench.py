@@ -0,0 +1,68 @@
+"""
+Compare single-prompt and map-reduce comprehensive notes.
+
+Reports wall-clock time, LLM calls, token usage and output size for each
+path. Uses a real session's checkpoints with --session-id, otherwise a
+synthetic session of --checkpoints checkpoints. Needs GROQ_API_KEY.
+
+    cd backend && python -m benchmarks.notes_bench --checkpoints 12
+"""
+import argparse
+import time
+from app.services import notes_generator
+
+
+def synthetic_checkpoints(topic, count):
+    return [
+        {
+            "topic": f"{topic} part {i}",
+            "objectives": [f"Understand {topic} part {i}", f"Apply {topic} part {i} to a worked example"],
+            "key_concepts": [f"concept {i}.{j}" for j in range(1, 4)],
+            "level": "intermediate",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def load_session(session_id):
+    from app.database import SessionLocal
+    from app.models import LearningSession
+    from app.services.notes_service import session_checkpoint_data
+    db = SessionLocal()
+    try:
+        session = db.get(LearningSession, session_id)
+        return session.topic, session_checkpoint_data(db, session_id)
+    finally:
+        db.close()
+
+
+def run(name, fn, topic, checkpoints, weak_areas):
+    usage = {}
+    start = time.perf_counter()
+    notes = fn(topic, checkpoints, weak_areas, usage)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed:7.2f}s  calls={usage.get('llm_calls', 0):<3} "
+          f"prompt={usage.get('prompt_tokens', 0):<6} completion={usage.get('completion_tokens', 0):<6} "
+          f"total={usage.get('total_tokens', 0):<6} chars={len(notes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topic", default="Distributed Systems")
+    parser.add_argument("--checkpoints", type=int, default=12)
+    parser.add_argument("--session-id", type=int)
+    args = parser.parse_args()
+
+    if args.session_id:
+        topic, checkpoints = load_session(args.session_id)
+    else:
+        topic, checkpoints = args.topic, synthetic_checkpoints(args.topic, args.checkpoints)
+    weak_areas = [checkpoints[0]["topic"]] if checkpoints else []
+
+    print(f"{len(checkpoints)} checkpoints, NOTES_MAX_WORKERS={notes_generator.NOTES_MAX_WORKERS}")
+    run("single", notes_generator.generate_comprehensive_notes, topic, checkpoints, weak_areas)
+    run("map_reduce", notes_generator.generate_comprehensive_notes_parallel, topic, checkpoints, weak_areas)
+
+
+if __name__ == "__main__":
+    main()
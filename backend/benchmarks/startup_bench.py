@@ -0,0 +1,150 @@
+"""
+Cold-start benchmark for the API process.
+
+Measures, in fresh interpreters:
+  - import time of app.main, with the slowest modules from -X importtime
+  - time from launching uvicorn to the first 200 from /health
+
+Exits non-zero if either median exceeds its budget, or if a heavy library
+(LLM clients, langgraph, ML stacks) is imported eagerly by app.main.
+
+    cd backend && python -m benchmarks.startup_bench [--runs 5] [--import-budget-ms 2500]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Must only be imported on first use, never while the app starts.
+LAZY_MODULES = (
+    "langchain_groq",
+    "langchain_core",
+    "langgraph",
+    "langsmith",
+    "groq",
+    "sklearn",
+    "torch",
+    "transformers",
+    "sentence_transformers",
+)
+
+
+def bench_env():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:////tmp/conceptly_startup_bench.db")
+    env.setdefault("SECRET_KEY", "startup-bench")
+    env.setdefault("ALGORITHM", "HS256")
+    env.setdefault("SCHEDULER_ENABLED", "false")
+    return env
+
+
+def import_profile():
+    """Return (total_us, [(cumulative_us, self_us, module)]) for one cold import of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=bench_env()
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit("app.main failed to import")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        modules.append((cumulative_us, self_us, parts[2].strip()))
+
+    total = next((c for c, _, name in modules if name == "app.main"), 0)
+    return total, modules
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_healthy(timeout):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=bench_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise SystemExit("uvicorn exited before becoming healthy")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise SystemExit(f"/health not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--import-budget-ms", type=float, default=2500.0)
+    parser.add_argument("--healthy-budget-ms", type=float, default=5000.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    import_times = []
+    modules = []
+    for _ in range(args.runs):
+        total, modules = import_profile()
+        import_times.append(total / 1000)
+
+    print(f"Slowest modules by cumulative import time (last run):")
+    for cumulative_us, self_us, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  (self {self_us / 1000:6.1f}ms)  {name}")
+
+    app_modules = [(c, name) for c, _, name in modules if name.startswith("app.")]
+    print("App modules:")
+    for cumulative_us, name in sorted(app_modules, reverse=True):
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    healthy_times = [time_to_healthy(args.timeout) * 1000 for _ in range(args.runs)]
+
+    import_ms = statistics.median(import_times)
+    healthy_ms = statistics.median(healthy_times)
+    print("=" * 60)
+    print(f"import app.main:        median {import_ms:7.1f}ms  max {max(import_times):7.1f}ms")
+    print(f"time to first /health:  median {healthy_ms:7.1f}ms  max {max(healthy_times):7.1f}ms")
+    print("=" * 60)
+
+    failures = []
+    imported = {name.split(".")[0] for _, _, name in modules}
+    eager = sorted(m for m in LAZY_MODULES if m in imported)
+    if eager:
+        failures.append(f"imported eagerly at startup: {', '.join(eager)}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import {import_ms:.0f}ms exceeds budget {args.import_budget_ms:.0f}ms")
+    if healthy_ms > args.healthy_budget_ms:
+        failures.append(f"time to healthy {healthy_ms:.0f}ms exceeds budget {args.healthy_budget_ms:.0f}ms")
+
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        sys.exit(1)
+    print(f"✓ Startup within budget ({args.import_budget_ms:.0f}ms import, {args.healthy_budget_ms:.0f}ms healthy)")
+
+
+if __name__ == "__main__":
+    main()
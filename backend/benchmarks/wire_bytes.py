@@ -0,0 +1,116 @@
+"""
+Bytes on the wire for the frontend's page-load sequence.
+
+Creates a learner with one generated checkpoint and a set of notes, then
+replays the GET requests the dashboard, session, quiz, analytics and notes
+pages make, three times:
+
+    identity     no compression, no validators (the old behaviour)
+    compressed   Accept-Encoding: br, gzip
+    revalidated  compressed, plus If-None-Match with the ETags from the
+                 previous pass (what the browser sends on a reload)
+
+and prints response bytes (status line, headers and body as received) per
+request and in total.
+
+    cd backend && python -m benchmarks.wire_bytes --spawn
+    python -m benchmarks.wire_bytes --base-url http://127.0.0.1:8000
+"""
+import argparse
+import uuid
+import httpx
+from benchmarks import load_test
+
+PASSES = {
+    "identity": {"Accept-Encoding": "identity"},
+    "compressed": {"Accept-Encoding": "br, gzip"},
+    "revalidated": {"Accept-Encoding": "br, gzip"},
+}
+
+
+def page_loads(session_id, checkpoint_id):
+    return [
+        ("dashboard", "/sessions/"),
+        ("dashboard", "/gamification/badges"),
+        ("dashboard", "/gamification/daily-challenge"),
+        ("session", "/gamification/profile"),
+        ("session", f"/sessions/{session_id}"),
+        ("session", f"/sessions/{session_id}/checkpoints"),
+        ("session", f"/sessions/{session_id}/checkpoints/{checkpoint_id}/content"),
+        ("quiz", f"/sessions/{session_id}/checkpoints/{checkpoint_id}/questions"),
+        ("analytics", "/analytics/"),
+        ("analytics", "/analytics/progress"),
+        ("analytics", "/gamification/weak-topics"),
+        ("analytics", "/analytics/history"),
+        ("analytics", "/gamification/badge-definitions"),
+        ("notes", f"/gamification/notes/{session_id}"),
+    ]
+
+
+def setup(client, topic):
+    email = f"wire-{uuid.uuid4().hex[:12]}@example.com"
+    password = "wire-bytes-password"
+    client.post("/auth/register", json={"email": email, "password": password, "name": "Wire Bytes"}).raise_for_status()
+    token = client.post("/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+    session_id = client.post("/sessions/", json={"topic": topic}).json()["id"]
+    client.post(f"/sessions/{session_id}/checkpoints").raise_for_status()
+    checkpoint_id = client.get(f"/sessions/{session_id}/checkpoints", params={"limit": 1}).json()[0]["id"]
+    client.get(f"/sessions/{session_id}/checkpoints/{checkpoint_id}/content").raise_for_status()
+    client.get(f"/sessions/{session_id}/checkpoints/{checkpoint_id}/questions").raise_for_status()
+    client.post(f"/sessions/{session_id}/notes/generate").raise_for_status()
+    return session_id, checkpoint_id
+
+
+def wire_size(response):
+    status_line = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n")
+    headers = sum(len(name) + len(value) + 4 for name, value in response.headers.raw) + 2
+    return status_line + headers + response.num_bytes_downloaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--topic", default="Binary search trees")
+    parser.add_argument("--spawn", action="store_true", help="start the LLM stub and the app locally")
+    args = parser.parse_args()
+    # spawn() options; the stub only needs to be fast here.
+    args.stub_latency, args.stub_tokens_per_second, args.stub_error_rate, args.seed, args.workers = "fixed:0", 0, 0.0, 0, 1
+
+    base_url, stop = load_test.spawn(args) if args.spawn else (args.base_url, lambda: None)
+    try:
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            requests = page_loads(*setup(client, args.topic))
+
+            sizes = {name: [] for name in PASSES}
+            etags = {}
+            for name, headers in PASSES.items():
+                for _, path in requests:
+                    conditional = dict(headers)
+                    if name == "revalidated" and path in etags:
+                        conditional["If-None-Match"] = etags[path]
+                    response = client.get(path, headers=conditional)
+                    if response.headers.get("etag"):
+                        etags[path] = response.headers["etag"]
+                    sizes[name].append((wire_size(response), response.status_code, response.headers.get("content-encoding", "")))
+    finally:
+        stop()
+
+    print(f"\n{'page':<10}{'request':<44}" + "".join(f"{name:>14}" for name in PASSES))
+    for i, (page, path) in enumerate(requests):
+        cells = ""
+        for name in PASSES:
+            size, status, encoding = sizes[name][i]
+            note = "304" if status == 304 else (encoding[:2] or "")
+            cells += f"{size:>10} {note:<3}"
+        print(f"{page:<10}{path[:43]:<44}{cells}")
+
+    totals = {name: sum(size for size, _, _ in sizes[name]) for name in PASSES}
+    print(f"\n{'total':<54}" + "".join(f"{totals[name]:>10}    " for name in PASSES))
+    for name in list(PASSES)[1:]:
+        print(f"{name}: {totals[name] / totals['identity']:.1%} of identity bytes")
+
+
+if __name__ == "__main__":
+    main()
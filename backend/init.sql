@@ -20,6 +20,13 @@ CREATE TABLE learning_sessions (
     xp_earned INTEGER DEFAULT 0
 );
 
+CREATE TABLE question_sets (
+    content_hash VARCHAR(64) PRIMARY KEY,
+    questions JSON NOT NULL,
+    question_count INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE checkpoints (
     id SERIAL PRIMARY KEY,
     session_id INTEGER REFERENCES learning_sessions(id),
@@ -37,9 +44,56 @@ CREATE TABLE checkpoints (
     explanation TEXT,
     content_generated BOOLEAN DEFAULT FALSE,
     questions_cache JSON,
+    question_set_hash VARCHAR(64) REFERENCES question_sets(content_hash),
     validation_score FLOAT
 );
 
+CREATE TABLE checkpoint_contents (
+    checkpoint_id INTEGER PRIMARY KEY REFERENCES checkpoints(id),
+    context BYTEA,
+    explanation BYTEA,
+    tutor_mode VARCHAR(50),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE checkpoint_content_variants (
+    checkpoint_id INTEGER REFERENCES checkpoints(id) ON DELETE CASCADE,
+    tutor_mode VARCHAR(50),
+    explanation BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (checkpoint_id, tutor_mode)
+);
+
+CREATE TABLE content_library_plans (
+    topic_key VARCHAR(255) PRIMARY KEY,
+    topic VARCHAR(255) NOT NULL,
+    checkpoints JSON NOT NULL,
+    tutor_mode VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE content_library_items (
+    content_key VARCHAR(64) PRIMARY KEY,
+    topic VARCHAR(255),
+    tutor_mode VARCHAR(50),
+    context BYTEA,
+    explanation BYTEA,
+    question_set_hash VARCHAR(64) REFERENCES question_sets(content_hash),
+    validation_score FLOAT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE feynman_explanations (
+    id SERIAL PRIMARY KEY,
+    cache_key VARCHAR(64) UNIQUE NOT NULL,
+    checkpoint_id INTEGER NOT NULL REFERENCES checkpoints(id) ON DELETE CASCADE,
+    approach_index INTEGER NOT NULL,
+    tutor_mode VARCHAR(50),
+    weak_areas JSON,
+    explanation BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE quiz_attempts (
     id SERIAL PRIMARY KEY,
     checkpoint_id INTEGER REFERENCES checkpoints(id),
@@ -49,6 +103,7 @@ CREATE TABLE quiz_attempts (
     total_questions INTEGER,
     answers JSON,
     questions_used JSON,
+    question_set_hash VARCHAR(64) REFERENCES question_sets(content_hash),
     attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -98,13 +153,54 @@ CREATE TABLE user_notes (
     user_id INTEGER REFERENCES users(id),
     session_id INTEGER REFERENCES learning_sessions(id),
     content TEXT,
+    notes_type VARCHAR(50),
+    fingerprint VARCHAR(64),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE note_sections (
+    id SERIAL PRIMARY KEY,
+    note_id INTEGER NOT NULL REFERENCES user_notes(id) ON DELETE CASCADE,
+    checkpoint_id INTEGER REFERENCES checkpoints(id),
+    kind VARCHAR(20) NOT NULL,
+    position INTEGER NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    content TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE xp_ledger (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    amount INTEGER NOT NULL,
+    reason VARCHAR(50) NOT NULL,
+    source_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE scheduler_runs (
+    id SERIAL PRIMARY KEY,
+    job_name VARCHAR(100) NOT NULL,
+    run_date DATE NOT NULL,
+    affected_rows INTEGER DEFAULT 0,
+    duration_ms INTEGER,
+    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_scheduler_runs_job_date UNIQUE (job_name, run_date)
+);
+
 CREATE INDEX idx_sessions_user ON learning_sessions(user_id);
 CREATE INDEX idx_checkpoints_session ON checkpoints(session_id);
 CREATE INDEX idx_quiz_attempts_checkpoint ON quiz_attempts(checkpoint_id);
+CREATE INDEX idx_feynman_explanations_checkpoint ON feynman_explanations(checkpoint_id);
 CREATE INDEX idx_badges_user ON user_badges(user_id);
 CREATE INDEX idx_weak_topics_user ON weak_topics(user_id);
 CREATE INDEX idx_challenges_user ON daily_challenges(user_id);
-CREATE INDEX idx_notes_user ON user_notes(user_id);
\ No newline at end of file
+CREATE INDEX idx_notes_user ON user_notes(user_id);
+CREATE INDEX idx_xp_ledger_user_created ON xp_ledger(user_id, created_at);
+CREATE INDEX idx_xp_ledger_created ON xp_ledger(created_at);
+CREATE INDEX idx_challenges_user_date ON daily_challenges(user_id, date);
+CREATE INDEX idx_analytics_last_study ON user_analytics(last_study_date);
+CREATE INDEX idx_sessions_user_created ON learning_sessions(user_id, created_at, id);
+CREATE INDEX idx_checkpoints_session_index ON checkpoints(session_id, checkpoint_index);
+CREATE INDEX idx_notes_fingerprint ON user_notes(user_id, session_id, fingerprint);
+CREATE INDEX idx_note_sections_note_position ON note_sections(note_id, position);
@@ -0,0 +1,27 @@
+"""
+Seed xp_ledger with an opening balance for users whose XP predates the ledger.
+
+Run once after deploying the ledger:
+
+    cd backend && python -m scripts.backfill_xp_ledger
+"""
+from datetime import datetime
+from sqlalchemy import text
+from app.database import engine, init_db
+
+
+def backfill():
+    init_db()
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            INSERT INTO xp_ledger (user_id, amount, reason, created_at)
+            SELECT u.id, u.xp, 'opening_balance', :now
+            FROM users u
+            WHERE u.xp > 0
+              AND NOT EXISTS (SELECT 1 FROM xp_ledger l WHERE l.user_id = u.id)
+        """), {"now": datetime.utcnow()})
+        print(f"✓ Opening balances written for {result.rowcount} users")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,132 @@
+"""
+Rebuild app/services/tokenizer.json, the GPT-2 tokenizer context_packer
+counts tokens with.
+
+The GPT-2 byte-level BPE ranks are taken from whisper/assets/gpt2.tiktoken
+in the openai-whisper 20231117 sdist on PyPI (MIT licensed, like the GPT-2
+encoder it reproduces), pinned by URL and sha256. The merges are recovered
+from the ranks the same way transformers converts tiktoken files, and the
+result is saved in the Hugging Face tokenizers format.
+
+    cd backend && python -m scripts.build_tokenizer [--tiktoken path/to/gpt2.tiktoken] [--output PATH]
+
+The output is deterministic; compare its sha256 with the committed file
+(see app/services/tokenizer.README.md).
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import tarfile
+import urllib.request
+
+WHISPER_SDIST_URL = ("https://files.pythonhosted.org/packages/d2/6e/"
+                     "50ace2bf704e5ffc786d20d96403ab0d57c5d6ab8729de7fed8c436687df/"
+                     "openai-whisper-20231117.tar.gz")
+WHISPER_SDIST_SHA256 = "7af424181436f1800cc0b7d75cf40ede34e9ddf1ba4983a910832fcf4aade4a4"
+RANKS_MEMBER = "openai-whisper-20231117/whisper/assets/gpt2.tiktoken"
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "..", "app", "services", "tokenizer.json")
+
+# GPT-2 token ids of known strings, checked after the build.
+EXPECTED = {
+    "Hello world": [15496, 995],
+    "The quick brown fox jumps over the lazy dog.": [464, 2068, 7586, 21831, 18045, 625, 262, 16931, 3290, 13],
+}
+
+
+def download_ranks() -> bytes:
+    with urllib.request.urlopen(WHISPER_SDIST_URL, timeout=60) as response:
+        sdist = response.read()
+    digest = hashlib.sha256(sdist).hexdigest()
+    if digest != WHISPER_SDIST_SHA256:
+        raise SystemExit(f"sdist sha256 mismatch: {digest}")
+    with tarfile.open(fileobj=io.BytesIO(sdist), mode="r:gz") as tar:
+        return tar.extractfile(RANKS_MEMBER).read()
+
+
+def parse_ranks(data: bytes) -> dict:
+    ranks = {}
+    for line in data.splitlines():
+        if line.strip():
+            token, rank = line.split()
+            ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+def bytes_to_unicode() -> dict:
+    """GPT-2's printable stand-in character for every byte."""
+    printable = list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1)) + list(range(ord("®"), ord("ÿ") + 1))
+    chars = printable[:]
+    extra = 0
+    for b in range(256):
+        if b not in printable:
+            printable.append(b)
+            chars.append(256 + extra)
+            extra += 1
+    return dict(zip(printable, map(chr, chars)))
+
+
+def split_by_lower_ranks(ranks: dict, token: bytes, max_rank: int) -> list:
+    """BPE-encode `token` using only merges ranked below its own; leaves the final merge's two halves."""
+    parts = [bytes([b]) for b in token]
+    while True:
+        best = None
+        for i in range(len(parts) - 1):
+            rank = ranks.get(parts[i] + parts[i + 1])
+            if rank is not None and rank < max_rank and (best is None or rank < best[1]):
+                best = (i, rank)
+        if best is None:
+            return parts
+        i = best[0]
+        parts = parts[:i] + [parts[i] + parts[i + 1]] + parts[i + 2:]
+
+
+def build(ranks: dict):
+    from tokenizers import AddedToken, Tokenizer, decoders, models, pre_tokenizers
+
+    byte_chars = bytes_to_unicode()
+
+    def encode(token: bytes) -> str:
+        return "".join(byte_chars[b] for b in token)
+
+    vocab = {encode(token): rank for token, rank in ranks.items()}
+    merges = []
+    for token, rank in sorted(ranks.items(), key=lambda item: item[1]):
+        if len(token) == 1:
+            continue
+        left, right = split_by_lower_ranks(ranks, token, rank)
+        merges.append((encode(left), encode(right)))
+
+    tokenizer = Tokenizer(models.BPE(vocab=vocab, merges=merges))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    tokenizer.add_special_tokens([AddedToken("<|endoftext|>", special=True)])
+    return tokenizer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiktoken", help="local gpt2.tiktoken instead of downloading the whisper sdist")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if args.tiktoken:
+        with open(args.tiktoken, "rb") as f:
+            data = f.read()
+    else:
+        data = download_ranks()
+
+    tokenizer = build(parse_ranks(data))
+    for text, ids in EXPECTED.items():
+        if tokenizer.encode(text).ids != ids:
+            raise SystemExit(f"unexpected token ids for {text!r}: {tokenizer.encode(text).ids}")
+
+    tokenizer.save(args.output, pretty=False)
+    with open(args.output, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    print(f"✓ {tokenizer.get_vocab_size()} tokens written to {os.path.normpath(args.output)} (sha256 {digest})")
+
+
+if __name__ == "__main__":
+    main()
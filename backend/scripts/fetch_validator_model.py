@@ -0,0 +1,35 @@
+"""
+Download the context validator's embedding model into the deployment.
+
+Workers load the model from disk only and never contact the Hugging Face
+Hub, so run this once per image or host, next to `pip install`:
+
+    cd backend && python -m scripts.fetch_validator_model [--model NAME] [--revision REV] [--output DIR]
+
+The default output is the directory context_validator loads from
+(backend/models/all-MiniLM-L6-v2). If you save the model anywhere else,
+point CONTEXT_VALIDATOR_MODEL at that directory.
+"""
+import argparse
+import os
+from app.services.context_validator import CONTEXT_VALIDATOR_MODEL
+
+HUB_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=HUB_MODEL, help="Hub name of the sentence-transformers model")
+    parser.add_argument("--revision", default=None, help="Hub branch, tag or commit to download")
+    parser.add_argument("--output", default=CONTEXT_VALIDATOR_MODEL)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model, revision=args.revision)
+    model.save(args.output)
+    dimensions = model.get_sentence_embedding_dimension()
+    print(f"✓ {args.model} ({dimensions}-dim embeddings) saved to {os.path.normpath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Move Checkpoint.context/explanation into compressed checkpoint_contents rows.
+
+Streams checkpoints in id order, writes one compressed content row per
+checkpoint and clears the inline text columns. Safe to re-run.
+
+    cd backend && python -m scripts.migrate_checkpoint_content [--batch-size 200]
+
+Measure with benchmarks/checkpoint_storage_bench.py before and after, and
+run VACUUM (FULL, ANALYZE) checkpoints so Postgres rewrites the heap.
+"""
+import argparse
+import time
+from sqlalchemy.orm import undefer_group
+from app.database import SessionLocal, init_db
+from app.models import Checkpoint, CheckpointContent
+from app.compression import compress_text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    last_id = 0
+    moved = 0
+    raw_bytes = 0
+    compressed_bytes = 0
+
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.query(Checkpoint).options(undefer_group("legacy_content")).filter(
+                Checkpoint.id > last_id,
+                (Checkpoint.legacy_context != None) | (Checkpoint.legacy_explanation != None)
+            ).order_by(Checkpoint.id).limit(args.batch_size).all()
+
+            if not rows:
+                break
+
+            existing = {
+                checkpoint_id for (checkpoint_id,) in db.query(CheckpointContent.checkpoint_id).filter(
+                    CheckpointContent.checkpoint_id.in_([cp.id for cp in rows])
+                ).all()
+            }
+
+            for cp in rows:
+                last_id = cp.id
+                for text_value in (cp.legacy_context, cp.legacy_explanation):
+                    if text_value:
+                        raw_bytes += len(text_value.encode("utf-8"))
+                        compressed_bytes += len(compress_text(text_value))
+
+                if cp.id not in existing:
+                    db.add(CheckpointContent(
+                        checkpoint_id=cp.id,
+                        context=cp.legacy_context,
+                        explanation=cp.legacy_explanation
+                    ))
+                cp.legacy_context = None
+                cp.legacy_explanation = None
+                moved += 1
+
+            db.commit()
+            print(f"  migrated through checkpoint {last_id} ({moved} so far)")
+        finally:
+            db.close()
+
+    print("=" * 60)
+    print(f"Moved {moved} checkpoints in {time.perf_counter() - started:.1f}s")
+    if raw_bytes:
+        print(f"Text: {raw_bytes / 1024:.1f} KB -> {compressed_bytes / 1024:.1f} KB compressed "
+              f"({compressed_bytes / raw_bytes:.2f}x)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Move inline question JSON into content-addressed question_sets rows.
+
+Streams quiz_attempts.questions_used and checkpoints.questions_cache in
+keyset batches, stores each distinct set once, points the row at its hash
+and clears the inline copy. Safe to re-run; already migrated rows are skipped.
+
+    cd backend && python -m scripts.migrate_question_sets [--batch-size 500] [--dry-run]
+
+Postgres does not return freed space to the OS until the table is rewritten;
+run VACUUM (FULL, ANALYZE) on quiz_attempts and checkpoints afterwards to see
+the on-disk drop in the report.
+"""
+import argparse
+import time
+from sqlalchemy import text
+from app.database import SessionLocal, engine, init_db
+from app.models import Checkpoint, QuizAttempt
+from app.services.question_store import canonical_json, content_hash, store_question_set
+
+TABLES = ("quiz_attempts", "checkpoints", "question_sets")
+
+
+def table_sizes():
+    if engine.dialect.name != "postgresql":
+        return {}
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": table}).scalar()
+            for table in TABLES
+        }
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def migrate(model, json_attr, batch_size, dry_run, stats):
+    """Stream one table in id order, dedupe its JSON column into question_sets."""
+    json_col = getattr(model, json_attr)
+    last_id = 0
+    seen = stats.setdefault("distinct_hashes", set())
+
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.query(model.id, json_col).filter(
+                model.id > last_id,
+                model.question_set_hash == None,
+                json_col != None
+            ).order_by(model.id).limit(batch_size).all()
+
+            if not rows:
+                return
+
+            for row_id, questions in rows:
+                last_id = row_id
+                if not questions:
+                    continue
+                stats["rows"] += 1
+                stats["inline_bytes"] += len(canonical_json(questions).encode("utf-8"))
+
+                if dry_run:
+                    digest = content_hash(questions)
+                else:
+                    digest = store_question_set(db, questions)
+                    db.query(model).filter(model.id == row_id).update(
+                        {model.question_set_hash: digest, json_col: None},
+                        synchronize_session=False
+                    )
+
+                if digest not in seen:
+                    seen.add(digest)
+                    stats["stored_bytes"] += len(canonical_json(questions).encode("utf-8"))
+
+            if not dry_run:
+                db.commit()
+            print(f"  {model.__tablename__}: migrated through id {last_id} ({stats['rows']} rows so far)")
+        finally:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    init_db()
+    before = table_sizes()
+    stats = {"rows": 0, "inline_bytes": 0, "stored_bytes": 0}
+    started = time.perf_counter()
+
+    migrate(QuizAttempt, "questions_used", args.batch_size, args.dry_run, stats)
+    migrate(Checkpoint, "questions_cache", args.batch_size, args.dry_run, stats)
+
+    after = table_sizes()
+    distinct = len(stats.pop("distinct_hashes", set()))
+
+    print("=" * 60)
+    print(f"Question-set migration {'(dry run) ' if args.dry_run else ''}finished in {time.perf_counter() - started:.1f}s")
+    print(f"Rows with inline questions: {stats['rows']}")
+    print(f"Distinct question sets:     {distinct}")
+    print(f"Inline JSON before:         {_mb(stats['inline_bytes'])}")
+    print(f"Deduplicated JSON after:    {_mb(stats['stored_bytes'])}")
+    if stats["inline_bytes"]:
+        print(f"Logical reduction:          {100 * (1 - stats['stored_bytes'] / stats['inline_bytes']):.1f}%")
+    for table in before:
+        print(f"{table:<28}{_mb(before[table])} -> {_mb(after[table])}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
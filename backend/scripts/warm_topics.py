@@ -0,0 +1,175 @@
+"""
+Pre-generate checkpoint plans and content for a list of topics.
+
+Reads one topic per line (blank lines and lines starting with # are
+skipped), generates each topic's checkpoint plan and runs the checkpoint
+workflow for every checkpoint in it, storing the results in the content
+library. Sessions on a warmed topic then get their plan, content and
+questions without waiting on the LLM.
+
+    cd backend && python -m scripts.warm_topics topics.txt [--concurrency 4] [--rpm 300] [--tpm 100000]
+
+Finished topics are appended to a progress file (JSON lines) and skipped on
+the next run, so an interrupted warm-up can simply be restarted. Entries
+already in the library are never regenerated. Output that the generators
+produced from a failed LLM call (default plans, stale content) is not
+stored; those topics are marked failed and retried on the next run.
+
+Keep --rpm/--tpm below the account limits when the live app shares the
+same Groq key.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.database import SessionLocal, init_db
+from app.services import checkpoint_generator, content_library, llm, question_generator
+from app.services.llm_scheduler import scheduler
+from app.services.workflow import run_checkpoint_workflow
+
+
+def read_topics(path):
+    with open(path, encoding="utf-8") as f:
+        topics = [line.strip() for line in f]
+    seen = set()
+    unique = []
+    for topic in topics:
+        if topic and not topic.startswith("#") and content_library.topic_key(topic) not in seen:
+            seen.add(content_library.topic_key(topic))
+            unique.append(topic)
+    return unique
+
+
+def finished_topics(path):
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interruption
+            if entry.get("status") == "done":
+                done.add(content_library.topic_key(entry["topic"]))
+    return done
+
+
+def fill_topic(db, topic, tutor_mode, usage, entry):
+    checkpoints = content_library.plan(db, topic)
+    if checkpoints is None:
+        checkpoints = checkpoint_generator.generate_checkpoints(topic=topic, tutor_mode=tutor_mode)
+        if usage["errors"]:
+            raise RuntimeError("plan generation failed")
+        content_library.store_plan(db, topic, checkpoints, tutor_mode)
+        db.commit()
+
+    entry["checkpoints"] = len(checkpoints)
+    for cp in checkpoints:
+        checkpoint_data = {
+            "topic": cp["topic"],
+            "objectives": cp["objectives"],
+            "key_concepts": cp.get("key_concepts", []),
+            "level": cp.get("level", "intermediate"),
+        }
+        if content_library.content(db, checkpoint_data) is not None:
+            entry["reused"] += 1
+            continue
+
+        # Library checkpoints have no session or row id. The question
+        # generator's duplicate check is keyed by checkpoint id, so give each
+        # definition its own id rather than sharing history across topics.
+        checkpoint_data["id"] = f"library-{content_library.content_key(checkpoint_data)[:16]}"
+        errors = usage["errors"]
+        try:
+            result = run_checkpoint_workflow(checkpoint=checkpoint_data, tutor_mode=tutor_mode)
+        finally:
+            question_generator.forget_checkpoint_history(checkpoint_data["id"])
+        if (usage["errors"] > errors or result.get("fallback") or not result.get("workflow_complete")
+                or not result.get("explanation")):
+            entry["failed"] += 1
+            continue
+        content_library.store_content(db, checkpoint_data, tutor_mode, result)
+        db.commit()
+        entry["generated"] += 1
+
+
+def warm_topic(topic, tutor_mode):
+    """Fill the library for one topic; returns its progress entry."""
+    started = time.perf_counter()
+    entry = {"topic": topic, "checkpoints": 0, "generated": 0, "reused": 0, "failed": 0}
+    db = SessionLocal()
+    with llm.track_usage() as usage:
+        try:
+            fill_topic(db, topic, tutor_mode, usage, entry)
+        except Exception as e:
+            db.rollback()
+            entry["error"] = str(e)
+        finally:
+            db.close()
+
+    entry["status"] = "failed" if entry["failed"] or entry.get("error") else "done"
+    entry.update(
+        seconds=round(time.perf_counter() - started, 1),
+        calls=usage["calls"],
+        prompt_tokens=usage["prompt_tokens"],
+        completion_tokens=usage["completion_tokens"],
+        cost_usd=round(usage["cost_usd"], 4),
+    )
+    return entry
+
+
+def report(entry):
+    mark = "✓" if entry["status"] == "done" else "✗"
+    print(f"{mark} {entry['topic'][:40]:<40} {entry['seconds']:>7.1f}s "
+          f"{entry['generated']:>3} new {entry['reused']:>3} reused {entry['failed']:>3} failed "
+          f"{entry['calls']:>4} calls {entry['prompt_tokens'] + entry['completion_tokens']:>8} tokens "
+          f"${entry['cost_usd']:.4f}"
+          + (f"  ({entry['error']})" if entry.get("error") else ""), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("topics_file")
+    parser.add_argument("--concurrency", type=int, default=4, help="topics warmed in parallel")
+    parser.add_argument("--rpm", type=float, default=300, help="LLM requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=100000, help="LLM tokens per minute (0 = unlimited)")
+    parser.add_argument("--tutor-mode", default="supportive_buddy",
+                        help="mode the explanations are written in; other modes are restyled on demand")
+    parser.add_argument("--progress-file", default="warm_topics.progress.jsonl")
+    parser.add_argument("--restart", action="store_true", help="ignore the progress file")
+    args = parser.parse_args()
+
+    init_db()
+    scheduler.set_limits(args.rpm, args.tpm)
+
+    topics = read_topics(args.topics_file)
+    done = set() if args.restart else finished_topics(args.progress_file)
+    pending = [t for t in topics if content_library.topic_key(t) not in done]
+    print(f"{len(topics)} topics, {len(topics) - len(pending)} already warm, {len(pending)} to go "
+          f"(concurrency {args.concurrency}, {args.rpm:.0f} rpm, {args.tpm:.0f} tpm)\n")
+
+    totals = {"done": 0, "failed": 0, "calls": 0, "tokens": 0, "cost_usd": 0.0}
+    started = time.perf_counter()
+    with open(args.progress_file, "a", encoding="utf-8") as progress, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(warm_topic, topic, args.tutor_mode) for topic in pending]
+        for future in as_completed(futures):
+            entry = future.result()
+            progress.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            progress.flush()
+            report(entry)
+            totals[entry["status"]] += 1
+            totals["calls"] += entry["calls"]
+            totals["tokens"] += entry["prompt_tokens"] + entry["completion_tokens"]
+            totals["cost_usd"] += entry["cost_usd"]
+
+    print(f"\n{totals['done']} warmed, {totals['failed']} failed in {time.perf_counter() - started:.1f}s; "
+          f"{totals['calls']} LLM calls, {totals['tokens']} tokens, ${totals['cost_usd']:.4f}")
+    if totals["failed"]:
+        print("Re-run the same command to retry failed topics.")
+
+
+if __name__ == "__main__":
+    main()
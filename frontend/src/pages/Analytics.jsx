@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { analyticsAPI, gamificationAPI } from '../services/api';
+import { analyticsAPI, gamificationAPI, nextCursor } from '../services/api';
 import Sidebar from '../components/Sidebar';
 
 const useCSSVar = (varName, fallback) => {
@@ -227,6 +227,21 @@ const GROUP_LABELS = {
   xp:          '💎 XP',
 };
 
+const TREND_SESSIONS = 8;
+
+// Pages through history (newest first) only until the score trend has its
+// completed sessions, instead of downloading every session.
+const loadRecentCompleted = async (count) => {
+  const completed = [];
+  let cursor = null;
+  do {
+    const res = await analyticsAPI.getHistory({ limit: 50, cursor, fields: 'status,xp_earned' });
+    completed.push(...res.data.filter(s => s.status === 'completed'));
+    cursor = nextCursor(res);
+  } while (cursor && completed.length < count);
+  return completed.slice(0, count);
+};
+
 const Analytics = () => {
   const [analytics, setAnalytics]     = useState(null);
   const [progress, setProgress]       = useState(null);
@@ -243,20 +258,20 @@ const Analytics = () => {
 
   const loadAnalytics = async () => {
     try {
-      const [analyticsRes, progressRes, badgesRes, weakRes, badgeDefsRes, historyRes] = await Promise.all([
+      const [analyticsRes, progressRes, badgesRes, weakRes, badgeDefsRes, recentCompleted] = await Promise.all([
         analyticsAPI.get(),
         analyticsAPI.getProgress(),
         gamificationAPI.getBadges(),
         gamificationAPI.getWeakTopics(),
         gamificationAPI.getBadgeDefinitions(),
-        analyticsAPI.getHistory(),
+        loadRecentCompleted(TREND_SESSIONS),
       ]);
       setAnalytics(analyticsRes.data);
       setProgress(progressRes.data);
       setEarnedBadges(badgesRes.data);
       setWeakTopics(weakRes.data);
       setBadgeDefs(badgeDefsRes.data || {});
-      setSessionHistory(historyRes.data || []);
+      setSessionHistory(recentCompleted);
     } catch (error) {
       console.error('Failed to load analytics:', error);
     } finally {
@@ -295,11 +310,8 @@ const Analytics = () => {
     { label: 'In Progress', value: Math.max((progress?.total_sessions || 0) - (progress?.completed_sessions || 0), 0), highlight: false },
   ];
 
-  // Score trend: last 8 completed sessions
-  const completedSessions = sessionHistory
-    .filter(s => s.status === 'completed')
-    .slice(0, 8)
-    .reverse();
+  // Score trend: last 8 completed sessions, oldest first
+  const completedSessions = [...sessionHistory].reverse();
 
   const scoreTrendData = completedSessions.map((s, i) => ({
     label: `S${i + 1}`,
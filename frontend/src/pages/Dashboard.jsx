@@ -22,7 +22,7 @@ const Dashboard = () => {
   const loadDashboard = async () => {
     try {
       const [sessionsRes, badgesRes, challengeRes] = await Promise.all([
-        sessionAPI.getAll(),
+        sessionAPI.getAll({ limit: 2 }),
         gamificationAPI.getBadges(),
         gamificationAPI.getDailyChallenge(),
       ]);
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { analyticsAPI, gamificationAPI } from '../services/api';
+import { analyticsAPI, gamificationAPI, nextCursor, PAGE_SIZE } from '../services/api';
 import Sidebar from '../components/Sidebar';
 
 const statusColors = {
@@ -12,7 +12,10 @@ const statusColors = {
 const History = () => {
   const navigate = useNavigate();
   const [sessions,      setSessions]      = useState([]);
+  const [cursor,        setCursor]        = useState(null);
+  const [totals,        setTotals]        = useState(null);
   const [loading,       setLoading]       = useState(true);
+  const [loadingMore,   setLoadingMore]   = useState(false);
   const [downloadingId, setDownloadingId] = useState(null);
   const [noteType,      setNoteType]      = useState({});
 
@@ -20,8 +23,15 @@ const History = () => {
 
   const loadHistory = async () => {
     try {
-      const res = await analyticsAPI.getHistory();
+      const [res, progressRes] = await Promise.all([
+        analyticsAPI.getHistory(),
+        analyticsAPI.getProgress(),
+      ]);
       setSessions(res.data);
+      setCursor(nextCursor(res));
+      const total     = progressRes.data.total_sessions || 0;
+      const completed = progressRes.data.completed_sessions || 0;
+      setTotals({ completed, inProgress: Math.max(total - completed, 0) });
     } catch (err) {
       console.error('Failed to load history:', err);
     } finally {
@@ -29,6 +39,20 @@ const History = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!cursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await analyticsAPI.getHistory({ limit: PAGE_SIZE, cursor });
+      setSessions(prev => [...prev, ...res.data]);
+      setCursor(nextCursor(res));
+    } catch (err) {
+      console.error('Failed to load more history:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getNoteType = (sessionId) => noteType[sessionId] || 'comprehensive';
 
   const handleDownloadNotes = async (e, session) => {
@@ -95,7 +119,7 @@ const History = () => {
           }}>
             <h1 style={{ margin: '0 0 6px 0', fontSize: '26px' }}>📚 Learning History</h1>
             <p style={{ margin: 0, opacity: 0.9, fontSize: '14px' }}>
-              {completedSessions.length} completed · {inProgressSessions.length} in progress
+              {totals?.completed ?? completedSessions.length} completed · {totals?.inProgress ?? inProgressSessions.length} in progress
             </p>
           </div>
 
@@ -112,7 +136,7 @@ const History = () => {
                   <h2 style={{ fontSize: '16px', fontWeight: '700', color: '#10B981', marginBottom: '14px', display: 'flex', alignItems: 'center', gap: '8px' }}>
                     ✅ Completed Sessions
                     <span style={{ fontSize: '13px', fontWeight: '500', background: '#10B98118', color: '#10B981', padding: '2px 10px', borderRadius: '20px', border: '1px solid #10B98144' }}>
-                      {completedSessions.length}
+                      {totals?.completed ?? completedSessions.length}
                     </span>
                   </h2>
 
@@ -206,7 +230,7 @@ const History = () => {
                   <h2 style={{ fontSize: '16px', fontWeight: '700', color: '#F59E0B', marginBottom: '14px', display: 'flex', alignItems: 'center', gap: '8px' }}>
                     ⏳ In Progress
                     <span style={{ fontSize: '13px', fontWeight: '500', background: '#F59E0B18', color: '#F59E0B', padding: '2px 10px', borderRadius: '20px', border: '1px solid #F59E0B44' }}>
-                      {inProgressSessions.length}
+                      {totals?.inProgress ?? inProgressSessions.length}
                     </span>
                   </h2>
 
@@ -250,6 +274,24 @@ const History = () => {
                   ))}
                 </div>
               )}
+
+              {cursor && (
+                <div style={{ textAlign: 'center', marginTop: '8px' }}>
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    style={{
+                      padding: '10px 22px', borderRadius: '8px', fontSize: '13px',
+                      fontWeight: '700', cursor: loadingMore ? 'not-allowed' : 'pointer',
+                      border: '1.5px solid var(--border)', background: 'var(--background)',
+                      color: 'var(--text-primary)', fontFamily: 'inherit',
+                      opacity: loadingMore ? 0.7 : 1,
+                    }}
+                  >
+                    {loadingMore ? '⏳ Loading...' : 'Load more sessions'}
+                  </button>
+                </div>
+              )}
             </>
           )}
         </div>
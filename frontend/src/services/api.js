@@ -43,6 +43,11 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints page newest first: pass { limit, cursor } and follow the
+// cursor from the previous response until it is null.
+export const PAGE_SIZE = 20;
+export const nextCursor = (response) => response.headers['x-next-cursor'] || null;
+
 export const authAPI = {
   register: (data) => api.post('/auth/register', data),
   login: (data) => api.post('/auth/login', data)
@@ -50,7 +55,7 @@ export const authAPI = {
 
 export const sessionAPI = {
   create: (data) => api.post('/sessions/', data),
-  getAll: () => api.get('/sessions/'),
+  getAll: (params = { limit: PAGE_SIZE }) => api.get('/sessions/', { params }),
   getOne: (id) => api.get(`/sessions/${id}`),
   generateCheckpoints: (id) => api.post(`/sessions/${id}/checkpoints`),
   getCheckpoints: (id) => api.get(`/sessions/${id}/checkpoints`),
@@ -68,7 +73,7 @@ export const checkpointAPI = {
 
 export const analyticsAPI = {
   get: () => api.get('/analytics/'),
-  getHistory: () => api.get('/analytics/history'),
+  getHistory: (params = { limit: PAGE_SIZE }) => api.get('/analytics/history', { params }),
   getSessionDetails: (sessionId) => api.get(`/analytics/sessions/${sessionId}/details`),
   getProgress: () => api.get('/analytics/progress')
 };